@@ -0,0 +1,53 @@
+"""Counts the connections dcos.http opens against a local stand-in server
+with and without pooled sessions.
+
+Usage: python -m benchmarks.bench_http_pool [<requests>]
+"""
+
+from __future__ import print_function
+
+import sys
+import time
+
+from dcos import http
+
+from .servers import StandInServer
+
+
+def _run(count, pooled):
+    """
+    :param count: number of requests to send
+    :type count: int
+    :param pooled: whether to keep sessions between requests
+    :type pooled: bool
+    :returns: (connections, seconds)
+    :rtype: (int, float)
+    """
+
+    with StandInServer() as server:
+        url = server.url + 'v2/info'
+        start = time.time()
+        for _ in range(count):
+            http.get(url)
+            if not pooled:
+                # What every call used to do: drop the session and its
+                # connections once the response is read.
+                http.close_sessions()
+        elapsed = time.time() - start
+
+        return server.connections, elapsed
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 200
+
+    for pooled in (False, True):
+        connections, elapsed = _run(count, pooled)
+        print('{:<10} requests={} connections={} time={:.3f}s'.format(
+            'pooled' if pooled else 'unpooled', count, connections, elapsed))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,147 @@
+"""Times the `dcos marathon` commands against a local Marathon stand-in
+with many apps, and counts the requests each one sends.
+
+Each command runs in this process, as `dcos marathon` would run it, with
+its output discarded.  The commands that change apps run last, in order.
+
+Usage: PYTHONPATH=cli python -m benchmarks.bench_marathon
+           [<apps> [<latency>]]
+"""
+
+from __future__ import print_function
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from dcos import constants
+from dcoscli.marathon import main as marathon_main
+
+from .marathon_server import MarathonStandIn, MarathonState
+
+_APP = '/group-1/app-1'
+_OTHER_APP = '/group-2/app-2'
+
+
+def _commands(app_dir, task_id):
+    """
+    :param app_dir: directory with app definitions for `deploy`
+    :type app_dir: str
+    :param task_id: the id of a task
+    :type task_id: str
+    :returns: the arguments of each command to time
+    :rtype: [[str]]
+    """
+
+    return [
+        ['about'],
+        ['app', 'list'],
+        ['app', 'list', '--json'],
+        ['app', 'list', '--fields=id,instances'],
+        ['app', 'show', _APP],
+        ['app', 'show', '--app-version=-1', _APP],
+        ['app', 'version', 'list', _APP],
+        ['app', 'diff', _APP],
+        ['group', 'list'],
+        ['group', 'show', '/group-1'],
+        ['task', 'list'],
+        ['task', 'list', _APP],
+        ['task', 'show', task_id],
+        ['deployment', 'list'],
+        ['app', 'update', '--wait', _APP, 'cpus=0.2'],
+        ['app', 'scale', '--wait', '3', _APP],
+        ['app', 'restart', '--wait', _APP],
+        ['app', 'stop', '--wait', _OTHER_APP],
+        ['app', 'start', _OTHER_APP],
+        ['app', 'scale', '--wait', '2', '/group-3/*'],
+        ['deploy', '--wait', app_dir],
+        ['app', 'remove', '--wait', '/group-4/*'],
+    ]
+
+
+def _run(args):
+    """Runs `dcos marathon <args>` with its output discarded.
+
+    :param args: the command's arguments
+    :type args: [str]
+    :returns: the command's return code, or the error it raised
+    :rtype: int | str
+    """
+
+    argv, stdout, stderr = sys.argv, sys.stdout, sys.stderr
+    sys.argv = ['dcos-marathon', 'marathon'] + args
+    output = io.StringIO() if sys.version_info[0] >= 3 else io.BytesIO()
+    sys.stdout = sys.stderr = output
+    try:
+        return marathon_main.main()
+    except Exception as e:
+        return '{}: {}'.format(type(e).__name__, e)
+    finally:
+        sys.argv, sys.stdout, sys.stderr = argv, stdout, stderr
+
+
+def _write_apps(app_dir, count):
+    """Writes `count` app definitions, each depending on the one before.
+
+    :param app_dir: directory for the definitions
+    :type app_dir: str
+    :param count: number of apps
+    :type count: int
+    :rtype: None
+    """
+
+    for i in range(count):
+        app = {'id': '/deployed/app-{}'.format(i),
+               'cmd': 'sleep 1000',
+               'cpus': 0.1,
+               'mem': 16,
+               'instances': 1}
+        if i % 5:
+            app['dependencies'] = ['/deployed/app-{}'.format(i - 1)]
+        path = os.path.join(app_dir, 'app-{}.json'.format(i))
+        with open(path, 'w') as app_file:
+            json.dump(app, app_file)
+
+
+def main(argv):
+    apps = int(argv[1]) if len(argv) > 1 else 10000
+    latency = float(argv[2]) if len(argv) > 2 else 0.0
+
+    state = MarathonState(deployment_duration=0.05)
+    state.generate(apps=apps, groups=100, instances=2, versions=3)
+    task_id = state.tasks[_APP][0]['id']
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        app_dir = os.path.join(work_dir, 'apps')
+        os.mkdir(app_dir)
+        _write_apps(app_dir, 20)
+
+        with MarathonStandIn(state, latency=latency) as server:
+            config_path = os.path.join(work_dir, 'dcos.toml')
+            with open(config_path, 'w') as config_file:
+                config_file.write('[marathon]\nurl = "{}"\n'.format(
+                    server.url))
+            os.environ[constants.DCOS_CONFIG_ENV] = config_path
+
+            print('apps={} latency={}s'.format(apps, latency))
+            for args in _commands(app_dir, task_id):
+                requests = server.requests
+                start = time.time()
+                result = _run(args)
+                elapsed = time.time() - start
+                print('{:<45} {:>8.3f}s requests={:<5} result={}'.format(
+                    ' '.join(args)[:45], elapsed,
+                    server.requests - requests, result))
+    finally:
+        shutil.rmtree(work_dir)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
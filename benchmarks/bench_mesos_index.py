@@ -0,0 +1,51 @@
+"""Times the per-task slave and framework lookups that `dcos task` renders,
+with linear scans and with the id indexes of dcos.mesos.Master.
+
+Usage: python -m benchmarks.bench_mesos_index [<agents> <tasks>]
+"""
+
+from __future__ import print_function
+
+import sys
+import time
+
+from dcos import mesos
+
+from .mesos_state import generate_state
+
+
+def _linear_lookup(master, task):
+    """What the table rows used to cost: a scan of all slaves and a scan of
+    all frameworks.
+    """
+
+    host = next(s for s in master.slaves(task['slave_id'])
+                if s['id'] == task['slave_id'])['hostname']
+    user = next(f['user'] for f in master.frameworks(inactive=True)
+                if f['id'] == task['framework_id'])
+    return host, user
+
+
+def _indexed_lookup(master, task):
+    return task.slave()['hostname'], task.user()
+
+
+def main(argv):
+    agents = int(argv[1]) if len(argv) > 1 else 2000
+    tasks = int(argv[2]) if len(argv) > 2 else 20000
+
+    state = generate_state(agents=agents, frameworks=20, tasks=tasks)
+
+    for name, lookup in (('linear', _linear_lookup),
+                         ('indexed', _indexed_lookup)):
+        master = mesos.Master(state)
+        start = time.time()
+        rows = [lookup(master, task) for task in master.tasks()]
+        print('{:<8} agents={} tasks={} time={:.3f}s'.format(
+            name, agents, len(rows), time.time() - start))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
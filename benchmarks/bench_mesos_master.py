@@ -0,0 +1,80 @@
+"""Times the steps of `dcos task` and `dcos service` against a local Mesos
+master stand-in that serves a large synthetic cluster: fetching and
+decoding the master's state, building the tasks, and rendering them as a
+table and as JSON.  The cluster is generated from a fixed seed, so runs
+are comparable and need no network.
+
+Usage: PYTHONPATH=cli python -m benchmarks.bench_mesos_master
+           [<agents> <tasks> [<completed-tasks> [<latency>]]]
+"""
+
+from __future__ import print_function
+
+import json
+import sys
+import time
+
+from dcos import mesos
+from dcoscli import tables
+
+from .mesos_server import MesosStandIn
+from .mesos_state import generate_state
+
+
+def _time(name, function):
+    """Runs `function` and prints how long it took.
+
+    :param name: name of the step
+    :type name: str
+    :param function: the step
+    :type function: () -> object
+    :returns: what `function` returned
+    :rtype: object
+    """
+
+    start = time.time()
+    result = function()
+    print('{:<28} {:>8.3f}s'.format(name, time.time() - start))
+    return result
+
+
+def main(argv):
+    agents = int(argv[1]) if len(argv) > 1 else 2000
+    tasks = int(argv[2]) if len(argv) > 2 else 50000
+    completed = int(argv[3]) if len(argv) > 3 else tasks
+    latency = float(argv[4]) if len(argv) > 4 else 0.0
+
+    state = generate_state(agents=agents, frameworks=20, tasks=tasks,
+                           completed_tasks=completed,
+                           completed_frameworks=5)
+
+    with MesosStandIn(state, latency=latency) as server:
+        client = mesos.MasterClient(server.url)
+
+        print('agents={} tasks={} completed={} state.json={:.1f}MB'.format(
+            agents, tasks, completed,
+            len(server.document('state')) / 1024.0 / 1024.0))
+
+        _time('get state.json', client.get_state)
+        view = _time('get tasks view',
+                     lambda: client.get_view(mesos.TASKS_VIEW))
+        master = _time('Master(compact=True)',
+                       lambda: mesos.Master(view, compact=True))
+        running = _time('Master.tasks()', master.tasks)
+        _time('task_table', lambda: str(tables.task_table(running)))
+        _time('json output', lambda: json.dumps(
+            [task.dict() for task in running], sort_keys=True, indent=2))
+
+        view = _time('get completed tasks view',
+                     lambda: client.get_view(mesos.COMPLETED_TASKS_VIEW))
+        _time('Master.tasks(completed)', lambda: mesos.Master(
+            view, compact=True).tasks(completed=True))
+
+        _time('get services summary',
+              lambda: client.get_view(mesos.SERVICES_SUMMARY_VIEW))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
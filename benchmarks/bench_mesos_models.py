@@ -0,0 +1,81 @@
+"""Compares the memory that dcos.mesos.Master retains for a large state with
+plain dicts and with compact records, and the time to list its tasks.
+
+Each mode runs in its own process, which decodes the state from JSON,
+builds the Master, and reports the memory it retains and the peak
+resident set size of the process. Needs Python 3 for tracemalloc.
+
+Usage: python -m benchmarks.bench_mesos_models [<agents> <tasks>]
+"""
+
+from __future__ import print_function
+
+import gc
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from dcos import mesos
+
+from .mesos_state import generate_state
+
+_MODULE = 'benchmarks.bench_mesos_models'
+
+
+def _peak_rss():
+    """
+    :returns: the peak resident set size of this process, in bytes
+    :rtype: int
+    """
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return maxrss
+    return maxrss * 1024
+
+
+def _measure(mode, agents, tasks):
+    document = json.dumps(
+        generate_state(agents=agents, frameworks=20, tasks=tasks))
+    gc.collect()
+
+    # Memory that the decoder freed is not always returned to the OS, so
+    # the current RSS overstates what the Master holds on to. tracemalloc
+    # counts the live allocations instead.
+    tracemalloc.start()
+    master = mesos.Master(json.loads(document), compact=mode == 'compact')
+    del document
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.time()
+    count = sum(1 for task in master.iter_tasks('state=TASK_RUNNING')
+                if task.slave()['hostname'])
+    elapsed = time.time() - start
+
+    print('{:<8} tasks={} retained={:.1f}MB peak_rss={:.1f}MB '
+          'list={:.3f}s'.format(mode, count, retained / 1024.0 / 1024.0,
+                                _peak_rss() / 1024.0 / 1024.0, elapsed))
+
+
+def main(argv):
+    if len(argv) > 1 and argv[1] in ('plain', 'compact'):
+        _measure(argv[1], int(argv[2]), int(argv[3]))
+        return 0
+
+    agents = argv[1] if len(argv) > 1 else '2000'
+    tasks = argv[2] if len(argv) > 2 else '100000'
+
+    for mode in ('plain', 'compact'):
+        subprocess.check_call([sys.executable, '-m', _MODULE,
+                               mode, agents, tasks])
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,64 @@
+"""Times `dcos package search` over a synthetic universe, scanning the
+package index as before and looking the query up in the search index that
+`dcos package update` builds.
+
+Usage: python -m benchmarks.bench_package_search [<packages>]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+from dcos import package, util
+
+from .package_universe import generate_index, write_registry
+
+_QUERIES = ['', 'kafka', 'dat', 'spark-12', 'xyzzy', 'big data']
+
+
+def _time(search, query, repeat):
+    """
+    :returns: the number of results and the time per search
+    :rtype: (int, float)
+    """
+
+    start = time.time()
+    for _ in range(repeat):
+        results = search(query)
+    return len(results), (time.time() - start) / repeat
+
+
+def main(argv):
+    packages = int(argv[1]) if len(argv) > 1 else 10000
+    repeat = 10
+
+    with util.tempdir() as tmp_dir:
+        write_registry(tmp_dir, generate_index(packages))
+        registry = package.Registry(package.FileSource('file://' + tmp_dir),
+                                    tmp_dir)
+
+        start = time.time()
+        registry.build_search_index()
+        print('packages={} build={:.3f}s index={:.1f}MB'.format(
+            packages, time.time() - start,
+            os.path.getsize(os.path.join(
+                tmp_dir, package.SEARCH_INDEX_NAME)) / 1024.0 / 1024.0))
+
+        def scan(query):
+            return [package._clean_package_entry(pkg)
+                    for pkg in registry.get_index()['packages']
+                    if package._search_rank(pkg, query) >= 0.5]
+
+        for query in _QUERIES:
+            count, scanned = _time(scan, query, repeat)
+            _, indexed = _time(registry.search, query, repeat)
+            print('{:<10} results={:<6} scan={:.4f}s index={:.4f}s'.format(
+                repr(query), count, scanned, indexed))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,95 @@
+"""Times `dcos package update` of a synthetic universe served over HTTP:
+a first update that downloads and extracts the registry zip, and a second
+one that the server answers with 304 Not Modified.  For comparison, also
+times the former extraction, which unzipped the whole file into a
+temporary directory and copied the enclosing directory from there.
+
+Usage: python -m benchmarks.bench_package_update [<packages> [<latency>]]
+"""
+
+from __future__ import print_function
+
+import hashlib
+import io
+import os
+import shutil
+import sys
+import time
+import zipfile
+
+from dcos import package, util
+
+from .package_universe import generate_index, zip_registry
+from .servers import StandInHandler, StandInServer
+
+
+class _ZipHandler(StandInHandler):
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        etag = '"{}"'.format(hashlib.sha1(self.server.data).hexdigest())
+        if self.headers.get('If-None-Match') == etag:
+            self.send_data(304, b'')
+        else:
+            self.send_data(200, self.server.data, {'ETag': etag},
+                           content_type='application/zip')
+
+
+def _former_extract(data, target_dir):
+    """Extracts a registry zip file as HttpSource used to.
+
+    :param data: the zip file
+    :type data: bytes
+    :param target_dir: Path to the destination directory.
+    :type target_dir: str
+    :rtype: None
+    """
+
+    with util.tempdir() as tmp_dir:
+        tmp_file = os.path.join(tmp_dir, 'packages.zip')
+        with open(tmp_file, 'wb') as fd:
+            fd.write(data)
+
+        zipfile.ZipFile(tmp_file, 'r').extractall(tmp_dir)
+        enclosing_dir = [os.path.join(tmp_dir, item)
+                         for item in os.listdir(tmp_dir)
+                         if os.path.isdir(os.path.join(tmp_dir, item))][0]
+        shutil.copytree(enclosing_dir, target_dir)
+
+
+def _time(name, function):
+    start = time.time()
+    function()
+    print('{:<24} {:>8.3f}s'.format(name, time.time() - start))
+
+
+def main(argv):
+    packages = int(argv[1]) if len(argv) > 1 else 10000
+    latency = float(argv[2]) if len(argv) > 2 else 0.0
+
+    data = zip_registry(generate_index(packages), package_files=True)
+    print('packages={} zip={:.1f}MB files={}'.format(
+        packages, len(data) / 1024.0 / 1024.0,
+        len(zipfile.ZipFile(io.BytesIO(data)).namelist())))
+
+    with util.tempdir() as tmp_dir, StandInServer(_ZipHandler) as server:
+        server.server.data = data
+        server.server.latency = latency
+
+        cache_dir = os.path.join(tmp_dir, 'cache')
+        config = {'package.sources': [server.url + 'universe.zip'],
+                  'package.cache': cache_dir}
+
+        _time('former extraction', lambda: _former_extract(
+            data, os.path.join(tmp_dir, 'former')))
+        _time('update', lambda: package.update_sources(config))
+        _time('update (not modified)',
+              lambda: package.update_sources(config))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,1009 @@
+"""A Marathon stand-in: an in-memory model of the parts of Marathon's v2
+REST API that dcos.marathon uses, served on a local port, with synthetic
+apps, configurable latency and injected errors.
+
+Deployments finish `deployment_duration` seconds after they start.  The
+model is advanced lazily, whenever a request arrives or an event stream
+is open, so the server runs no threads of its own.
+"""
+
+import datetime
+import itertools
+import json
+import posixpath
+import random
+import re
+import threading
+import time
+
+from six.moves import urllib
+
+from .servers import StandInHandler, StandInServer
+
+MARATHON_VERSION = '0.11.0'
+
+_EPOCH = datetime.datetime(2015, 10, 1)
+
+_APP_PATH = re.compile(
+    r'^/v2/apps(?P<id>/.*?)?'
+    r'(?:/(?P<sub>tasks|restart)|'
+    r'(?P<versions>/versions)(?:/(?P<version>[^/]+))?)?/?$')
+
+_GROUP_PATH = re.compile(
+    r'^/v2/groups(?P<id>/.*?)?'
+    r'(?:(?P<versions>/versions)(?:/(?P<version>[^/]+))?)?/?$')
+
+_DEPLOYMENT_PATH = re.compile(r'^/v2/deployments(?:/(?P<id>[^/]+))?/?$')
+
+
+class HttpError(Exception):
+    """An error response.
+
+    :param status: HTTP status code
+    :type status: int
+    :param message: the response's message
+    :type message: str
+    """
+
+    def __init__(self, status, message):
+        Exception.__init__(self, message)
+        self.status = status
+        self.message = message
+
+
+def _normalize(app_id):
+    """
+    :param app_id: app or group id
+    :type app_id: str
+    :returns: the absolute id, without a trailing slash
+    :rtype: str
+    """
+
+    return '/' + (app_id or '').strip('/')
+
+
+def _parent(app_id):
+    """
+    :param app_id: normalized app or group id
+    :type app_id: str
+    :returns: the id of the enclosing group
+    :rtype: str
+    """
+
+    return app_id.rpartition('/')[0] or '/'
+
+
+def _in_group(app_id, group_id):
+    """
+    :param app_id: normalized app or group id
+    :type app_id: str
+    :param group_id: normalized group id
+    :type group_id: str
+    :returns: whether `app_id` is in the group, directly or not
+    :rtype: bool
+    """
+
+    return group_id == '/' or app_id.startswith(group_id + '/')
+
+
+class MarathonState(object):
+    """The apps, their versions and tasks, and the deployments of a
+    stand-in Marathon.  All methods must be called with `lock` held.
+
+    :param deployment_duration: number of seconds a deployment takes
+    :type deployment_duration: float
+    :param seed: seed of the random parts of the model, e.g. task hosts
+    :type seed: int
+    """
+
+    def __init__(self, deployment_duration=0.0, seed=0):
+        self.lock = threading.Condition()
+        self.deployment_duration = deployment_duration
+
+        self.apps = {}
+        self.groups = set(['/'])
+        self.tasks = {}
+        self.deployments = {}
+
+        # Every change, in order: (version, app id, definition or None if
+        # the app was removed)
+        self.history = []
+        self.events = []
+
+        self._random = random.Random(seed)
+        self._clock = itertools.count(1)
+        self._ids = itertools.count(1)
+
+    def _version(self):
+        """
+        :returns: a new version timestamp, later than all the others
+        :rtype: str
+        """
+
+        moment = _EPOCH + datetime.timedelta(milliseconds=next(self._clock))
+        return moment.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+    def _uuid(self):
+        """
+        :returns: a new unique, deterministic UUID
+        :rtype: str
+        """
+
+        number = next(self._ids)
+        return '{:08x}-{:04x}-11e5-8000-{:012x}'.format(
+            number, number % 0x10000, number)
+
+    def _emit(self, event_type, data):
+        """Appends an event for the open event streams.
+
+        :param event_type: Marathon event type
+        :type event_type: str
+        :param data: event data, without the event type
+        :type data: dict
+        :rtype: None
+        """
+
+        data = dict(data, eventType=event_type,
+                    timestamp=self._version())
+        self.events.append((event_type, data))
+        self.lock.notify_all()
+
+    def _record(self, app_id, definition):
+        """Records a new version of an app, or its removal.
+
+        :param app_id: normalized app id
+        :type app_id: str
+        :param definition: the app's definition, or None if it was removed
+        :type definition: dict
+        :rtype: None
+        """
+
+        version = self._version()
+        if definition is None:
+            self.apps.pop(app_id, None)
+        else:
+            definition['version'] = version
+            definition['versionInfo'] = {'lastConfigChangeAt': version,
+                                         'lastScalingAt': version}
+            self.apps[app_id] = definition
+
+            group = _parent(app_id)
+            while group not in self.groups:
+                self.groups.add(group)
+                group = _parent(group)
+
+        self.history.append((version, app_id, definition))
+
+    def generate(self, apps=100, groups=10, instances=1, versions=1):
+        """Adds synthetic apps, spread over `groups` groups, all running.
+
+        :param apps: number of apps
+        :type apps: int
+        :param groups: number of groups
+        :type groups: int
+        :param instances: number of instances of each app
+        :type instances: int
+        :param versions: number of versions of each app
+        :type versions: int
+        :rtype: None
+        """
+
+        for i in range(apps):
+            app_id = '/group-{}/app-{}'.format(i % max(groups, 1), i)
+            definition = _app_definition(app_id, instances)
+            if i % 10 == 9:
+                definition['dependencies'] = [
+                    '/group-{}/app-{}'.format((i - 1) % max(groups, 1),
+                                              i - 1)]
+
+            for version in range(versions):
+                definition = dict(definition,
+                                  cpus=round(0.1 * (version + 1), 1))
+                self._record(app_id, definition)
+
+            self._scale_tasks(app_id)
+
+    def advance(self):
+        """Finishes the deployments whose time is up.
+
+        :rtype: None
+        """
+
+        now = time.time()
+        finished = [deployment
+                    for deployment, end in self.deployments.values()
+                    if end <= now]
+        for deployment in sorted(finished, key=lambda d: d['version']):
+            del self.deployments[deployment['id']]
+            for app_id in deployment['affectedApps']:
+                self._scale_tasks(app_id,
+                                  restart=deployment['_action'] == 'restart')
+            self._emit('deployment_step_success',
+                       {'plan': self._plan(deployment),
+                        'currentStep': deployment['steps'][0]})
+            self._emit('deployment_success',
+                       {'id': deployment['id'],
+                        'plan': self._plan(deployment)})
+
+    def _scale_tasks(self, app_id, restart=False):
+        """Starts or kills tasks until the app runs as many as it has
+        instances.
+
+        :param app_id: normalized app id
+        :type app_id: str
+        :param restart: whether to replace all of the app's tasks
+        :type restart: bool
+        :rtype: None
+        """
+
+        app = self.apps.get(app_id)
+        if app is None:
+            self.tasks.pop(app_id, None)
+            return
+
+        tasks = [] if restart else self.tasks.get(app_id, [])
+        while len(tasks) > app['instances']:
+            tasks.pop()
+        while len(tasks) < app['instances']:
+            agent = self._random.randint(0, 999)
+            tasks.append({
+                'id': '{}.{}'.format(app_id[1:].replace('/', '_'),
+                                     self._uuid()),
+                'appId': app_id,
+                'host': 'agent-{}.example.com'.format(agent),
+                'slaveId': '20151001-000000-0000-5050-1-S{}'.format(agent),
+                'ports': [31000 + len(tasks)],
+                'stagedAt': app['version'],
+                'startedAt': app['version'],
+                'version': app['version'],
+                'healthCheckResults': [],
+            })
+        self.tasks[app_id] = tasks
+
+    def _deploy(self, app_ids, action, force):
+        """Starts a deployment of the apps.
+
+        :param app_ids: normalized ids of the affected apps
+        :type app_ids: [str]
+        :param action: 'start', 'scale', 'restart' or 'stop'
+        :type action: str
+        :param force: whether to override the apps' running deployments
+        :type force: bool
+        :returns: the deployment
+        :rtype: dict
+        """
+
+        locking = [deployment_id
+                   for deployment_id, (deployment, _)
+                   in self.deployments.items()
+                   if set(deployment['affectedApps']).intersection(app_ids)]
+        if locking and not force:
+            raise HttpError(
+                409,
+                'App is locked by one or more deployments. Override with '
+                'the option \'?force=true\'. View details at '
+                '\'/v2/deployments/<DEPLOYMENT_ID>\'.')
+        for deployment_id in locking:
+            del self.deployments[deployment_id]
+
+        actions = {'start': 'StartApplication',
+                   'scale': 'ScaleApplication',
+                   'restart': 'RestartApplication',
+                   'stop': 'StopApplication'}
+        current_actions = [{'action': actions[action], 'app': app_id}
+                           for app_id in sorted(app_ids)]
+        deployment = {
+            'id': self._uuid(),
+            'version': self._version(),
+            'affectedApps': sorted(app_ids),
+            'steps': [current_actions],
+            'currentActions': current_actions,
+            'currentStep': 1,
+            'totalSteps': 1,
+            '_action': action,
+        }
+        self.deployments[deployment['id']] = (
+            deployment, time.time() + self.deployment_duration)
+        self._emit('deployment_info',
+                   {'plan': self._plan(deployment),
+                    'currentStep': current_actions})
+        return deployment
+
+    def _plan(self, deployment):
+        """
+        :param deployment: deployment
+        :type deployment: dict
+        :returns: the deployment plan that events carry
+        :rtype: dict
+        """
+
+        return {'id': deployment['id'],
+                'version': deployment['version'],
+                'steps': deployment['steps']}
+
+    def _find_app(self, app_id):
+        """
+        :param app_id: app id
+        :type app_id: str
+        :returns: the app
+        :rtype: dict
+        """
+
+        app = self.apps.get(_normalize(app_id))
+        if app is None:
+            raise HttpError(
+                404, "App '{}' does not exist".format(_normalize(app_id)))
+        return app
+
+    def add_app(self, definition):
+        """
+        :param definition: app definition
+        :type definition: dict
+        :returns: the app, with the deployment that starts it
+        :rtype: dict
+        """
+
+        if not definition.get('id'):
+            raise HttpError(422, 'Object is not valid: id is required')
+
+        app_id = _normalize(definition['id'])
+        if app_id in self.apps:
+            raise HttpError(
+                409, 'An app with id [{}] already exists.'.format(app_id))
+
+        app = _app_definition(app_id, 1)
+        app.update(definition)
+        app['id'] = app_id
+        self._record(app_id, app)
+        deployment = self._deploy([app_id], 'start', False)
+
+        return dict(app, deployments=[{'id': deployment['id']}])
+
+    def update_app(self, app_id, changes, force):
+        """Changes some fields of an app, or creates it.
+
+        :param app_id: app id
+        :type app_id: str
+        :param changes: the fields to change
+        :type changes: dict
+        :param force: whether to override running deployments
+        :type force: bool
+        :returns: the deployment
+        :rtype: dict
+        """
+
+        app_id = _normalize(app_id)
+        app = dict(self.apps.get(app_id) or _app_definition(app_id, 1))
+        app.update(changes)
+        app['id'] = app_id
+
+        if set(changes) == set(['instances']):
+            action = 'stop' if app['instances'] == 0 else 'scale'
+        elif app_id in self.apps:
+            action = 'restart'
+        else:
+            action = 'start'
+
+        deployment = self._deploy([app_id], action, force)
+        self._record(app_id, app)
+        return deployment
+
+    def remove_app(self, app_id, force):
+        """
+        :param app_id: app id
+        :type app_id: str
+        :param force: whether to override running deployments
+        :type force: bool
+        :returns: the deployment that stops the app
+        :rtype: dict
+        """
+
+        app_id = self._find_app(app_id)['id']
+        deployment = self._deploy([app_id], 'stop', force)
+        self._record(app_id, None)
+        return deployment
+
+    def restart_app(self, app_id, force):
+        """
+        :param app_id: app id
+        :type app_id: str
+        :param force: whether to override running deployments
+        :type force: bool
+        :returns: the deployment that restarts the app's tasks
+        :rtype: dict
+        """
+
+        app = self._find_app(app_id)
+        deployment = self._deploy([app['id']], 'restart', force)
+        self._record(app['id'], dict(app))
+        return deployment
+
+    def app(self, app_id, embed=None):
+        """
+        :param app_id: app id
+        :type app_id: str
+        :param embed: embed parameters; those of v2/apps/<id> by default
+        :type embed: [str]
+        :returns: the app with the fields Marathon adds
+        :rtype: dict
+        """
+
+        if embed is None:
+            embed = ['apps.counts', 'apps.deployments', 'apps.tasks',
+                     'apps.lastTaskFailure']
+        return self._embed(self._find_app(app_id), embed)
+
+    def list_apps(self, embed):
+        """
+        :param embed: embed parameters of v2/apps.  Without any, the counts
+                      and deployments are included, as Marathon 0.11 does.
+        :type embed: [str]
+        :returns: the apps, sorted by id
+        :rtype: [dict]
+        """
+
+        if not embed:
+            embed = ['apps.counts', 'apps.deployments']
+        return [self._embed(self.apps[app_id], embed)
+                for app_id in sorted(self.apps)]
+
+    def _embed(self, app, embed):
+        """
+        :param app: app definition
+        :type app: dict
+        :param embed: embed parameters
+        :type embed: [str]
+        :returns: a copy of the app with the embedded fields
+        :rtype: dict
+        """
+
+        app = dict(app)
+        tasks = self.tasks.get(app['id'], [])
+        if 'apps.counts' in embed:
+            healthy = len(tasks) if app.get('healthChecks') else 0
+            app.update(tasksStaged=0, tasksRunning=len(tasks),
+                       tasksHealthy=healthy, tasksUnhealthy=0)
+        if 'apps.deployments' in embed:
+            app['deployments'] = [
+                {'id': deployment['id']}
+                for deployment, _ in self.deployments.values()
+                if app['id'] in deployment['affectedApps']]
+        if 'apps.tasks' in embed:
+            app['tasks'] = tasks
+        return app
+
+    def app_versions(self, app_id):
+        """
+        :param app_id: app id
+        :type app_id: str
+        :returns: the versions of the app, newest first
+        :rtype: [str]
+        """
+
+        app_id = self._find_app(app_id)['id']
+        versions = []
+        for version, changed_id, definition in self.history:
+            if changed_id != app_id:
+                continue
+            if definition is None:
+                versions = []
+            else:
+                versions.append(version)
+        return versions[::-1]
+
+    def app_version(self, app_id, version):
+        """
+        :param app_id: app id
+        :type app_id: str
+        :param version: version timestamp
+        :type version: str
+        :returns: the app's definition at `version`
+        :rtype: dict
+        """
+
+        app_id = _normalize(app_id)
+        for changed_version, changed_id, definition in self.history:
+            if changed_id == app_id and changed_version == version and \
+                    definition is not None:
+                return definition
+
+        raise HttpError(
+            404,
+            "App '{}' does not exist in version {}".format(app_id, version))
+
+    def group(self, group_id, version=None):
+        """
+        :param group_id: group id
+        :type group_id: str
+        :param version: version timestamp; the current one if None
+        :type version: str
+        :returns: the group with its apps and subgroups
+        :rtype: dict
+        """
+
+        group_id = _normalize(group_id)
+
+        if version is None:
+            apps = self.apps
+            groups = self.groups
+            group_version = self.history[-1][0] if self.history else None
+        else:
+            if version not in self.group_versions(group_id):
+                raise HttpError(
+                    404, "Group '{}' does not exist in version {}".format(
+                        group_id, version))
+            apps = {}
+            for changed_version, app_id, definition in self.history:
+                if changed_version > version:
+                    break
+                if definition is None:
+                    apps.pop(app_id, None)
+                else:
+                    apps[app_id] = definition
+            groups = set(['/'])
+            for app_id in apps:
+                group = _parent(app_id)
+                while group not in groups:
+                    groups.add(group)
+                    group = _parent(group)
+            group_version = version
+
+        if group_id not in groups:
+            raise HttpError(
+                404, "Group '{}' does not exist".format(group_id))
+
+        children = {}
+        for app_id in apps:
+            if _in_group(app_id, group_id):
+                children.setdefault(_parent(app_id), ([], []))[0].append(
+                    app_id)
+        for child in groups:
+            if child != '/' and _in_group(child, group_id):
+                children.setdefault(_parent(child), ([], []))[1].append(child)
+
+        def build(current):
+            app_ids, group_ids = children.get(current, ([], []))
+            return {'id': current,
+                    'apps': [apps[app_id] for app_id in sorted(app_ids)],
+                    'groups': [build(child) for child in sorted(group_ids)],
+                    'dependencies': [],
+                    'version': group_version}
+
+        return build(group_id)
+
+    def group_versions(self, group_id):
+        """
+        :param group_id: group id
+        :type group_id: str
+        :returns: the versions in which an app of the group changed,
+                  newest first
+        :rtype: [str]
+        """
+
+        group_id = _normalize(group_id)
+        return [version
+                for version, app_id, _ in reversed(self.history)
+                if _in_group(app_id, group_id)]
+
+    def update_group(self, group_id, group, force):
+        """Adds or changes the apps of a group definition.
+
+        :param group_id: group id
+        :type group_id: str
+        :param group: group definition
+        :type group: dict
+        :param force: whether to override running deployments
+        :type force: bool
+        :returns: the deployment
+        :rtype: dict
+        """
+
+        group_id = _normalize(group_id)
+        definitions = []
+
+        def collect(current, parent_id):
+            current_id = _normalize(posixpath.normpath(
+                posixpath.join(parent_id, current.get('id', ''))))
+            self.groups.add(current_id)
+            for app in current.get('apps') or []:
+                app_id = _normalize(posixpath.normpath(
+                    posixpath.join(current_id, app['id'])))
+                definitions.append(dict(app, id=app_id))
+            for child in current.get('groups') or []:
+                collect(child, current_id)
+
+        collect(dict(group, id=group_id), '/')
+        if not definitions:
+            raise HttpError(422, 'Object is not valid: the group has no apps')
+
+        deployment = self._deploy([app['id'] for app in definitions],
+                                  'start', force)
+        for app in definitions:
+            current = dict(self.apps.get(app['id']) or
+                           _app_definition(app['id'], 1))
+            current.update(app)
+            self._record(app['id'], current)
+        return deployment
+
+    def remove_group(self, group_id, force):
+        """
+        :param group_id: group id
+        :type group_id: str
+        :param force: whether to override running deployments
+        :type force: bool
+        :returns: the deployment that stops the group's apps
+        :rtype: dict
+        """
+
+        group_id = _normalize(group_id)
+        if group_id not in self.groups:
+            raise HttpError(
+                404, "Group '{}' does not exist".format(group_id))
+
+        app_ids = [app_id for app_id in self.apps
+                   if _in_group(app_id, group_id)]
+        deployment = self._deploy(app_ids, 'stop', force)
+        for app_id in app_ids:
+            self._record(app_id, None)
+        self.groups = set(group for group in self.groups
+                          if group == '/' or
+                          not (group == group_id or
+                               _in_group(group, group_id)))
+        return deployment
+
+    def list_deployments(self):
+        """
+        :returns: the deployments in progress, oldest first
+        :rtype: [dict]
+        """
+
+        deployments = sorted((deployment
+                              for deployment, _ in self.deployments.values()),
+                             key=lambda deployment: deployment['version'])
+        return [dict((key, value) for key, value in deployment.items()
+                     if not key.startswith('_'))
+                for deployment in deployments]
+
+    def cancel_deployment(self, deployment_id, force):
+        """
+        :param deployment_id: deployment id
+        :type deployment_id: str
+        :param force: whether to stop the deployment rather than roll it
+                      back
+        :type force: bool
+        :returns: the rollback deployment; None if `force`
+        :rtype: dict
+        """
+
+        if deployment_id not in self.deployments:
+            raise HttpError(
+                404, "DeploymentPlan {} does not exist".format(deployment_id))
+
+        deployment, _ = self.deployments.pop(deployment_id)
+        if force:
+            return None
+        return self._deploy(deployment['affectedApps'], 'scale', True)
+
+    def all_tasks(self):
+        """
+        :returns: the tasks of all the apps
+        :rtype: [dict]
+        """
+
+        return [task
+                for app_id in sorted(self.tasks)
+                for task in self.tasks[app_id]]
+
+    def app_tasks(self, app_id):
+        """
+        :param app_id: app id
+        :type app_id: str
+        :returns: the tasks of the app
+        :rtype: [dict]
+        """
+
+        return list(self.tasks.get(self._find_app(app_id)['id'], []))
+
+
+def _app_definition(app_id, instances):
+    """
+    :param app_id: normalized app id
+    :type app_id: str
+    :param instances: number of instances
+    :type instances: int
+    :returns: a synthetic app definition with Marathon's defaults
+    :rtype: dict
+    """
+
+    return {
+        'id': app_id,
+        'cmd': 'python3 -m http.server $PORT0',
+        'args': None,
+        'user': None,
+        'env': {'APP': app_id},
+        'instances': instances,
+        'cpus': 0.1,
+        'mem': 32.0,
+        'disk': 0.0,
+        'executor': '',
+        'constraints': [],
+        'uris': [],
+        'storeUrls': [],
+        'ports': [0],
+        'requirePorts': False,
+        'backoffSeconds': 1,
+        'backoffFactor': 1.15,
+        'maxLaunchDelaySeconds': 3600,
+        'container': None,
+        'healthChecks': [],
+        'dependencies': [],
+        'upgradeStrategy': {'minimumHealthCapacity': 1.0,
+                            'maximumOverCapacity': 1.0},
+        'labels': {'owner': 'team-{}'.format(len(app_id) % 7)},
+        'acceptedResourceRoles': None,
+    }
+
+
+class MarathonHandler(StandInHandler):
+    """Serves the Marathon API of the server's `stand_in`."""
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method):
+        stand_in = self.server.stand_in
+        url = urllib.parse.urlparse(self.path)
+        path = urllib.parse.unquote(url.path)
+        query = urllib.parse.parse_qs(url.query)
+
+        body = None
+        if method in ('POST', 'PUT'):
+            data = self.read_body()
+            if data:
+                try:
+                    body = json.loads(data.decode('utf-8'))
+                except ValueError:
+                    self.send_json(400, {'message': 'Invalid JSON'})
+                    return
+
+        if stand_in.latency:
+            time.sleep(stand_in.latency)
+
+        status = stand_in.injected_error(method, path)
+        if status is not None:
+            self.send_json(status, {'message': 'Injected error'})
+            return
+
+        if method == 'GET' and path.rstrip('/') == '/v2/events':
+            self._stream_events(query.get('event_type'))
+            return
+
+        state = stand_in.state
+        try:
+            with state.lock:
+                state.advance()
+                status, response = self._route(
+                    state, method, path, query, body)
+        except HttpError as e:
+            self.send_json(e.status, {'message': e.message})
+            return
+
+        self.send_json(status, response)
+
+    def _route(self, state, method, path, query, body):
+        """
+        :returns: the status and body of the response
+        :rtype: (int, dict | list)
+        """
+
+        force = query.get('force') == ['true']
+
+        if path.rstrip('/') == '/v2/info':
+            return 200, {'name': 'marathon',
+                         'version': MARATHON_VERSION,
+                         'frameworkId': '20151001-000000-0000-5050-1-0000'}
+
+        if path.rstrip('/') == '/v2/tasks' and method == 'GET':
+            return 200, {'tasks': state.all_tasks()}
+
+        match = _APP_PATH.match(path)
+        if match is not None:
+            return self._route_app(state, method, match, query, body, force)
+
+        match = _GROUP_PATH.match(path)
+        if match is not None:
+            return self._route_group(state, method, match, body, force)
+
+        match = _DEPLOYMENT_PATH.match(path)
+        if match is not None:
+            if method == 'GET' and match.group('id') is None:
+                return 200, state.list_deployments()
+            if method == 'DELETE' and match.group('id') is not None:
+                deployment = state.cancel_deployment(match.group('id'), force)
+                if deployment is None:
+                    return 202, {}
+                return 200, {'deploymentId': deployment['id'],
+                             'version': deployment['version']}
+
+        raise HttpError(404, 'Not found: {} {}'.format(method, path))
+
+    def _route_app(self, state, method, match, query, body, force):
+        app_id = match.group('id')
+        sub = match.group('sub')
+
+        if app_id is None or app_id == '/':
+            if method == 'GET':
+                embed = query.get('embed', [])
+                return 200, {'apps': state.list_apps(embed)}
+            if method == 'POST':
+                return 201, state.add_app(body or {})
+        elif match.group('version') is not None and method == 'GET':
+            return 200, state.app_version(app_id, match.group('version'))
+        elif match.group('versions') is not None and method == 'GET':
+            return 200, {'versions': state.app_versions(app_id)}
+        elif sub == 'tasks' and method == 'GET':
+            return 200, {'tasks': state.app_tasks(app_id)}
+        elif sub == 'restart' and method == 'POST':
+            deployment = state.restart_app(app_id, force)
+            return 200, {'deploymentId': deployment['id'],
+                         'version': deployment['version']}
+        elif sub is None and method == 'GET':
+            return 200, {'app': state.app(app_id)}
+        elif sub is None and method == 'PUT':
+            deployment = state.update_app(app_id, body or {}, force)
+            return 200, {'deploymentId': deployment['id'],
+                         'version': deployment['version']}
+        elif sub is None and method == 'DELETE':
+            deployment = state.remove_app(app_id, force)
+            return 200, {'deploymentId': deployment['id'],
+                         'version': deployment['version']}
+
+        raise HttpError(405, 'Method not allowed')
+
+    def _route_group(self, state, method, match, body, force):
+        group_id = match.group('id') or '/'
+
+        if match.group('version') is not None and method == 'GET':
+            return 200, state.group(group_id, match.group('version'))
+        elif match.group('versions') is not None and method == 'GET':
+            return 200, state.group_versions(group_id)
+        elif method == 'GET':
+            return 200, state.group(group_id)
+        elif method in ('POST', 'PUT'):
+            if method == 'POST':
+                group_id = (body or {}).get('id', group_id)
+            deployment = state.update_group(group_id, body or {}, force)
+            return 201 if method == 'POST' else 200, {
+                'deploymentId': deployment['id'],
+                'version': deployment['version']}
+        elif method == 'DELETE':
+            deployment = state.remove_group(group_id, force)
+            return 200, {'deploymentId': deployment['id'],
+                         'version': deployment['version']}
+
+        raise HttpError(405, 'Method not allowed')
+
+    def _stream_events(self, event_types):
+        """Streams the events that happen from now on until the client
+        disconnects or the server stops.
+
+        :param event_types: the event types to send; all if None
+        :type event_types: [str]
+        :rtype: None
+        """
+
+        stand_in = self.server.stand_in
+        state = stand_in.state
+
+        with state.lock:
+            sent = len(state.events)
+        self.start_event_stream()
+
+        try:
+            while not stand_in.stopping:
+                with state.lock:
+                    state.advance()
+                    if sent == len(state.events):
+                        state.lock.wait(0.05)
+                        state.advance()
+                    events = state.events[sent:]
+                    sent = len(state.events)
+
+                for event_type, data in events:
+                    if event_types is None or event_type in event_types:
+                        self.send_event(event_type, data)
+            self.end_event_stream()
+        except (IOError, OSError):
+            # The client unsubscribed
+            pass
+
+
+class MarathonStandIn(StandInServer):
+    """Runs a stand-in Marathon on a local port for the lifetime of the
+    context manager.
+
+    :param state: the model to serve; an empty one if None
+    :type state: MarathonState
+    :param latency: number of seconds to wait before answering a request
+    :type latency: float
+    :param error_rate: fraction of the requests that fail with
+                       `error_status`, at random
+    :type error_rate: float
+    :param error_status: status of the randomly injected errors
+    :type error_status: int
+    :param seed: seed of the random errors
+    :type seed: int
+    """
+
+    def __init__(self, state=None, latency=0.0, error_rate=0.0,
+                 error_status=503, seed=0):
+        StandInServer.__init__(self, MarathonHandler)
+        self.state = MarathonState() if state is None else state
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stopping = False
+
+        self._random = random.Random(seed)
+        self._faults = []
+        self._faults_lock = threading.Lock()
+        self.server.stand_in = self
+
+    def fail(self, method, path, status=503, count=1):
+        """Makes the next `count` requests that match fail.
+
+        :param method: HTTP method, e.g. 'GET'
+        :type method: str
+        :param path: regular expression that the request path must match,
+                     e.g. '^/v2/apps$'
+        :type path: str
+        :param status: status of the error responses
+        :type status: int
+        :param count: number of requests to fail; all if None
+        :type count: int
+        :rtype: None
+        """
+
+        with self._faults_lock:
+            self._faults.append([method, re.compile(path), status, count])
+
+    def injected_error(self, method, path):
+        """
+        :param method: HTTP method of a request
+        :type method: str
+        :param path: path of the request
+        :type path: str
+        :returns: the status of the error to answer the request with, if
+                  any
+        :rtype: int | None
+        """
+
+        with self._faults_lock:
+            for fault in self._faults:
+                fault_method, pattern, status, count = fault
+                if fault_method == method and pattern.search(path):
+                    if count is not None:
+                        fault[3] -= 1
+                        if fault[3] <= 0:
+                            self._faults.remove(fault)
+                    return status
+
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self.error_status
+
+        return None
+
+    def stop(self):
+        self.stopping = True
+        with self.state.lock:
+            self.state.lock.notify_all()
+        StandInServer.stop(self)
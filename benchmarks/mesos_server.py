@@ -0,0 +1,195 @@
+"""A local stand-in for a Mesos master: serves a master state, such as one
+from :py:func:`benchmarks.mesos_state.generate_state`, from the endpoints
+that `dcos task` and `dcos service` read, and shuts frameworks down.
+
+The state is served under /master/ and, so that the server can also stand
+in for a DCOS cluster's `core.dcos_url`, under /mesos/master/.
+"""
+
+import json
+import threading
+import time
+
+from .mesos_state import generate_state, state_summary
+from .servers import StandInHandler, StandInServer
+
+from six.moves import urllib
+
+_DEFAULT_TASKS_LIMIT = 100
+
+
+class MesosHandler(StandInHandler):
+    """Serves the master endpoints of the server's `stand_in`."""
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        stand_in = self.server.stand_in
+        url = urllib.parse.urlparse(self.path)
+        path = url.path.rstrip('/')
+        if path.startswith('/mesos/'):
+            path = path[len('/mesos'):]
+
+        if method == 'POST':
+            query = urllib.parse.parse_qs(self.read_body().decode('utf-8'))
+        else:
+            query = urllib.parse.parse_qs(url.query)
+
+        if stand_in.latency:
+            time.sleep(stand_in.latency)
+
+        if method == 'GET' and path in ('/master/state.json',
+                                        '/master/state'):
+            self.send_data(200, stand_in.document('state'))
+        elif method == 'GET' and path == '/master/state-summary':
+            self.send_data(200, stand_in.document('state-summary'))
+        elif method == 'GET' and path == '/master/frameworks':
+            self.send_data(200, stand_in.document('frameworks'))
+        elif method == 'GET' and path == '/master/slaves':
+            self.send_data(200, stand_in.document('slaves'))
+        elif method == 'GET' and path in ('/master/tasks.json',
+                                          '/master/tasks'):
+            self._tasks(stand_in, query)
+        elif method == 'POST' and path in ('/master/shutdown',
+                                           '/master/teardown'):
+            self._shutdown(stand_in, query)
+        else:
+            self._send_text(404, '')
+
+    def _tasks(self, stand_in, query):
+        try:
+            limit = int(query.get('limit', [_DEFAULT_TASKS_LIMIT])[0])
+            offset = int(query.get('offset', [0])[0])
+        except ValueError:
+            self._send_text(400, 'Failed to parse query parameters')
+            return
+
+        order = query.get('order', ['des'])[0]
+        tasks = stand_in.tasks(descending=order != 'asc')
+        self.send_json(200, {'tasks': tasks[offset:offset + limit]})
+
+    def _shutdown(self, stand_in, query):
+        if 'frameworkId' not in query:
+            self._send_text(400, "Missing 'frameworkId' query parameter")
+        elif not stand_in.shutdown_framework(query['frameworkId'][0]):
+            self._send_text(400, 'No framework found with specified ID')
+        else:
+            self._send_text(200, '')
+
+    def _send_text(self, status, text):
+        self.send_data(status, text.encode('utf-8'),
+                       content_type='text/plain; charset=utf-8')
+
+
+class MesosStandIn(StandInServer):
+    """Runs a stand-in Mesos master on a local port for the lifetime of the
+    context manager.
+
+    :param state: the master state to serve; a generated one if None. It
+                  changes when frameworks are shut down.
+    :type state: dict
+    :param latency: number of seconds to wait before answering a request
+    :type latency: float
+    """
+
+    def __init__(self, state=None, latency=0.0):
+        StandInServer.__init__(self, MesosHandler)
+        self.state = generate_state() if state is None else state
+        self.latency = latency
+
+        # Encoding a large state takes much longer than sending it, so
+        # each document is encoded once until the state changes.
+        self._documents = {}
+        self._lock = threading.Lock()
+        self.server.stand_in = self
+
+    def document(self, name):
+        """
+        :param name: 'state', 'state-summary', 'frameworks' or 'slaves'
+        :type name: str
+        :returns: the encoded document of the master endpoint `name`
+        :rtype: bytes
+        """
+
+        with self._lock:
+            if name not in self._documents:
+                if name == 'state':
+                    document = self.state
+                elif name == 'state-summary':
+                    document = state_summary(self.state)
+                elif name == 'frameworks':
+                    document = dict(
+                        (key, self.state[key])
+                        for key in ('frameworks', 'completed_frameworks',
+                                    'unregistered_frameworks'))
+                else:
+                    document = {'slaves': self.state['slaves']}
+                self._documents[name] = json.dumps(document).encode('utf-8')
+
+            return self._documents[name]
+
+    def tasks(self, descending=True):
+        """
+        :param descending: whether the latest task comes first
+        :type descending: bool
+        :returns: the running and completed tasks of all the frameworks,
+                  in the order in which they started
+        :rtype: [dict]
+        """
+
+        with self._lock:
+            tasks = [task
+                     for key in ('frameworks', 'completed_frameworks')
+                     for framework in self.state[key]
+                     for task in (framework['tasks'] +
+                                  framework['completed_tasks'])]
+
+        return sorted(tasks,
+                      key=lambda task: task['statuses'][0]['timestamp'],
+                      reverse=descending)
+
+    def shutdown_framework(self, framework_id):
+        """Shuts down an active framework: kills its tasks and moves it to
+        the completed frameworks.
+
+        :param framework_id: the framework's id
+        :type framework_id: str
+        :returns: whether there was such a framework
+        :rtype: bool
+        """
+
+        with self._lock:
+            frameworks = self.state['frameworks']
+            matches = [f for f in frameworks if f['id'] == framework_id]
+            if not matches:
+                return False
+
+            framework = matches[0]
+            frameworks.remove(framework)
+
+            now = time.time()
+            slaves = dict((slave['id'], slave)
+                          for slave in self.state['slaves'])
+            for task in framework['tasks']:
+                used = slaves[task['slave_id']]['used_resources']
+                for name in ('cpus', 'disk', 'mem'):
+                    used[name] = round(used[name] - task['resources'][name],
+                                       6)
+                task['state'] = 'TASK_KILLED'
+                task['statuses'].append({'state': 'TASK_KILLED',
+                                         'timestamp': now})
+
+            framework['completed_tasks'].extend(framework['tasks'])
+            framework['tasks'] = []
+            framework['active'] = False
+            framework['unregistered_time'] = now
+            for name in ('resources', 'used_resources'):
+                framework[name] = {'cpus': 0.0, 'disk': 0.0, 'mem': 0.0}
+            self.state['completed_frameworks'].append(framework)
+
+            self._documents.clear()
+            return True
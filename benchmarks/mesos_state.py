@@ -0,0 +1,260 @@
+"""Synthetic Mesos master state.json documents."""
+
+import random
+
+_PREFIX = '20150513-185808-177048842-5050-1220'
+
+_START_TIME = 1431552866.52692
+
+_TERMINAL_STATES = ['TASK_FINISHED', 'TASK_FAILED', 'TASK_KILLED',
+                    'TASK_LOST']
+
+_APP_CPUS = [0.1, 0.25, 0.5, 1.0]
+_APP_MEM = [16, 32, 128, 512]
+
+
+def generate_state(agents=100, frameworks=5, tasks=1000, seed=0,
+                   completed_tasks=0, completed_frameworks=0):
+    """Generates a master state with `tasks` running tasks spread over
+    `agents` agents and `frameworks` frameworks.  The same arguments
+    always generate the same state.
+
+    :param agents: number of agents
+    :type agents: int
+    :param frameworks: number of frameworks
+    :type frameworks: int
+    :param tasks: number of running tasks
+    :type tasks: int
+    :param seed: seed of the random placement of the tasks
+    :type seed: int
+    :param completed_tasks: number of completed tasks, spread over all the
+                            frameworks
+    :type completed_tasks: int
+    :param completed_frameworks: number of frameworks that were shut down
+    :type completed_frameworks: int
+    :returns: master state
+    :rtype: dict
+    """
+
+    rand = random.Random(seed)
+
+    slaves = [_slave(i) for i in range(agents)]
+
+    framework_dicts = [_framework(i, active=True)
+                       for i in range(frameworks)]
+    completed_framework_dicts = [_framework(i, active=False)
+                                 for i in range(frameworks,
+                                                frameworks +
+                                                completed_frameworks)]
+
+    for i in range(tasks):
+        framework = rand.choice(framework_dicts)
+        framework['tasks'].append(
+            _task(i, framework, rand.choice(slaves), 'TASK_RUNNING'))
+
+    all_frameworks = framework_dicts + completed_framework_dicts
+    for i in range(tasks, tasks + completed_tasks):
+        framework = rand.choice(all_frameworks)
+        framework['completed_tasks'].append(
+            _task(i, framework, rand.choice(slaves),
+                  rand.choice(_TERMINAL_STATES)))
+
+    slave_index = dict((slave['id'], slave) for slave in slaves)
+    for framework in framework_dicts:
+        for task in framework['tasks']:
+            _add_resources(framework['used_resources'], task['resources'])
+            _add_resources(framework['resources'], task['resources'])
+            _add_resources(slave_index[task['slave_id']]['used_resources'],
+                           task['resources'])
+
+    return {'version': '0.28.1',
+            'id': _PREFIX,
+            'pid': 'master@10.0.0.1:5050',
+            'hostname': 'master.example.com',
+            'leader': 'master@10.0.0.1:5050',
+            'start_time': _START_TIME,
+            'elected_time': _START_TIME,
+            'activated_slaves': agents,
+            'deactivated_slaves': 0,
+            'slaves': slaves,
+            'frameworks': framework_dicts,
+            'completed_frameworks': completed_framework_dicts,
+            'orphan_tasks': [],
+            'unregistered_frameworks': []}
+
+
+def state_summary(state):
+    """Summarizes a master state the way master/state-summary does: the
+    slaves and frameworks with their resources and the number of their
+    tasks in each state, but without the tasks.
+
+    :param state: master state
+    :type state: dict
+    :returns: master state summary
+    :rtype: dict
+    """
+
+    slave_counts = dict((slave['id'], {}) for slave in state['slaves'])
+    slave_frameworks = dict((slave['id'], set())
+                            for slave in state['slaves'])
+
+    frameworks = []
+    for framework in state['frameworks']:
+        counts = {}
+        slave_ids = set()
+        for task in framework['tasks'] + framework['completed_tasks']:
+            for task_counts in (counts, slave_counts[task['slave_id']]):
+                task_counts[task['state']] = \
+                    task_counts.get(task['state'], 0) + 1
+            slave_ids.add(task['slave_id'])
+            slave_frameworks[task['slave_id']].add(framework['id'])
+
+        summary = dict((key, framework[key])
+                       for key in ('id', 'name', 'pid', 'hostname', 'active',
+                                   'used_resources', 'offered_resources',
+                                   'capabilities', 'webui_url'))
+        summary['slave_ids'] = sorted(slave_ids)
+        for task_state in ['TASK_STAGING', 'TASK_STARTING', 'TASK_RUNNING',
+                           'TASK_KILLING'] + _TERMINAL_STATES:
+            summary[task_state] = counts.get(task_state, 0)
+        frameworks.append(summary)
+
+    slaves = []
+    for slave in state['slaves']:
+        summary = dict((key, slave[key])
+                       for key in ('id', 'pid', 'hostname', 'active',
+                                   'registered_time', 'resources',
+                                   'used_resources', 'offered_resources',
+                                   'attributes'))
+        summary['framework_ids'] = sorted(slave_frameworks[slave['id']])
+        summary.update(slave_counts[slave['id']])
+        slaves.append(summary)
+
+    return {'hostname': state['hostname'],
+            'cluster': 'example',
+            'slaves': slaves,
+            'frameworks': frameworks}
+
+
+def _slave(index):
+    """
+    :param index: number of the agent
+    :type index: int
+    :returns: the agent's record
+    :rtype: dict
+    """
+
+    address = '10.{}.{}.{}'.format(index // 65536 % 256, index // 256 % 256,
+                                   index % 256)
+    return {'id': '{}-S{}'.format(_PREFIX, index),
+            'pid': 'slave(1)@{}:5051'.format(address),
+            'hostname': 'agent-{}.example.com'.format(index),
+            'registered_time': _START_TIME + index,
+            'active': True,
+            'version': '0.28.1',
+            'attributes': {'rack': 'rack-{}'.format(index % 16)},
+            'resources': {'cpus': 8.0, 'disk': 102400.0, 'mem': 32768.0,
+                          'ports': '[1025-2180, 2182-3887, 3889-5049, '
+                                   '5052-8079, 8082-8180, 8182-32000]'},
+            'used_resources': _resources(),
+            'offered_resources': _resources(),
+            'reserved_resources': {},
+            'unreserved_resources': {}}
+
+
+def _framework(index, active):
+    """
+    :param index: number of the framework
+    :type index: int
+    :param active: whether the framework is registered
+    :type active: bool
+    :returns: the framework's record, without tasks
+    :rtype: dict
+    """
+
+    return {'id': '{}-{:04d}'.format(_PREFIX, index),
+            'name': 'framework-{}'.format(index),
+            'pid': 'scheduler-{}@10.0.0.1:15101'.format(index),
+            'user': 'user-{}'.format(index),
+            'role': '*',
+            'principal': 'framework-{}'.format(index),
+            'active': active,
+            'checkpoint': True,
+            'failover_timeout': 604800.0,
+            'hostname': 'master.example.com',
+            'webui_url': 'http://master.example.com:{}'.format(8080 + index),
+            'registered_time': _START_TIME,
+            'unregistered_time': 0 if active else _START_TIME + 3600,
+            'reregistered_time': _START_TIME,
+            'capabilities': [],
+            'resources': _resources(),
+            'used_resources': _resources(),
+            'offered_resources': _resources(),
+            'offers': [],
+            'executors': [],
+            'tasks': [],
+            'completed_tasks': []}
+
+
+def _task(index, framework, slave, state):
+    """
+    :param index: number of the task
+    :type index: int
+    :param framework: the framework that launched the task
+    :type framework: dict
+    :param slave: the agent that runs the task
+    :type slave: dict
+    :param state: the task's state
+    :type state: str
+    :returns: the task's record
+    :rtype: dict
+    """
+
+    app = index % 1000
+    timestamp = _START_TIME + index
+    statuses = [{'state': 'TASK_RUNNING',
+                 'timestamp': timestamp,
+                 'container_status': {'network_infos': [{
+                     'ip_address': slave['pid'].split('@')[1][:-5]}]}}]
+    if state != 'TASK_RUNNING':
+        statuses.append({'state': state, 'timestamp': timestamp + 60})
+
+    return {'id': 'app-{}.{}'.format(app, index),
+            'name': 'app-{}'.format(app),
+            'framework_id': framework['id'],
+            'slave_id': slave['id'],
+            'state': state,
+            'executor_id': '',
+            'labels': [],
+            'discovery': {'name': 'app-{}'.format(app),
+                          'visibility': 'FRAMEWORK',
+                          'ports': {'ports': [{'number': 10000 + app,
+                                               'protocol': 'tcp'}]}},
+            'resources': {'cpus': _APP_CPUS[app % len(_APP_CPUS)],
+                          'disk': 0,
+                          'mem': _APP_MEM[app % len(_APP_MEM)],
+                          'ports': '[{0}-{0}]'.format(31000 + index % 1000)},
+            'statuses': statuses}
+
+
+def _resources():
+    """
+    :returns: an empty set of scalar resources
+    :rtype: dict
+    """
+
+    return {'cpus': 0.0, 'disk': 0.0, 'mem': 0.0}
+
+
+def _add_resources(total, resources):
+    """Adds the scalar `resources` to `total`.
+
+    :param total: the resources to add to
+    :type total: dict
+    :param resources: the resources of a task
+    :type resources: dict
+    :rtype: None
+    """
+
+    for name in ('cpus', 'disk', 'mem'):
+        total[name] = round(total[name] + resources[name], 6)
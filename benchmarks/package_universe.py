@@ -0,0 +1,104 @@
+"""Synthetic package registries in the layout of the universe repository."""
+
+import io
+import json
+import os
+import random
+import zipfile
+
+_WORDS = ['analytics', 'batch', 'cache', 'cassandra', 'cluster', 'data',
+          'database', 'distributed', 'elastic', 'framework', 'graph',
+          'hadoop', 'jenkins', 'kafka', 'logging', 'machine', 'message',
+          'metrics', 'monitoring', 'proxy', 'queue', 'scheduler', 'search',
+          'spark', 'storage', 'stream', 'web']
+
+
+def generate_index(packages=10000, seed=0):
+    """Generates a package index, as in repo/meta/index.json, with
+    `packages` packages.  The same arguments always generate the same
+    index.
+
+    :param packages: number of packages
+    :type packages: int
+    :param seed: seed of the random names, tags and descriptions
+    :type seed: int
+    :returns: package index
+    :rtype: dict
+    """
+
+    rand = random.Random(seed)
+
+    entries = []
+    for i in range(packages):
+        name = '{}-{}'.format(rand.choice(_WORDS), i)
+        description = 'The {} {} {} for DCOS, version {}.'.format(
+            rand.choice(_WORDS), rand.choice(_WORDS), rand.choice(_WORDS), i)
+        entries.append({
+            'name': name,
+            'currentVersion': '1.{}.0'.format(i % 10),
+            'versions': dict(('1.{}.0'.format(v), str(v))
+                             for v in range(i % 3 + 1)),
+            'description': description,
+            'framework': bool(i % 2),
+            'tags': rand.sample(_WORDS, 3),
+        })
+
+    return {'version': '1.0.0', 'packages': entries}
+
+
+def write_registry(base_path, index):
+    """Writes the metadata of a registry with the packages of `index`.
+
+    :param base_path: directory of the registry
+    :type base_path: str
+    :param index: package index
+    :type index: dict
+    :rtype: None
+    """
+
+    meta_dir = os.path.join(base_path, 'repo', 'meta')
+    os.makedirs(meta_dir)
+
+    with open(os.path.join(meta_dir, 'version.json'), 'w') as version_file:
+        json.dump({'version': index['version']}, version_file)
+    with open(os.path.join(meta_dir, 'index.json'), 'w') as index_file:
+        json.dump(index, index_file)
+
+
+def zip_registry(index, top_dir='universe-master', package_files=False):
+    """Packs the metadata of a registry with the packages of `index` the
+    way a repository host does, under a single top-level directory.
+
+    :param index: package index
+    :type index: dict
+    :param top_dir: name of the top-level directory
+    :type top_dir: str
+    :param package_files: whether to add a package.json file for every
+                          version of every package
+    :type package_files: bool
+    :returns: the zip file
+    :rtype: bytes
+    """
+
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w', zipfile.ZIP_DEFLATED) as registry_zip:
+        registry_zip.writestr(top_dir + '/repo/meta/version.json',
+                              json.dumps({'version': index['version']}))
+        registry_zip.writestr(top_dir + '/repo/meta/index.json',
+                              json.dumps(index))
+        registry_zip.writestr(top_dir + '/scripts/0-validate-version.sh',
+                              '#!/bin/sh\nexit 0\n')
+
+        if package_files:
+            for entry in index['packages']:
+                for version, release in entry['versions'].items():
+                    path = '{}/repo/packages/{}/{}/{}/package.json'.format(
+                        top_dir, entry['name'][0].upper(), entry['name'],
+                        release)
+                    registry_zip.writestr(path, json.dumps({
+                        'name': entry['name'],
+                        'version': version,
+                        'description': entry['description'],
+                        'tags': entry['tags']}))
+
+    return data.getvalue()
@@ -0,0 +1,212 @@
+"""Local HTTP stand-in servers for benchmarks and tests. They bind to a
+random port on the loopback interface and run in a daemon thread."""
+
+import json
+import threading
+
+from dcos import http
+
+from six.moves import BaseHTTPServer, socketserver
+
+
+class _CountingServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Threaded HTTP server that counts accepted TCP connections."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, handler_class):
+        BaseHTTPServer.HTTPServer.__init__(self, address, handler_class)
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def get_request(self):
+        request = BaseHTTPServer.HTTPServer.get_request(self)
+        with self._lock:
+            self.connections += 1
+        return request
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+
+class StandInHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Base request handler. Speaks HTTP/1.1 so that clients can keep
+    connections alive, and stays quiet on stderr.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def send_json(self, status, body, headers=None):
+        """Sends `body` as a JSON response.
+
+        :param status: HTTP status code
+        :type status: int
+        :param body: JSON serializable response body
+        :type body: dict | list
+        :param headers: additional response headers
+        :type headers: dict
+        :rtype: None
+        """
+
+        self.send_data(status, json.dumps(body).encode('utf-8'), headers)
+
+    def send_data(self, status, data, headers=None,
+                  content_type='application/json'):
+        """Sends `data` as the response body.
+
+        :param status: HTTP status code
+        :type status: int
+        :param data: response body
+        :type data: bytes
+        :param headers: additional response headers
+        :type headers: dict
+        :param content_type: media type of `data`
+        :type content_type: str
+        :rtype: None
+        """
+
+        self.server.count_request()
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def start_event_stream(self):
+        """Starts a text/event-stream response.  Its body is sent in
+        chunks, so that each event reaches the client as soon as it is
+        sent.
+
+        :rtype: None
+        """
+
+        self.server.count_request()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def send_event(self, event_type, data):
+        """Sends a server-sent event on a stream started with
+        :py:meth:`start_event_stream`.
+
+        :param event_type: type of the event
+        :type event_type: str
+        :param data: JSON serializable event data
+        :type data: dict
+        :rtype: None
+        """
+
+        self._send_chunk('event: {}\ndata: {}\n\n'.format(
+            event_type, json.dumps(data)).encode('utf-8'))
+
+    def end_event_stream(self):
+        """Ends a stream started with :py:meth:`start_event_stream`.
+
+        :rtype: None
+        """
+
+        self._send_chunk(b'')
+
+    def _send_chunk(self, data):
+        self.wfile.write('{:x}\r\n'.format(len(data)).encode('ascii'))
+        self.wfile.write(data + b'\r\n')
+        self.wfile.flush()
+
+    def read_body(self):
+        """
+        :returns: the request body
+        :rtype: bytes
+        """
+
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class EmptyJsonHandler(StandInHandler):
+    """Answers every request with an empty JSON object."""
+
+    def do_GET(self):
+        self.send_json(200, {})
+
+    do_POST = do_PUT = do_DELETE = do_GET
+
+
+class StandInServer(object):
+    """Runs `handler_class` on a local port for the lifetime of the
+    context manager.  On exit, the pooled HTTP sessions of `dcos.http` are
+    closed too.
+
+    :param handler_class: request handler
+    :type handler_class: StandInHandler
+    """
+
+    def __init__(self, handler_class=EmptyJsonHandler):
+        self._server = _CountingServer(('127.0.0.1', 0), handler_class)
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        kwargs={'poll_interval': 0.05})
+        self._thread.daemon = True
+
+    @property
+    def server(self):
+        """
+        :returns: the underlying HTTP server
+        :rtype: socketserver.TCPServer
+        """
+
+        return self._server
+
+    @property
+    def url(self):
+        """
+        :returns: base URL of the server, ending with a slash
+        :rtype: str
+        """
+
+        host, port = self._server.server_address[:2]
+        return 'http://{}:{}/'.format(host, port)
+
+    @property
+    def connections(self):
+        """
+        :returns: number of TCP connections accepted so far
+        :rtype: int
+        """
+
+        return self._server.connections
+
+    @property
+    def requests(self):
+        """
+        :returns: number of requests answered so far
+        :rtype: int
+        """
+
+        return self._server.requests
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        # Drop the pooled connections to this server along with it
+        http.close_sessions()
+        self.stop()
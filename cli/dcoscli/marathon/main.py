@@ -5,14 +5,20 @@ Usage:
     dcos marathon --info
     dcos marathon about
     dcos marathon app add [<app-resource>]
-    dcos marathon app list [--json]
-    dcos marathon app remove [--force] <app-id>
-    dcos marathon app restart [--force] <app-id>
+    dcos marathon app diff [--json --app-version=<app-version>] <app-id>
+         [<app-resource>]
+    dcos marathon app list [--json --fields=<fields>]
+    dcos marathon app remove [--force --json --wait] <app-ids>...
+    dcos marathon app restart [--force --json --wait] <app-ids>...
+    dcos marathon app scale [--force --json --wait] <instances>
+         <app-ids>...
     dcos marathon app show [--app-version=<app-version>] <app-id>
-    dcos marathon app start [--force] <app-id> [<instances>]
-    dcos marathon app stop [--force] <app-id>
-    dcos marathon app update [--force] <app-id> [<properties>...]
+    dcos marathon app start [--force --wait] <app-id> [<instances>]
+    dcos marathon app stop [--force --wait] <app-id>
+    dcos marathon app update [--force --wait] <app-id> [<properties>...]
     dcos marathon app version list [--max-count=<max-count>] <app-id>
+    dcos marathon deploy [--force --json --wait --timeout=<timeout>]
+         <app-dir>
     dcos marathon deployment list [--json <app-id>]
     dcos marathon deployment rollback <deployment-id>
     dcos marathon deployment stop <deployment-id>
@@ -21,10 +27,13 @@ Usage:
     dcos marathon task list [--json <app-id>]
     dcos marathon task show <task-id>
     dcos marathon group add [<group-resource>]
+    dcos marathon group diff [--json --group-version=<group-version>]
+         <group-id> [<group-resource>]
     dcos marathon group list [--json]
     dcos marathon group show [--group-version=<group-version>] <group-id>
     dcos marathon group remove [--force] <group-id>
-    dcos marathon group update [--force] <group-id> [<properties>...]
+    dcos marathon group update [--force --wait] <group-id>
+         [<properties>...]
 
 Options:
     -h, --help                       Show this screen
@@ -48,7 +57,9 @@ Options:
                                      values must be specified as a negative
                                      integer and they represent the version
                                      from the currently deployed application
-                                     definition
+                                     definition. `app diff` compares this
+                                     version, by default -1, with the deployed
+                                     application or with <app-resource>
 
     --group-version=<group-version>  This flag specifies the group version to
                                      use for the command. The group version
@@ -58,7 +69,10 @@ Options:
                                      date format. Relative values must be
                                      specified as a negative integer and they
                                      represent the version from the currently
-                                     deployed group definition
+                                     deployed group definition. `group diff`
+                                     compares this version, by default -1,
+                                     with the deployed group or with
+                                     <group-resource>
 
     --config-schema                  Show the configuration schema for the
                                      Marathon subcommand
@@ -68,12 +82,38 @@ Options:
 
     --interval=<interval>            Number of seconds to wait between actions
 
+    --wait                           Wait until the deployments that the
+                                     command started finished, and fail if any
+                                     of them failed
+
+    --timeout=<timeout>              Maximum number of seconds that `deploy`
+                                     waits for the deployments of the apps,
+                                     by default 600
+
+    --fields=<fields>                Comma-separated list of the application
+                                     fields to print. E.g.
+                                     id,instances,tasksRunning. Only these
+                                     fields are fetched and kept
+
 Positional Arguments:
     <app-id>                    The application id
 
+    <app-ids>                   One or more application ids or unix glob
+                                patterns over the ids of the deployed
+                                applications. E.g. /group/*. Several
+                                applications are changed concurrently and
+                                the result for each one is summarized.
+
+    <app-dir>                   Directory of application JSON definitions,
+                                one app per .json file, searched recursively.
+                                The apps are added or updated concurrently,
+                                each one once the deployments of the apps it
+                                depends on finished.
+
     <app-resource>              Path to a file containing the app's JSON
                                 definition. If omitted, the definition is read
-                                from stdin. For a detailed description see
+                                from stdin, except by `app diff`. For a
+                                detailed description see
                                 (https://mesosphere.github.io/
                                 marathon/docs/rest-api.html#post-/v2/apps).
 
@@ -83,11 +123,13 @@ Positional Arguments:
 
     <group-resource>            Path to a file containing the group's JSON
                                 definition. If omitted, the definition is read
-                                from stdin. For a detailed description see
+                                from stdin, except by `group diff`. For a
+                                detailed description see
                                 (https://mesosphere.github.io/
                                 marathon/docs/rest-api.html#post-/v2/groups).
 
-    <instances>                 The number of instances to start
+    <instances>                 The number of instances to start, or to
+                                scale to
 
     <properties>                Must be of the format <key>=<value>. E.g.
                                 cpus=2.0. If omitted, properties are read from
@@ -95,20 +137,26 @@ Positional Arguments:
 
     <task-id>                   The task id
 """
+import functools
 import json
+import os
 import sys
 import time
 
 import dcoscli
 import docopt
 import pkg_resources
-from dcos import cmds, emitting, jsonitem, marathon, options, util
+from dcos import (cmds, emitting, http, jsondiff, jsonitem, marathon,
+                  options, util)
 from dcos.errors import DCOSException
 from dcoscli import tables
 
 logger = util.get_logger(__name__)
 emitter = emitting.FlatEmitter()
 
+DEFAULT_DEPLOY_TIMEOUT = 600
+"""Default number of seconds that `deploy` waits for deployments"""
+
 
 def main():
     try:
@@ -140,6 +188,12 @@ def _cmds():
             arg_keys=['<app-id>', '--max-count'],
             function=_version_list),
 
+        cmds.Command(
+            hierarchy=['marathon', 'deploy'],
+            arg_keys=['<app-dir>', '--force', '--json', '--wait',
+                      '--timeout'],
+            function=_deploy),
+
         cmds.Command(
             hierarchy=['marathon', 'deployment', 'list'],
             arg_keys=['<app-id>', '--json'],
@@ -177,14 +231,26 @@ def _cmds():
 
         cmds.Command(
             hierarchy=['marathon', 'app', 'list'],
-            arg_keys=['--json'],
+            arg_keys=['--json', '--fields'],
             function=_list),
 
         cmds.Command(
             hierarchy=['marathon', 'app', 'remove'],
-            arg_keys=['<app-id>', '--force'],
+            arg_keys=['<app-ids>', '--force', '--json', '--wait'],
             function=_remove),
 
+        cmds.Command(
+            hierarchy=['marathon', 'app', 'scale'],
+            arg_keys=['<app-ids>', '<instances>', '--force', '--json',
+                      '--wait'],
+            function=_scale),
+
+        cmds.Command(
+            hierarchy=['marathon', 'app', 'diff'],
+            arg_keys=['<app-id>', '--app-version', '<app-resource>',
+                      '--json'],
+            function=_diff),
+
         cmds.Command(
             hierarchy=['marathon', 'app', 'show'],
             arg_keys=['<app-id>', '--app-version'],
@@ -192,22 +258,22 @@ def _cmds():
 
         cmds.Command(
             hierarchy=['marathon', 'app', 'start'],
-            arg_keys=['<app-id>', '<instances>', '--force'],
+            arg_keys=['<app-id>', '<instances>', '--force', '--wait'],
             function=_start),
 
         cmds.Command(
             hierarchy=['marathon', 'app', 'stop'],
-            arg_keys=['<app-id>', '--force'],
+            arg_keys=['<app-id>', '--force', '--wait'],
             function=_stop),
 
         cmds.Command(
             hierarchy=['marathon', 'app', 'update'],
-            arg_keys=['<app-id>', '<properties>', '--force'],
+            arg_keys=['<app-id>', '<properties>', '--force', '--wait'],
             function=_update),
 
         cmds.Command(
             hierarchy=['marathon', 'app', 'restart'],
-            arg_keys=['<app-id>', '--force'],
+            arg_keys=['<app-ids>', '--force', '--json', '--wait'],
             function=_restart),
 
         cmds.Command(
@@ -220,6 +286,12 @@ def _cmds():
             arg_keys=['--json'],
             function=_group_list),
 
+        cmds.Command(
+            hierarchy=['marathon', 'group', 'diff'],
+            arg_keys=['<group-id>', '--group-version', '<group-resource>',
+                      '--json'],
+            function=_group_diff),
+
         cmds.Command(
             hierarchy=['marathon', 'group', 'show'],
             arg_keys=['<group-id>', '--group-version'],
@@ -232,7 +304,7 @@ def _cmds():
 
         cmds.Command(
             hierarchy=['marathon', 'group', 'update'],
-            arg_keys=['<group-id>', '<properties>', '--force'],
+            arg_keys=['<group-id>', '<properties>', '--force', '--wait'],
             function=_group_update),
 
         cmds.Command(
@@ -346,18 +418,38 @@ def _add(app_resource):
     return 0
 
 
-def _list(json_):
+def _list(json_, fields):
     """
     :param json_: output json if True
     :type json_: bool
+    :param fields: comma-separated app fields to print; all of them if None
+    :type fields: str
     :returns: process return code
     :rtype: int
     """
 
     client = marathon.create_client()
-    apps = client.get_apps()
 
-    emitting.publish_table(emitter, apps, tables.app_table, json_)
+    if fields is not None:
+        fields = [field.strip() for field in fields.split(',')
+                  if field.strip()]
+        if not fields:
+            raise DCOSException('--fields must name at least one field')
+
+        apps = client.get_apps(embed=marathon.app_embeds(fields),
+                               fields=fields)
+        emitting.publish_table(emitter,
+                               apps,
+                               functools.partial(tables.app_fields_table,
+                                                 fields=fields),
+                               json_)
+    elif json_:
+        emitter.publish(client.get_apps())
+    else:
+        apps = client.get_apps(embed=marathon.app_embeds(tables.APP_FIELDS),
+                               fields=tables.APP_FIELDS)
+        emitting.publish_table(emitter, apps, tables.app_table, json_)
+
     return 0
 
 
@@ -408,21 +500,147 @@ def _group_add(group_resource):
     return 0
 
 
-def _remove(app_id, force):
+def _remove(app_ids, force, json_, wait):
     """
-    :param app_id: ID of the app to remove
-    :type app_id: str
+    :param app_ids: IDs or glob patterns of the apps to remove
+    :type app_ids: [str]
     :param force: Whether to override running deployments.
     :type force: bool
+    :param json_: output json if True
+    :type json_: bool
+    :param wait: Whether to wait for the deployments to finish
+    :type wait: bool
     :returns: process return code
     :rtype: int
     """
 
     client = marathon.create_client()
-    client.remove_app(app_id, force)
+
+    if not _is_bulk(app_ids, json_):
+        deployment = client.remove_app(app_ids[0], force)
+        _wait(client, [deployment], wait)
+        return 0
+
+    return _bulk(client,
+                 app_ids,
+                 lambda app_id: client.remove_app(app_id, force),
+                 json_,
+                 wait)
+
+
+def _scale(app_ids, instances, force, json_, wait):
+    """
+    :param app_ids: IDs or glob patterns of the apps to scale
+    :type app_ids: [str]
+    :param instances: the number of instances to scale to
+    :type instances: str
+    :param force: Whether to override running deployments.
+    :type force: bool
+    :param json_: output json if True
+    :type json_: bool
+    :param wait: Whether to wait for the deployments to finish
+    :type wait: bool
+    :returns: process return code
+    :rtype: int
+    """
+
+    instances = util.parse_int(instances)
+    if instances < 0:
+        raise DCOSException(
+            'The number of instances must not be negative: {!r}.'.format(
+                instances))
+
+    client = marathon.create_client()
+
+    def scale(app_id):
+        return client.scale_app(app_id, instances, force)
+
+    if not _is_bulk(app_ids, json_):
+        deployment = scale(app_ids[0])
+        emitter.publish('Created deployment {}'.format(deployment))
+        _wait(client, [deployment], wait)
+        return 0
+
+    return _bulk(client, app_ids, scale, json_, wait)
+
+
+def _is_bulk(app_ids, json_):
+    """
+    :param app_ids: IDs or glob patterns of apps
+    :type app_ids: [str]
+    :param json_: whether json output was requested
+    :type json_: bool
+    :returns: whether to change the apps concurrently and summarize the
+              results, rather than to change a single app
+    :rtype: bool
+    """
+
+    return (json_ or len(app_ids) > 1 or
+            marathon.is_app_id_pattern(app_ids[0]))
+
+
+def _bulk(client, app_ids, operation, json_, wait=False):
+    """Applies `operation` to the matching apps concurrently, on a worker
+    pool bounded by `core.http_pool_size`, and publishes the result for
+    each app.
+
+    :param client: Marathon client
+    :type client: dcos.marathon.Client
+    :param app_ids: IDs or glob patterns of the apps
+    :type app_ids: [str]
+    :param operation: changes an app and returns the deployment ID
+    :type operation: str -> str
+    :param json_: output json if True
+    :type json_: bool
+    :param wait: Whether to wait for the deployments to finish
+    :type wait: bool
+    :returns: process return code: 1 if the operation failed for any app
+    :rtype: int
+    """
+
+    app_ids = client.match_app_ids(app_ids)
+
+    outcomes = http.gather(
+        [functools.partial(operation, app_id) for app_id in app_ids],
+        return_exceptions=True)
+
+    results = []
+    for app_id, outcome in zip(app_ids, outcomes):
+        if isinstance(outcome, DCOSException):
+            results.append({'id': app_id,
+                            'deploymentId': None,
+                            'error': str(outcome)})
+        else:
+            results.append({'id': app_id,
+                            'deploymentId': outcome,
+                            'error': None})
+
+    emitting.publish_table(emitter, results, tables.app_result_table, json_)
+
+    _wait(client, [result['deploymentId'] for result in results], wait)
+
+    if any(result['error'] is not None for result in results):
+        return 1
     return 0
 
 
+def _wait(client, deployment_ids, wait, timeout=None):
+    """
+    :param client: Marathon client
+    :type client: dcos.marathon.Client
+    :param deployment_ids: the deployments that the command started
+    :type deployment_ids: [str]
+    :param wait: Whether to wait for the deployments to finish
+    :type wait: bool
+    :param timeout: maximum number of seconds to wait
+    :type timeout: float
+    :rtype: None
+    """
+
+    if wait:
+        client.wait_for_deployments(deployment_ids, timeout)
+
+
 def _group_remove(group_id, force):
     """
     :param group_id: ID of the app to remove
@@ -473,13 +691,134 @@ def _group_show(group_id, version=None):
 
     client = marathon.create_client()
 
+    if version is not None:
+        version = _calculate_version(client, group_id, version, group=True)
+
     app = client.get_group(group_id, version=version)
 
     emitter.publish(app)
     return 0
 
 
-def _group_update(group_id, properties, force):
+def _diff(app_id, version, app_resource, json_):
+    """Show the changes between two definitions of a Marathon application.
+
+    :param app_id: The id for the application
+    :type app_id: str
+    :param version: The version to compare, either absolute (date-time) or
+                    relative
+    :type version: str
+    :param app_resource: optional filename of the definition to compare
+                         with
+    :type app_resource: str
+    :param json_: Whether to output a JSON patch
+    :type json_: bool
+    :returns: process return code
+    :rtype: int
+    """
+
+    client = marathon.create_client()
+    return _publish_diff(client, client.get_app, app_id, version,
+                         app_resource, json_, group=False)
+
+
+def _group_diff(group_id, version, group_resource, json_):
+    """Show the changes between two definitions of a Marathon group.
+
+    :param group_id: The id for the group
+    :type group_id: str
+    :param version: The version to compare, either absolute (date-time) or
+                    relative
+    :type version: str
+    :param group_resource: optional filename of the definition to compare
+                           with
+    :type group_resource: str
+    :param json_: Whether to output a JSON patch
+    :type json_: bool
+    :returns: process return code
+    :rtype: int
+    """
+
+    client = marathon.create_client()
+    return _publish_diff(client, client.get_group, group_id, version,
+                         group_resource, json_, group=True)
+
+
+def _publish_diff(client, get, id_, version, resource, json_, group):
+    """Compares a version of an app or group with either the deployed
+    definition or a local file.  An app is only compared on the fields
+    that the file sets.
+
+    :param client: Marathon client
+    :type client: dcos.marathon.Client
+    :param get: returns the app or group, e.g. `client.get_app`
+    :type get: function
+    :param id_: The id of the app or group
+    :type id_: str
+    :param version: The version to compare; the deployed definition if
+                    `resource` is set, and the previous version otherwise,
+                    if None
+    :type version: str
+    :param resource: optional filename of the definition to compare with
+    :type resource: str
+    :param json_: Whether to output a JSON patch
+    :type json_: bool
+    :param group: whether `id_` is the ID of a group
+    :type group: bool
+    :returns: process return code
+    :rtype: int
+    """
+
+    if resource is None:
+        new = get(id_)
+        if version is None:
+            version = '-1'
+    else:
+        with util.open_file(resource) as resource_file:
+            new = util.load_json(resource_file)
+
+    if version is not None:
+        version = _calculate_version(client, id_, version, group)
+    old = marathon.definition(get(id_, version=version))
+    new = marathon.definition(new)
+
+    if resource is not None and not group:
+        # `app update` leaves the fields that are not in the file as they
+        # are
+        old = dict((key, value) for key, value in old.items() if key in new)
+
+    changes = jsondiff.diff(old, new)
+
+    if json_:
+        emitter.publish(jsondiff.to_patch(changes))
+    elif changes:
+        emitter.publish('\n'.join(_diff_lines(changes)))
+
+    return 0
+
+
+def _diff_lines(changes):
+    """
+    :param changes: changes between two definitions
+    :type changes: [dcos.jsondiff.Change]
+    :returns: a line for each removed and each added value
+    :rtype: [str]
+    """
+
+    lines = []
+    for change in changes:
+        path = jsondiff.pointer(change.path) or '/'
+        if change.op != 'add':
+            lines.append('- {}: {}'.format(
+                path, json.dumps(change.old, sort_keys=True)))
+        if change.op != 'remove':
+            lines.append('+ {}: {}'.format(
+                path, json.dumps(change.new, sort_keys=True)))
+
+    return lines
+
+
+def _group_update(group_id, properties, force, wait):
     """
     :param group_id: the id of the group
     :type group_id: str
@@ -487,6 +826,8 @@ def _group_update(group_id, properties, force):
     :type properties: [str]
     :param force: whether to override running deployments
     :type force: bool
+    :param wait: Whether to wait for the deployment to finish
+    :type wait: bool
     :returns: process return code
     :rtype: int
     """
@@ -500,10 +841,11 @@ def _group_update(group_id, properties, force):
     deployment = client.update_group(group_id, group_resource, force)
 
     emitter.publish('Created deployment {}'.format(deployment))
+    _wait(client, [deployment], wait)
     return 0
 
 
-def _start(app_id, instances, force):
+def _start(app_id, instances, force, wait):
     """Start a Marathon application.
 
     :param app_id: the id for the application
@@ -512,6 +854,8 @@ def _start(app_id, instances, force):
     :type instances: str
     :param force: whether to override running deployments
     :type force: bool
+    :param wait: Whether to wait for the deployment to finish
+    :type wait: bool
     :returns: process return code
     :rtype: int
     """
@@ -547,17 +891,20 @@ def _start(app_id, instances, force):
     deployment = client.update_app(app_id, app_json, force)
 
     emitter.publish('Created deployment {}'.format(deployment))
+    _wait(client, [deployment], wait)
 
     return 0
 
 
-def _stop(app_id, force):
+def _stop(app_id, force, wait):
     """Stop a Marathon application
 
     :param app_id: the id of the application
     :type app_id: str
     :param force: whether to override running deployments
     :type force: bool
+    :param wait: Whether to wait for the deployment to finish
+    :type wait: bool
     :returns: process return code
     :rtype: int
     """
@@ -579,9 +926,10 @@ def _stop(app_id, force):
     deployment = client.update_app(app_id, app_json, force)
 
     emitter.publish('Created deployment {}'.format(deployment))
+    _wait(client, [deployment], wait)
 
 
-def _update(app_id, properties, force):
+def _update(app_id, properties, force, wait):
     """
     :param app_id: the id of the application
     :type app_id: str
@@ -589,6 +937,8 @@ def _update(app_id, properties, force):
     :type properties: [str]
     :param force: whether to override running deployments
     :type force: bool
+    :param wait: Whether to wait for the deployment to finish
+    :type wait: bool
     :returns: process return code
     :rtype: int
     """
@@ -602,6 +952,7 @@ def _update(app_id, properties, force):
     deployment = client.update_app(app_id, app_resource, force)
 
     emitter.publish('Created deployment {}'.format(deployment))
+    _wait(client, [deployment], wait)
     return 0
 
 
@@ -640,18 +991,30 @@ def _parse_properties(properties, schema):
     return resource_json
 
 
-def _restart(app_id, force):
+def _restart(app_ids, force, json_, wait):
     """
-    :param app_id: the id of the application
-    :type app_id: str
+    :param app_ids: the ids or glob patterns of the applications
+    :type app_ids: [str]
     :param force: whether to override running deployments
     :type force: bool
+    :param json_: output json if True
+    :type json_: bool
+    :param wait: Whether to wait for the deployments to finish
+    :type wait: bool
     :returns: process return code
     :rtype: int
     """
 
     client = marathon.create_client()
 
+    if _is_bulk(app_ids, json_):
+        return _bulk(client,
+                     app_ids,
+                     lambda app_id: _restart_app(client, app_id, force),
+                     json_,
+                     wait)
+
+    app_id = app_ids[0]
     desc = client.get_app(app_id)
 
     if desc['instances'] <= 0:
@@ -666,9 +1029,30 @@ def _restart(app_id, force):
     payload = client.restart_app(app_id, force)
 
     emitter.publish('Created deployment {}'.format(payload['deploymentId']))
+    _wait(client, [payload['deploymentId']], wait)
     return 0
 
 
+def _restart_app(client, app_id, force):
+    """
+    :param client: Marathon client
+    :type client: dcos.marathon.Client
+    :param app_id: the id of the application
+    :type app_id: str
+    :param force: whether to override running deployments
+    :type force: bool
+    :returns: the deployment id
+    :rtype: str
+    """
+
+    if client.get_app(app_id)['instances'] <= 0:
+        raise DCOSException(
+            'Unable to perform rolling restart of application {!r} '
+            'because it has no running tasks'.format(app_id))
+
+    return client.restart_app(app_id, force)['deploymentId']
+
+
 def _version_list(app_id, max_count):
     """
     :param app_id: the id of the application
@@ -690,6 +1074,106 @@ def _version_list(app_id, max_count):
     return 0
 
 
+def _deploy(app_dir, force, json_, wait, timeout):
+    """Adds or updates all the apps defined in a directory.
+
+    :param app_dir: directory of app definitions
+    :type app_dir: str
+    :param force: Whether to override running deployments.
+    :type force: bool
+    :param json_: output json if True
+    :type json_: bool
+    :param wait: Whether to wait for the deployments to finish
+    :type wait: bool
+    :param timeout: maximum number of seconds to wait for deployments,
+                    both for those that other apps depend on and, with
+                    `wait`, for the rest
+    :type timeout: str
+    :returns: process return code: 1 if any app was not deployed
+    :rtype: int
+    """
+
+    timeout = (DEFAULT_DEPLOY_TIMEOUT if timeout is None
+               else util.parse_int(timeout))
+    deadline = time.time() + timeout
+
+    apps = _read_app_dir(app_dir)
+
+    client = marathon.create_client()
+
+    results = []
+    for result in client.deploy_apps(apps, force, timeout=timeout):
+        results.append(result)
+        if not json_:
+            emitter.publish(_deploy_progress(result))
+
+    emitting.publish_table(emitter, results, tables.app_result_table, json_)
+
+    _wait(client, [result['deploymentId'] for result in results], wait,
+          max(deadline - time.time(), 0))
+
+    if any(result['error'] is not None for result in results):
+        return 1
+    return 0
+
+
+def _read_app_dir(app_dir):
+    """
+    :param app_dir: directory of app definitions
+    :type app_dir: str
+    :returns: the definitions in the .json files under `app_dir`, in the
+              order of their paths
+    :rtype: [dict]
+    """
+
+    if not os.path.isdir(app_dir):
+        raise DCOSException('{!r} is not a directory'.format(app_dir))
+
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(app_dir):
+        dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+        paths.extend(os.path.join(dirpath, name)
+                     for name in filenames
+                     if name.endswith('.json'))
+
+    schema = _app_schema()
+    apps = []
+    for path in sorted(paths):
+        with util.open_file(path) as app_file:
+            app = util.load_json(app_file)
+
+        errs = util.validate_json(app, schema)
+        if errs:
+            raise DCOSException('Error in {}:\n{}'.format(
+                path, util.list_to_err(errs)))
+
+        apps.append(app)
+
+    if not apps:
+        raise DCOSException('No app definitions in {!r}'.format(app_dir))
+
+    return apps
+
+
+def _deploy_progress(result):
+    """
+    :param result: the result of deploying an app
+    :type result: dict
+    :returns: a line that reports the result
+    :rtype: str
+    """
+
+    if result['error'] is not None:
+        return 'Failed to {} {}: {}'.format(
+            result['action'], result['id'], result['error'])
+
+    verb = 'Added' if result['action'] == 'add' else 'Updated'
+    if result['deploymentId'] is None:
+        return '{} {}'.format(verb, result['id'])
+    return '{} {}: deployment {}'.format(
+        verb, result['id'], result['deploymentId'])
+
+
 def _deployment_list(app_id, json_):
     """
     :param app_id: the application id
@@ -744,9 +1228,10 @@ def _deployment_watch(deployment_id, max_count, interval):
     """
     :param deployment_id: the application id
     :type deployment_di: str
-    :param max_count: maximum number of polling calls
+    :param max_count: maximum number of updates to print
     :type max_count: str
-    :param interval: wait interval in seconds between polling calls
+    :param interval: wait interval in seconds between polling calls, if
+                     Marathon's event stream is unavailable
     :type interval: str
     :returns: process return code
     :rtype: int
@@ -759,16 +1244,8 @@ def _deployment_watch(deployment_id, max_count, interval):
 
     client = marathon.create_client()
 
-    count = 0
-    while max_count is None or count < max_count:
-        deployment = client.get_deployment(deployment_id)
-
-        if deployment is None:
-            return 0
-
-        emitter.publish(deployment)
-        time.sleep(interval)
-        count += 1
+    for update in client.watch_deployment(deployment_id, max_count, interval):
+        emitter.publish(update)
 
     return 0
 
@@ -808,14 +1285,16 @@ def _task_show(task_id):
     return 0
 
 
-def _calculate_version(client, app_id, version):
+def _calculate_version(client, app_id, version, group=False):
     """
     :param client: Marathon client
     :type client: dcos.marathon.Client
-    :param app_id: The ID of the application
+    :param app_id: The ID of the application or group
     :type app_id: str
     :param version: Relative or absolute version or None
     :type version: str
+    :param group: whether `app_id` is the ID of a group
+    :type group: bool
     :returns: The absolute version as an ISO8601 date-time
     :rtype: str
     """
@@ -830,11 +1309,15 @@ def _calculate_version(client, app_id, version):
             value = -1 * value
             # We have a negative value let's ask Marathon for the last
             # abs(value)
-            versions = client.get_app_versions(app_id, value + 1)
+            if group:
+                versions = client.get_group_versions(app_id, value + 1)
+                msg = "Group {!r} only has {!r} version(s)."
+            else:
+                versions = client.get_app_versions(app_id, value + 1)
+                msg = "Application {!r} only has {!r} version(s)."
 
             if len(versions) <= value:
                 # We don't have enough versions. Return an error.
-                msg = "Application {!r} only has {!r} version(s)."
                 raise DCOSException(msg.format(app_id, len(versions), value))
             else:
                 return versions[value]
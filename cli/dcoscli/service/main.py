@@ -2,7 +2,7 @@
 
 Usage:
     dcos service --info
-    dcos service [--inactive --json]
+    dcos service [--inactive --json --no-cache]
     dcos service shutdown <service-id>
 
 Options:
@@ -16,6 +16,9 @@ Options:
                   Inactive services are those that have been disconnected from
                   master, but haven't yet reached their failover timeout.
 
+    --no-cache    Fetch the state from the Mesos master even if
+                  core.state_cache_ttl enables the local state cache
+
     --version     Show version
 
 Positional Arguments:
@@ -69,7 +72,7 @@ def _cmds():
 
         cmds.Command(
             hierarchy=['service'],
-            arg_keys=['--inactive', '--json'],
+            arg_keys=['--inactive', '--json', '--no-cache'],
             function=_service),
     ]
 
@@ -87,7 +90,7 @@ def _info():
 
 # TODO (mgummelt): support listing completed services as well.
 # blocked on framework shutdown.
-def _service(inactive, is_json):
+def _service(inactive, is_json, no_cache):
     """List dcos services
 
     :param inactive: If True, include completed tasks
@@ -95,11 +98,20 @@ def _service(inactive, is_json):
     :param is_json: If true, output json.
         Otherwise, output a human readable table.
     :type is_json: bool
+    :param no_cache: If True, bypass the local state cache
+    :type no_cache: bool
     :returns: process return code
     :rtype: int
     """
 
-    services = mesos.get_master().frameworks(inactive=inactive)
+    # The table only needs the summaries of the frameworks
+    if is_json:
+        view = mesos.SERVICES_VIEW
+    else:
+        view = mesos.SERVICES_SUMMARY_VIEW
+
+    master = mesos.get_master(view=view, use_cache=not no_cache)
+    services = master.frameworks(inactive=inactive)
 
     if is_json:
         emitter.publish([service.dict() for service in services])
@@ -121,5 +133,7 @@ def _shutdown(service_id):
     :rtype: int
     """
 
-    mesos.get_master_client().shutdown_framework(service_id)
+    # The client clears the state cache, so that `dcos service` does not
+    # list the service as active anymore
+    mesos.get_master_client(use_cache=True).shutdown_framework(service_id)
     return 0
@@ -1,4 +1,5 @@
 import copy
+import json
 from collections import OrderedDict
 
 from dcos import util
@@ -12,7 +13,33 @@ def task_table(tasks):
     :rtype: PrettyTable
     """
 
-    fields = OrderedDict([
+    tb = util.table(_task_fields(), tasks, sortby="NAME")
+    tb.align["NAME"] = "l"
+    tb.align["HOST"] = "l"
+    tb.align["ID"] = "l"
+
+    return tb
+
+
+def task_lines(tasks):
+    """Returns the lines of a table of the provided mesos tasks, in the
+    order of `tasks`.  Each line is rendered as its task is consumed.
+
+    :param tasks: tasks to render
+    :type tasks: iterable of Task
+    :rtype: iterator of str
+    """
+
+    return util.stream_table(_task_fields(), tasks)
+
+
+def _task_fields():
+    """
+    :returns: the columns of a table of mesos tasks
+    :rtype: OrderedDict(str, function)
+    """
+
+    return OrderedDict([
         ("NAME", lambda t: t["name"]),
         ("HOST", lambda t: t.slave()["hostname"]),
         ("USER", lambda t: t.user()),
@@ -20,12 +47,10 @@ def task_table(tasks):
         ("ID", lambda t: t["id"]),
     ])
 
-    tb = util.table(fields, tasks, sortby="NAME")
-    tb.align["NAME"] = "l"
-    tb.align["HOST"] = "l"
-    tb.align["ID"] = "l"
 
-    return tb
+APP_FIELDS = ['id', 'mem', 'cpus', 'deployments', 'tasksRunning',
+              'instances', 'container', 'cmd', 'args']
+"""The app fields that :py:func:`app_table` renders"""
 
 
 def app_table(apps):
@@ -66,6 +91,59 @@ def app_table(apps):
     return tb
 
 
+def app_fields_table(apps, fields):
+    """Returns a PrettyTable representation of the provided apps, with one
+    column per field.
+
+    :param apps: apps to render
+    :type apps: [dict]
+    :param fields: app fields to render
+    :type fields: [str]
+    :rtype: PrettyTable
+    """
+
+    def get_field(field):
+        def get(app):
+            value = app.get(field)
+            if isinstance(value, (dict, list)):
+                return json.dumps(value, sort_keys=True)
+            return value
+        return get
+
+    columns = OrderedDict((field.upper(), get_field(field))
+                          for field in fields)
+
+    tb = util.table(columns, apps)
+    for column in columns:
+        tb.align[column] = "l"
+
+    return tb
+
+
+def app_result_table(results):
+    """Returns a PrettyTable representation of the results of changing
+    several apps.
+
+    :param results: results to render, with the app's id and either the
+                    resulting deployment's id or an error
+    :type results: [dict]
+    :rtype: PrettyTable
+    """
+
+    fields = OrderedDict([
+        ("ID", lambda r: r["id"]),
+        ("DEPLOYMENT", lambda r: r["deploymentId"] or "-"),
+        ("ERROR", lambda r: r["error"] or "-"),
+    ])
+
+    tb = util.table(fields, results)
+    tb.align["ID"] = "l"
+    tb.align["DEPLOYMENT"] = "l"
+    tb.align["ERROR"] = "l"
+
+    return tb
+
+
 def app_task_table(tasks):
     """Returns a PrettyTable representation of the provided marathon tasks.
 
@@ -154,10 +232,10 @@ def service_table(services):
         ("NAME", lambda s: s['name']),
         ("HOST", lambda s: s['hostname']),
         ("ACTIVE", lambda s: s['active']),
-        ("TASKS", lambda s: len(s['tasks'])),
-        ("CPU", lambda s: s['resources']['cpus']),
-        ("MEM", lambda s: s['resources']['mem']),
-        ("DISK", lambda s: s['resources']['disk']),
+        ("TASKS", lambda s: s.task_count()),
+        ("CPU", lambda s: s.resources()['cpus']),
+        ("MEM", lambda s: s.resources()['mem']),
+        ("DISK", lambda s: s.resources()['disk']),
         ("ID", lambda s: s['id']),
     ])
 
@@ -2,21 +2,38 @@
 
 Usage:
     dcos task --info
-    dcos task [--completed --json <task>]
+    dcos task [--completed --json --no-cache --no-sort]
+         [--limit=<limit>] [--offset=<offset>] [<task>...]
 
 Options:
-    -h, --help    Show this screen
-    --info        Show a short description of this subcommand
-    --json        Print json-formatted tasks
-    --completed   Show completed tasks as well
-    --version     Show version
+    -h, --help         Show this screen
+    --info             Show a short description of this subcommand
+    --json             Print json-formatted tasks
+    --completed        Show completed tasks as well
+    --no-cache         Fetch the state from the Mesos master even if
+                       core.state_cache_ttl enables the local state cache
+    --no-sort          Print the tasks in the Mesos master's order instead
+                       of sorting them by name.  Each task is printed as
+                       soon as it is read, without collecting all of them
+                       first.
+    --limit=<limit>    Print at most <limit> tasks
+    --offset=<offset>  Skip the first <offset> tasks
+    --version          Show version
 
 Positional Arguments:
 
     <task>        Only match tasks whose ID matches <task>.  <task> may be
-                  a substring of the ID, or a unix glob pattern.
+                  a substring of the ID, a unix glob pattern, or a regular
+                  expression prefixed with "re:".  To match another field
+                  instead, use <field>=<pattern> where <field> is one of
+                  id, name, state, framework or host.  E.g.
+                  state=TASK_RUNNING or framework=marathon.  Tasks must
+                  match every <task> that is given.
 """
 
+import heapq
+import itertools
+
 import dcoscli
 import docopt
 from dcos import cmds, emitting, mesos, util
@@ -59,7 +76,8 @@ def _cmds():
 
         cmds.Command(
             hierarchy=['task'],
-            arg_keys=['<task>', '--completed', '--json'],
+            arg_keys=['<task>', '--completed', '--json', '--no-cache',
+                      '--no-sort', '--limit', '--offset'],
             function=_task),
     ]
 
@@ -75,25 +93,58 @@ def _info():
     return 0
 
 
-def _task(fltr, completed, json_):
+def _task(fltr, completed, json_, no_cache, no_sort, limit, offset):
     """List DCOS tasks
 
-    :param fltr: task id filter
-    :type fltr: str
+    :param fltr: task filters
+    :type fltr: [str]
     :param completed: If True, include completed tasks
     :type completed: bool
     :param json_: If True, output json.  Otherwise, output a human
                   readable table.
     :type json_: bool
+    :param no_cache: If True, bypass the local state cache
+    :type no_cache: bool
+    :param no_sort: If True, print the tasks in the master's order as they
+                    are read.  Otherwise, sort them by name.
+    :type no_sort: bool
+    :param limit: maximum number of tasks to print
+    :type limit: str
+    :param offset: number of tasks to skip
+    :type offset: str
     :returns: process return code
 
     """
 
-    if fltr is None:
-        fltr = ""
+    limit = _parse_count(limit, '--limit')
+    offset = _parse_count(offset, '--offset') or 0
 
-    tasks = sorted(mesos.get_master().tasks(completed=completed, fltr=fltr),
-                   key=lambda task: task['name'])
+    if completed:
+        view = mesos.COMPLETED_TASKS_VIEW
+    else:
+        view = mesos.TASKS_VIEW
+
+    master = mesos.get_master(view=view,
+                              use_cache=not no_cache,
+                              compact=True)
+    tasks = master.iter_tasks(completed=completed, fltr=fltr)
+
+    if no_sort:
+        stop = None if limit is None else offset + limit
+        tasks = itertools.islice(tasks, offset, stop)
+        if json_:
+            tasks = (task.dict() for task in tasks)
+        emitting.publish_stream(emitter, tasks, tables.task_lines, json_)
+        return 0
+
+    def name(task):
+        return task['name']
+
+    if limit is None:
+        tasks = sorted(tasks, key=name)[offset:]
+    else:
+        # Only keep the tasks that can make it onto the page
+        tasks = heapq.nsmallest(offset + limit, tasks, key=name)[offset:]
 
     if json_:
         emitter.publish([task.dict() for task in tasks])
@@ -104,3 +155,24 @@ def _task(fltr, completed, json_):
             emitter.publish(output)
 
     return 0
+
+
+def _parse_count(value, option):
+    """
+    :param value: value of a count option, or None if it is not set
+    :type value: str
+    :param option: name of the option
+    :type option: str
+    :returns: the count, or None if it is not set
+    :rtype: int
+    """
+
+    if value is None:
+        return None
+
+    count = util.parse_int(value)
+    if count < 0:
+        raise DCOSException(
+            '{} must be a non-negative integer'.format(option))
+
+    return count
@@ -159,3 +159,16 @@ def group_fixture():
         "id": "/test-group",
         "version": "2015-05-29T23:12:46.187Z"
     }
+
+
+def app_result_fixture():
+    """ Result of changing an app in bulk.
+
+    :rtype: dict
+    """
+
+    return {
+        "id": "/zero-instance-app",
+        "deploymentId": "bafaa1ec-3c07-4b11-b2c3-dd6f5b0e5d8b",
+        "error": None
+    }
@@ -18,14 +18,20 @@ Usage:
     dcos marathon --info
     dcos marathon about
     dcos marathon app add [<app-resource>]
-    dcos marathon app list [--json]
-    dcos marathon app remove [--force] <app-id>
-    dcos marathon app restart [--force] <app-id>
+    dcos marathon app diff [--json --app-version=<app-version>] <app-id>
+         [<app-resource>]
+    dcos marathon app list [--json --fields=<fields>]
+    dcos marathon app remove [--force --json --wait] <app-ids>...
+    dcos marathon app restart [--force --json --wait] <app-ids>...
+    dcos marathon app scale [--force --json --wait] <instances>
+         <app-ids>...
     dcos marathon app show [--app-version=<app-version>] <app-id>
-    dcos marathon app start [--force] <app-id> [<instances>]
-    dcos marathon app stop [--force] <app-id>
-    dcos marathon app update [--force] <app-id> [<properties>...]
+    dcos marathon app start [--force --wait] <app-id> [<instances>]
+    dcos marathon app stop [--force --wait] <app-id>
+    dcos marathon app update [--force --wait] <app-id> [<properties>...]
     dcos marathon app version list [--max-count=<max-count>] <app-id>
+    dcos marathon deploy [--force --json --wait --timeout=<timeout>]
+         <app-dir>
     dcos marathon deployment list [--json <app-id>]
     dcos marathon deployment rollback <deployment-id>
     dcos marathon deployment stop <deployment-id>
@@ -34,10 +40,13 @@ Usage:
     dcos marathon task list [--json <app-id>]
     dcos marathon task show <task-id>
     dcos marathon group add [<group-resource>]
+    dcos marathon group diff [--json --group-version=<group-version>]
+         <group-id> [<group-resource>]
     dcos marathon group list [--json]
     dcos marathon group show [--group-version=<group-version>] <group-id>
     dcos marathon group remove [--force] <group-id>
-    dcos marathon group update [--force] <group-id> [<properties>...]
+    dcos marathon group update [--force --wait] <group-id>
+         [<properties>...]
 
 Options:
     -h, --help                       Show this screen
@@ -61,7 +70,9 @@ Options:
                                      values must be specified as a negative
                                      integer and they represent the version
                                      from the currently deployed application
-                                     definition
+                                     definition. `app diff` compares this
+                                     version, by default -1, with the deployed
+                                     application or with <app-resource>
 
     --group-version=<group-version>  This flag specifies the group version to
                                      use for the command. The group version
@@ -71,7 +82,10 @@ Options:
                                      date format. Relative values must be
                                      specified as a negative integer and they
                                      represent the version from the currently
-                                     deployed group definition
+                                     deployed group definition. `group diff`
+                                     compares this version, by default -1,
+                                     with the deployed group or with
+                                     <group-resource>
 
     --config-schema                  Show the configuration schema for the
                                      Marathon subcommand
@@ -81,12 +95,38 @@ Options:
 
     --interval=<interval>            Number of seconds to wait between actions
 
+    --wait                           Wait until the deployments that the
+                                     command started finished, and fail if any
+                                     of them failed
+
+    --timeout=<timeout>              Maximum number of seconds that `deploy`
+                                     waits for the deployments of the apps,
+                                     by default 600
+
+    --fields=<fields>                Comma-separated list of the application
+                                     fields to print. E.g.
+                                     id,instances,tasksRunning. Only these
+                                     fields are fetched and kept
+
 Positional Arguments:
     <app-id>                    The application id
 
+    <app-ids>                   One or more application ids or unix glob
+                                patterns over the ids of the deployed
+                                applications. E.g. /group/*. Several
+                                applications are changed concurrently and
+                                the result for each one is summarized.
+
+    <app-dir>                   Directory of application JSON definitions,
+                                one app per .json file, searched recursively.
+                                The apps are added or updated concurrently,
+                                each one once the deployments of the apps it
+                                depends on finished.
+
     <app-resource>              Path to a file containing the app's JSON
                                 definition. If omitted, the definition is read
-                                from stdin. For a detailed description see
+                                from stdin, except by `app diff`. For a
+                                detailed description see
                                 (https://mesosphere.github.io/
                                 marathon/docs/rest-api.html#post-/v2/apps).
 
@@ -96,11 +136,13 @@ Positional Arguments:
 
     <group-resource>            Path to a file containing the group's JSON
                                 definition. If omitted, the definition is read
-                                from stdin. For a detailed description see
+                                from stdin, except by `group diff`. For a
+                                detailed description see
                                 (https://mesosphere.github.io/
                                 marathon/docs/rest-api.html#post-/v2/groups).
 
-    <instances>                 The number of instances to start
+    <instances>                 The number of instances to start, or to
+                                scale to
 
     <properties>                Must be of the format <key>=<value>. E.g.
                                 cpus=2.0. If omitted, properties are read from
@@ -225,6 +267,38 @@ def test_show_relative_app_version():
     _remove_app('zero-instance-app')
 
 
+def test_diff_app_versions():
+    _add_app('tests/data/marathon/apps/zero_instance_sleep.json')
+    _update_app(
+        'zero-instance-app',
+        'tests/data/marathon/apps/update_zero_instance_sleep.json')
+
+    returncode, stdout, stderr = exec_command(
+        ['dcos', 'marathon', 'app', 'diff', '--json', 'zero-instance-app'])
+
+    assert returncode == 0
+    assert stderr == b''
+    assert [operation['path'] for operation in json.loads(stdout.decode())] \
+        == ['/cmd', '/cpus', '/mem']
+
+    _remove_app('zero-instance-app')
+
+
+def test_diff_app_with_file():
+    _add_app('tests/data/marathon/apps/zero_instance_sleep.json')
+
+    returncode, stdout, stderr = exec_command(
+        ['dcos', 'marathon', 'app', 'diff', 'zero-instance-app',
+         'tests/data/marathon/apps/update_zero_instance_sleep.json'])
+
+    assert returncode == 0
+    assert stderr == b''
+    assert [line.split(':')[0] for line in stdout.decode().splitlines()] \
+        == ['- /cmd', '+ /cmd', '- /cpus', '+ /cpus', '- /mem', '+ /mem']
+
+    _remove_app('zero-instance-app')
+
+
 def test_show_missing_relative_app_version():
     _add_app('tests/data/marathon/apps/zero_instance_sleep.json')
     _update_app(
@@ -22,7 +22,7 @@ def test_help():
 
 Usage:
     dcos service --info
-    dcos service [--inactive --json]
+    dcos service [--inactive --json --no-cache]
     dcos service shutdown <service-id>
 
 Options:
@@ -36,6 +36,9 @@ Options:
                   Inactive services are those that have been disconnected from
                   master, but haven't yet reached their failover timeout.
 
+    --no-cache    Fetch the state from the Mesos master even if
+                  core.state_cache_ttl enables the local state cache
+
     --version     Show version
 
 Positional Arguments:
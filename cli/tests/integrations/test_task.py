@@ -17,19 +17,33 @@ def test_help():
 
 Usage:
     dcos task --info
-    dcos task [--completed --json <task>]
+    dcos task [--completed --json --no-cache --no-sort]
+         [--limit=<limit>] [--offset=<offset>] [<task>...]
 
 Options:
-    -h, --help    Show this screen
-    --info        Show a short description of this subcommand
-    --json        Print json-formatted tasks
-    --completed   Show completed tasks as well
-    --version     Show version
+    -h, --help         Show this screen
+    --info             Show a short description of this subcommand
+    --json             Print json-formatted tasks
+    --completed        Show completed tasks as well
+    --no-cache         Fetch the state from the Mesos master even if
+                       core.state_cache_ttl enables the local state cache
+    --no-sort          Print the tasks in the Mesos master's order instead
+                       of sorting them by name.  Each task is printed as
+                       soon as it is read, without collecting all of them
+                       first.
+    --limit=<limit>    Print at most <limit> tasks
+    --offset=<offset>  Skip the first <offset> tasks
+    --version          Show version
 
 Positional Arguments:
 
     <task>        Only match tasks whose ID matches <task>.  <task> may be
-                  a substring of the ID, or a unix glob pattern.
+                  a substring of the ID, a unix glob pattern, or a regular
+                  expression prefixed with "re:".  To match another field
+                  instead, use <field>=<pattern> where <field> is one of
+                  id, name, state, framework or host.  E.g.
+                  state=TASK_RUNNING or framework=marathon.  Tasks must
+                  match every <task> that is given.
 """
     assert_command(['dcos', 'task', '--help'], stdout=stdout)
 
@@ -0,0 +1,78 @@
+from dcos import emitting
+from dcos.errors import DCOSException
+from dcoscli.marathon import main
+
+import mock
+
+
+class _Client(object):
+
+    def __init__(self):
+        self.waited = []
+
+    def match_app_ids(self, patterns):
+        return ['/a', '/b', '/c']
+
+    def wait_for_deployments(self, deployment_ids, timeout=None):
+        self.waited.extend(deployment_ids)
+        self.timeout = timeout
+
+    def deploy_apps(self, apps, force=None, timeout=None):
+        self.deploy_timeout = timeout
+        return [{'id': '/a', 'action': 'add', 'deploymentId': 'd/a',
+                 'error': None}]
+
+
+def _operation(app_id):
+    if app_id == '/b':
+        raise DCOSException('App is locked')
+    return 'deployment' + app_id
+
+
+def test_bulk_summary():
+    events = []
+    with mock.patch.object(main, 'emitter',
+                           emitting.FlatEmitter(events.append)):
+        assert main._bulk(_Client(), ['/*'], _operation, True) == 1
+
+    assert events == [[
+        {'id': '/a', 'deploymentId': 'deployment/a', 'error': None},
+        {'id': '/b', 'deploymentId': None, 'error': 'App is locked'},
+        {'id': '/c', 'deploymentId': 'deployment/c', 'error': None},
+    ]]
+
+
+def test_bulk_success():
+    events = []
+    with mock.patch.object(main, 'emitter',
+                           emitting.FlatEmitter(events.append)):
+        assert main._bulk(_Client(), ['/a', '/c'],
+                          lambda app_id: 'deployment', False) == 0
+
+    assert 'deployment' in events[0]
+
+
+def test_bulk_wait():
+    client = _Client()
+    with mock.patch.object(main, 'emitter',
+                           emitting.FlatEmitter(lambda event: None)):
+        assert main._bulk(client, ['/*'], _operation, True, wait=True) == 1
+
+    assert client.waited == ['deployment/a', None, 'deployment/c']
+
+
+def test_deploy_timeout():
+    client = _Client()
+    with mock.patch.object(main, 'emitter',
+                           emitting.FlatEmitter(lambda event: None)), \
+            mock.patch.object(main, '_read_app_dir', lambda app_dir: []), \
+            mock.patch('dcos.marathon.create_client', lambda: client):
+        assert main._deploy('apps', False, True, True, None) == 0
+        assert client.deploy_timeout == main.DEFAULT_DEPLOY_TIMEOUT
+        assert 0 < client.timeout <= main.DEFAULT_DEPLOY_TIMEOUT
+
+        assert main._deploy('apps', False, True, True, '5') == 0
+        assert client.deploy_timeout == 5
+        assert client.timeout <= 5
+
+    assert client.waited == ['d/a', 'd/a']
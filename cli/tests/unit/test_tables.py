@@ -1,7 +1,9 @@
+from dcos.mesos import Framework
 from dcoscli import tables
 
-from ..fixtures.marathon import (app_fixture, app_task_fixture,
-                                 deployment_fixture, group_fixture)
+from ..fixtures.marathon import (app_fixture, app_result_fixture,
+                                 app_task_fixture, deployment_fixture,
+                                 group_fixture)
 from ..fixtures.package import package_fixture, search_result_fixture
 from ..fixtures.service import framework_fixture
 from ..fixtures.task import task_fixture
@@ -19,6 +21,12 @@ def test_app_table():
                 'tests/unit/data/app.txt')
 
 
+def test_app_result_table():
+    _test_table(tables.app_result_table,
+                app_result_fixture,
+                'tests/unit/data/app_result.txt')
+
+
 def test_deployment_table():
     _test_table(tables.deployment_table,
                 deployment_fixture,
@@ -37,6 +45,17 @@ def test_service_table():
                 'tests/unit/data/service.txt')
 
 
+def test_service_table_summary():
+    framework = framework_fixture().dict()
+    for key in ('resources', 'tasks'):
+        del framework[key]
+    framework['offered_resources'] = {'cpus': 0.8, 'mem': 96, 'disk': 10}
+    framework['TASK_RUNNING'] = 2
+
+    rows = str(tables.service_table([Framework(framework)])).splitlines()
+    assert rows[1].split()[3:7] == ['2', '1.0', '128', '10']
+
+
 def test_group_table():
     _test_table(tables.group_table,
                 group_fixture,
@@ -59,3 +78,11 @@ def _test_table(table_fn, fixture_fn, path):
     table = table_fn([fixture_fn()])
     with open(path) as f:
         assert str(table) == f.read()
+
+
+def test_task_lines():
+    lines = list(tables.task_lines([task_fixture(), task_fixture()]))
+    assert lines[0].split() == ['NAME', 'HOST', 'USER', 'STATE', 'ID']
+    assert len(lines) == 3
+    assert lines[1] == lines[2]
+    assert lines[1].index('mock-hostname') == lines[0].index('HOST')
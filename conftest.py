@@ -0,0 +1,2 @@
+# Having a conftest.py at the root of the repository puts the repository on
+# sys.path, so that the tests can use the stand-in servers in `benchmarks`.
@@ -0,0 +1,282 @@
+import collections
+import hashlib
+import marshal
+import os
+import tempfile
+import time
+
+from dcos import constants, util
+
+logger = util.get_logger(__name__)
+
+_FORMAT_VERSION = 1
+
+_TMP_PREFIX = '.tmp'
+
+CacheEntry = collections.namedtuple(
+    'CacheEntry',
+    ['value', 'validators', 'timestamp'])
+"""A cached value.
+
+:param value: the cached value
+:type value: dict | list | str | int | float | bool | None
+:param validators: the HTTP validators of the response the value was
+                   decoded from. E.g. {'ETag': '"abc"'}
+:type validators: dict
+:param timestamp: when the value was fetched or last revalidated, in
+                  seconds since the epoch
+:type timestamp: float
+"""
+
+
+def cache_dir(name):
+    """ Returns ~/.dcos/cache/<name>
+
+    :param name: name of the cache
+    :type name: str
+    :rtype: str
+    """
+
+    return os.path.expanduser(os.path.join("~",
+                                           constants.DCOS_DIR,
+                                           constants.DCOS_CACHE_SUBDIR,
+                                           name))
+
+
+def validators(response):
+    """Returns the validator headers of a response, which let a later
+    request ask whether the resource changed.
+
+    :param response: HTTP response
+    :type response: requests.Response
+    :returns: the ETag and Last-Modified headers that are set
+    :rtype: dict
+    """
+
+    return dict((name, response.headers[name])
+                for name in ('ETag', 'Last-Modified')
+                if name in response.headers)
+
+
+def conditional_headers(validators):
+    """Returns the headers of a conditional request that succeeds with 304
+    Not Modified when the resource did not change.
+
+    :param validators: validators returned by :py:func:`validators`
+    :type validators: dict
+    :rtype: dict
+    """
+
+    headers = {}
+    if 'ETag' in validators:
+        headers['If-None-Match'] = validators['ETag']
+    if 'Last-Modified' in validators:
+        headers['If-Modified-Since'] = validators['Last-Modified']
+    return headers
+
+
+class FileCache(object):
+    """Cache of JSON values in files, one per key. Values are stored with
+    `marshal`, which is compact and much faster to load than JSON.
+    Entries are replaced atomically, so concurrent processes always read
+    either the previous or the new entry.
+
+    :param directory: directory for the cache files
+    :type directory: str
+    :param ttl: number of seconds for which an entry is fresh
+    :type ttl: float
+    :param max_entries: if set, the entries written longest ago are
+                        removed whenever there are more than this many
+    :type max_entries: int
+    """
+
+    def __init__(self, directory, ttl, max_entries=None):
+        self._directory = directory
+        self._ttl = ttl
+        self._max_entries = max_entries
+
+    def _path(self, key):
+        """
+        :param key: cache key
+        :type key: str
+        :returns: path of the file for `key`
+        :rtype: str
+        """
+
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self._directory, digest)
+
+    def get(self, key):
+        """Returns the entry for `key`, even when it is no longer fresh.
+
+        :param key: cache key
+        :type key: str
+        :returns: the entry, or None if there is no readable entry
+        :rtype: CacheEntry | None
+        """
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                version, stored_key, timestamp, validators, value = \
+                    marshal.load(cache_file)
+        except (IOError, OSError):
+            return None
+        except (EOFError, ValueError, TypeError) as e:
+            logger.info('Ignoring unreadable cache file %r: %r', path, e)
+            return None
+
+        if version != _FORMAT_VERSION or stored_key != key:
+            return None
+
+        return CacheEntry(value, validators, timestamp)
+
+    def is_fresh(self, entry):
+        """
+        :param entry: cache entry
+        :type entry: CacheEntry
+        :returns: whether the entry is younger than the TTL
+        :rtype: bool
+        """
+
+        return 0 <= time.time() - entry.timestamp < self._ttl
+
+    def get_fresh(self, key):
+        """
+        :param key: cache key
+        :type key: str
+        :returns: the value for `key` if its entry is fresh; None otherwise
+        :rtype: dict | list | str | int | float | bool | None
+        """
+
+        entry = self.get(key)
+        if entry is None or not self.is_fresh(entry):
+            return None
+
+        return entry.value
+
+    def put(self, key, value, validators=None):
+        """Stores `value` for `key` and marks it fresh.
+
+        :param key: cache key
+        :type key: str
+        :param value: value to store
+        :type value: dict | list | str | int | float | bool | None
+        :param validators: HTTP validators for revalidating the value
+        :type validators: dict
+        :rtype: None
+        """
+
+        data = marshal.dumps(
+            (_FORMAT_VERSION, key, time.time(), validators or {}, value))
+
+        tmp_path = None
+        try:
+            util.ensure_dir(self._directory)
+            fd, tmp_path = tempfile.mkstemp(prefix=_TMP_PREFIX,
+                                            dir=self._directory)
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(data)
+            _replace(tmp_path, self._path(key))
+        except (IOError, OSError) as e:
+            # The cache is an optimization; failing to write it is not an
+            # error for the command.
+            logger.warning('Unable to write cache file for %r: %r', key, e)
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        if self._max_entries is not None:
+            self._evict(self._max_entries)
+
+    def touch(self, key, entry):
+        """Marks a revalidated entry fresh again.
+
+        :param key: cache key
+        :type key: str
+        :param entry: the entry for `key`
+        :type entry: CacheEntry
+        :rtype: None
+        """
+
+        self.put(key, entry.value, entry.validators)
+
+    def _evict(self, max_entries):
+        """Removes the entries written longest ago until at most
+        `max_entries` are left.
+
+        :param max_entries: number of entries to keep
+        :type max_entries: int
+        :rtype: None
+        """
+
+        try:
+            names = os.listdir(self._directory)
+        except (IOError, OSError):
+            return
+
+        if len(names) <= max_entries:
+            return
+
+        entries = []
+        for name in names:
+            # Leave the files that other processes are still writing
+            if name.startswith(_TMP_PREFIX):
+                continue
+            path = os.path.join(self._directory, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except (IOError, OSError):
+                pass
+
+        entries.sort()
+        for _, path in entries[:len(entries) - max_entries]:
+            _remove(path)
+
+    def clear(self):
+        """Removes every entry.
+
+        :rtype: None
+        """
+
+        try:
+            names = os.listdir(self._directory)
+        except (IOError, OSError):
+            return
+
+        for name in names:
+            _remove(os.path.join(self._directory, name))
+
+
+def _remove(path):
+    """Removes a cache file, unless another process removed it first.
+
+    :param path: path of the file
+    :type path: str
+    :rtype: None
+    """
+
+    try:
+        os.remove(path)
+    except (IOError, OSError) as e:
+        if os.path.exists(path):
+            logger.warning('Unable to remove cache file %r: %r', path, e)
+
+
+def _replace(src, dst):
+    """Atomically renames `src` to `dst`, replacing `dst` if it exists.
+
+    :param src: source path
+    :type src: str
+    :param dst: destination path
+    :type dst: str
+    :rtype: None
+    """
+
+    try:
+        os.rename(src, dst)
+    except OSError:
+        # Windows does not rename onto existing files
+        if not os.path.exists(dst):
+            raise
+        os.remove(dst)
+        os.rename(src, dst)
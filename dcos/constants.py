@@ -8,6 +8,10 @@ DCOS_SUBCOMMAND_SUBDIR = 'subcommands'
 """Name of the subdirectory that contains all of the subcommands. This is
 relative to the location of the executable."""
 
+DCOS_CACHE_SUBDIR = 'cache'
+"""Name of the subdirectory of the DCOS data directory that contains the
+local caches of remote state."""
+
 DCOS_CONFIG_ENV = 'DCOS_CONFIG'
 """Name of the environment variable pointing to the DCOS config."""
 
@@ -121,6 +121,68 @@ def publish_table(emitter, objs, table_fn, json_):
             emitter.publish(output)
 
 
+def publish_stream(emitter, objs, lines_fn, json_):
+    """Like :py:func:`publish_table`, but publishes the output one line at a
+    time while `objs` is consumed, so that the first lines appear before
+    the last objects are produced.
+
+    :param emitter: emitter to use for publishing
+    :type emitter: Emitter
+    :param objs: objects to print
+    :type objs: iterable of object
+    :param lines_fn: function used to render `objs` as table lines, e.g.
+                     :py:func:`dcos.util.stream_table`
+    :type lines_fn: objs -> iterator of str
+    :param json_: whether or not to publish a json representation. Each
+                  object must then be a JSON value.
+    :type json_: bool
+    :rtype: None
+    """
+
+    if json_:
+        lines = _json_lines(objs)
+    else:
+        lines = lines_fn(objs)
+
+    for line in lines:
+        emitter.publish(line)
+
+
+def _json_lines(objs):
+    """Renders a JSON list of `objs` the way :py:func:`_process_json` does,
+    without highlighting, one line at a time.
+
+    :param objs: JSON values
+    :type objs: iterable of (dict, list, str, int, float, bool, or None)
+    :returns: lines of the JSON list
+    :rtype: iterator of str
+    """
+
+    def element_lines(obj, last):
+        text = json.dumps(obj, sort_keys=True, indent=2)
+        lines = [re.sub(r'\s+$', '', line) for line in text.split('\n')]
+        if not last:
+            lines[-1] += ','
+        return ('  ' + line for line in lines)
+
+    objs = iter(objs)
+    try:
+        previous = next(objs)
+    except StopIteration:
+        yield '[]'
+        return
+
+    yield '['
+    for obj in objs:
+        for line in element_lines(previous, last=False):
+            yield line
+        previous = obj
+
+    for line in element_lines(previous, last=True):
+        yield line
+    yield ']'
+
+
 def _process_json(event, pager_command):
     """Conditionally highlights the supplied JSON value.
 
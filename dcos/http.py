@@ -1,9 +1,51 @@
+import atexit
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-from dcos import util
+from dcos import constants, util
 from dcos.errors import DCOSException, DefaultError, Error
+from requests.adapters import HTTPAdapter
+
+from six.moves import urllib
 
 logger = util.get_logger(__name__)
 
+DEFAULT_POOL_SIZE = 10
+"""Default number of keep-alive connections kept open per host."""
+
+DEFAULT_TIMEOUT = 3.0
+"""Default number of seconds to wait for a connection or a response."""
+
+DEFAULT_RETRIES = 2
+"""Default number of times a failed idempotent request is retried."""
+
+SAFE_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+"""Methods that change nothing on the server"""
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+"""Methods that may be sent again without changing the outcome"""
+
+ALL_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'POST',
+                         'PATCH'])
+"""All methods, for rules that are safe whatever the request does"""
+
+_clock = getattr(time, 'monotonic', time.time)
+
+_settings = None
+_settings_lock = threading.Lock()
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+_executor = None
+_executor_lock = threading.Lock()
+
 
 def _default_is_success(status_code):
     """Returns true if the success status is between [200, 300).
@@ -31,29 +73,319 @@ def _default_to_error(response):
     return DefaultError('{}: {}'.format(response.status_code, response.text))
 
 
+def _get_config_value(key, default):
+    """Reads an optional setting from the user's configuration. Falls back
+    to `default` when no configuration is available, e.g. when the module
+    is used as a library.
+
+    :param key: configuration key. E.g. 'core.http_pool_size'
+    :type key: str
+    :param default: value returned when the key is not set
+    :type default: any
+    :returns: the configured value or `default`
+    :rtype: any
+    """
+
+    if constants.DCOS_CONFIG_ENV not in os.environ:
+        return default
+
+    return util.get_config().get(key, default)
+
+
+def _get_settings():
+    """Reads the HTTP settings of the user's configuration on first use.
+    They are kept for the rest of the process, so that requests do not
+    parse the configuration file again.
+
+    :returns: the `core.http_pool_size`, `core.http_timeout`,
+              `core.http_retries` and `core.http_deadline` settings, by
+              key without the `core.` prefix
+    :rtype: dict
+    """
+
+    global _settings
+
+    with _settings_lock:
+        if _settings is None:
+            deadline = _get_config_value('core.http_deadline', None)
+            _settings = {
+                'http_pool_size': int(_get_config_value(
+                    'core.http_pool_size', DEFAULT_POOL_SIZE)),
+                'http_timeout': float(_get_config_value(
+                    'core.http_timeout', DEFAULT_TIMEOUT)),
+                'http_retries': int(_get_config_value(
+                    'core.http_retries', DEFAULT_RETRIES)),
+                'http_deadline': None if deadline is None else float(deadline),
+            }
+        return _settings
+
+
+def _clear_settings():
+    """Forgets the HTTP settings, so that they are read again from the
+    configuration on next use.
+
+    :rtype: None
+    """
+
+    global _settings
+
+    with _settings_lock:
+        _settings = None
+
+
+def _host_key(url):
+    """
+    :param url: URL of a request
+    :type url: str
+    :returns: the (scheme, host:port) pair that identifies the pool
+    :rtype: (str, str)
+    """
+
+    parsed = urllib.parse.urlparse(url)
+    return (parsed.scheme.lower(), parsed.netloc.lower())
+
+
+def _create_session(pool_size):
+    """Creates a session whose adapters keep up to `pool_size` connections
+    alive.
+
+    :param pool_size: maximum number of connections to keep alive
+    :type pool_size: int
+    :rtype: requests.Session
+    """
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(url):
+    """Returns the process-wide session for the host of `url`, creating it
+    on first use. Sessions keep their connections alive so that repeated
+    calls to the same host reuse the same TCP and TLS connection. The pool
+    size is read from `core.http_pool_size`.
+
+    :param url: URL of a request
+    :type url: str
+    :returns: the pooled session for the host
+    :rtype: requests.Session
+    """
+
+    key = _host_key(url)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            pool_size = _get_settings()['http_pool_size']
+            logger.info('Creating HTTP session for %r with pool size %r',
+                        key,
+                        pool_size)
+            session = _create_session(pool_size)
+            _sessions[key] = session
+
+    return session
+
+
+def close_sessions():
+    """Closes every pooled session and their open connections. Subsequent
+    requests open new connections.
+
+    :rtype: None
+    """
+
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+
+    for session in sessions:
+        session.close()
+
+
+atexit.register(close_sessions)
+
+
+class RetryPolicy(object):
+    """Decides which failed requests are sent again, and how long to wait
+    before each new attempt.  Waits grow exponentially from `backoff` up
+    to `max_backoff` seconds, and each one is drawn at random from zero to
+    that bound, so that clients that failed together do not retry
+    together.
+
+    A rule maps a status code or an exception class to the methods whose
+    requests are retried when it occurs.  Exception rules are checked in
+    order and the first one that matches applies.
+
+    :param retries: maximum number of attempts after the first one
+    :type retries: int
+    :param backoff: bound of the wait before the first retry, in seconds
+    :type backoff: float
+    :param max_backoff: largest bound of any wait, in seconds
+    :type max_backoff: float
+    :param deadline: number of seconds after which no new attempt is
+                     started, counted from the first one.  Attempts are
+                     also cut short so as to end by then.  None, the
+                     default, for no deadline: each attempt then waits
+                     the full timeout.
+    :type deadline: float
+    :param statuses: status rules. Defaults to `RETRY_STATUSES`.
+    :type statuses: dict of int to frozenset of str
+    :param exceptions: exception rules. Defaults to `RETRY_EXCEPTIONS`.
+    :type exceptions: [(type, frozenset of str)]
+    """
+
+    def __init__(self, retries=DEFAULT_RETRIES, backoff=0.5, max_backoff=8.0,
+                 deadline=None, statuses=None, exceptions=None):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.statuses = RETRY_STATUSES if statuses is None else statuses
+        self.exceptions = \
+            RETRY_EXCEPTIONS if exceptions is None else exceptions
+
+    def retries_status(self, method, status_code):
+        """
+        :param method: HTTP method
+        :type method: str
+        :param status_code: status of the response
+        :type status_code: int
+        :returns: whether a request that got this status may be retried
+        :rtype: bool
+        """
+
+        return method.upper() in self.statuses.get(status_code, ())
+
+    def retries_exception(self, method, error):
+        """
+        :param method: HTTP method
+        :type method: str
+        :param error: the exception raised while sending the request
+        :type error: Exception
+        :returns: whether a request that raised `error` may be retried
+        :rtype: bool
+        """
+
+        for exception_class, methods in self.exceptions:
+            if isinstance(error, exception_class):
+                return method.upper() in methods
+
+        return False
+
+    def wait(self, retry):
+        """
+        :param retry: number of the retry, starting at 1
+        :type retry: int
+        :returns: the number of seconds to wait before that retry
+        :rtype: float
+        """
+
+        bound = min(self.max_backoff, self.backoff * 2 ** (retry - 1))
+        return random.uniform(0, bound)
+
+
+RETRY_STATUSES = {
+    429: IDEMPOTENT_METHODS,
+    502: IDEMPOTENT_METHODS,
+    503: IDEMPOTENT_METHODS,
+    504: IDEMPOTENT_METHODS,
+}
+"""Default status rules: the responses of overloaded servers and of
+proxies that could not reach the leader"""
+
+RETRY_EXCEPTIONS = [
+    # The server never saw the request, so any method may be retried
+    (requests.exceptions.ConnectTimeout, ALL_METHODS),
+    # The server may have acted on the request already.  A PUT or DELETE
+    # may start a Marathon deployment, which must not be started twice.
+    (requests.exceptions.ConnectionError, SAFE_METHODS),
+    (requests.exceptions.Timeout, SAFE_METHODS),
+]
+"""Default exception rules"""
+
+NO_RETRY = RetryPolicy(retries=0, deadline=None)
+"""Policy that sends every request only once"""
+
+
+def default_timeout():
+    """
+    :returns: the number of seconds to wait for a connection or a response,
+              from `core.http_timeout`
+    :rtype: float
+    """
+
+    return _get_settings()['http_timeout']
+
+
+def _default_retry_policy():
+    """
+    :returns: the retry policy configured by `core.http_retries` and
+              `core.http_deadline`
+    :rtype: RetryPolicy
+    """
+
+    settings = _get_settings()
+    return RetryPolicy(retries=settings['http_retries'],
+                       deadline=settings['http_deadline'])
+
+
+def _is_replayable(prepared):
+    """
+    :param prepared: prepared request
+    :type prepared: requests.PreparedRequest
+    :returns: whether the body of the request can be sent again; a file
+              is consumed by the first attempt
+    :rtype: bool
+    """
+
+    return not hasattr(prepared.body, 'read')
+
+
 @util.duration
 def request(method,
             url,
-            timeout=3.0,
+            timeout=None,
             is_success=_default_is_success,
             to_error=_default_to_error,
+            stream=False,
+            retry=None,
             **kwargs):
-    """Sends an HTTP request.
+    """Sends an HTTP request.  Requests that fail with a transient error
+    are sent again as allowed by `retry`.
 
     :param method: method for the new Request object
     :type method: str
     :param url: URL for the new Request object
     :type url: str
+    :param timeout: number of seconds to wait for a connection or a
+                    response on each attempt, or a (connect, read) pair
+                    of them, where None waits forever.  Defaults to
+                    `core.http_timeout`.
+    :type timeout: float | (float, float)
     :param is_success: Defines successful status codes for the request
     :type is_success: Function from int to bool
     :param to_error: Builds an Error from an unsuccessful response or Error
     :type to_error: Function from requests.Response or Error to Error
+    :param stream: if True, the body of a successful response is not read
+                   up front; the caller reads it with e.g.
+                   `response.iter_content` and then closes the response
+    :type stream: bool
+    :param retry: retry policy. Defaults to the rules of `RetryPolicy`,
+                  with `core.http_retries` retries within
+                  `core.http_deadline` seconds.  Use `NO_RETRY` to send
+                  the request only once.
+    :type retry: RetryPolicy
     :param kwargs: Additional arguments to requests.request
         (see http://docs.python-requests.org/en/latest/api/#requests.request)
     :type kwargs: dict
     :rtype: Response
     """
 
+    if timeout is None:
+        timeout = default_timeout()
+    if retry is None:
+        retry = _default_retry_policy()
+
     try:
         if 'headers' in kwargs:
             request = requests.Request(method=method, url=url, **kwargs)
@@ -70,14 +402,73 @@ def request(method,
             request.url,
             request.headers)
 
-        with requests.Session() as session:
-            response = session.send(request.prepare(), timeout=timeout)
+        session = get_session(request.url)
+        prepared = request.prepare()
     except Exception as ex:
         raise DCOSException(to_error(DefaultError(str(ex))).error())
 
-    logger.info('Received HTTP response [%r]: %r',
-                response.status_code,
-                response.text)
+    retries = retry.retries if _is_replayable(prepared) else 0
+    start = _clock()
+    attempt = 0
+    while True:
+        attempt += 1
+        attempt_timeout = timeout
+        if retry.deadline is not None and not isinstance(timeout, tuple):
+            attempt_timeout = min(timeout,
+                                  max(retry.deadline - (_clock() - start),
+                                      0.001))
+
+        try:
+            response = session.send(prepared,
+                                    timeout=attempt_timeout,
+                                    stream=stream)
+        except Exception as ex:
+            response = None
+            error = ex
+            retryable = retry.retries_exception(method, ex)
+        else:
+            error = None
+            retryable = (not is_success(response.status_code) and
+                         retry.retries_status(method, response.status_code))
+
+        if not retryable or attempt > retries:
+            break
+
+        wait = retry.wait(attempt)
+        if (retry.deadline is not None and
+                _clock() - start + wait >= retry.deadline):
+            logger.info('Not retrying HTTP [%r] to [%r]: deadline of %rs '
+                        'reached', request.method, request.url,
+                        retry.deadline)
+            break
+
+        logger.info('Attempt %d of %d for HTTP [%r] to [%r] failed with '
+                    '%r; retrying in %.2fs',
+                    attempt, retries + 1, request.method, request.url,
+                    error if response is None else response.status_code,
+                    wait)
+        if response is not None:
+            # Return the connection to the pool
+            response.close()
+        time.sleep(wait)
+
+    if attempt > 1:
+        logger.info('Sent HTTP [%r] to [%r] %d times',
+                    request.method, request.url, attempt)
+
+    if response is None:
+        raise DCOSException(to_error(DefaultError(str(error))).error())
+
+    if stream and is_success(response.status_code):
+        logger.info('Received HTTP response [%r]: streaming %r bytes',
+                    response.status_code,
+                    response.headers.get('Content-Length'))
+    elif logger.isEnabledFor(logging.INFO):
+        # Only decode the body when it is going to be logged. Decoding a
+        # large response keeps a second copy of it in memory.
+        logger.info('Received HTTP response [%r]: %r',
+                    response.status_code,
+                    response.text)
 
     if is_success(response.status_code):
         return response
@@ -85,6 +476,164 @@ def request(method,
         raise DCOSException(to_error(response).error())
 
 
+def _max_concurrency():
+    """
+    :returns: the number of requests that may be in flight at once. Matches
+              the pool size so that concurrent requests reuse connections.
+    :rtype: int
+    """
+
+    return _get_settings()['http_pool_size']
+
+
+def _get_executor():
+    """Returns the process-wide worker pool used by :py:func:`submit`,
+    creating it on first use.
+
+    :rtype: ThreadPoolExecutor
+    """
+
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_max_concurrency())
+        return _executor
+
+
+def _shutdown_executor():
+    """Waits for the submitted calls and stops the shared worker pool.
+
+    :rtype: None
+    """
+
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+atexit.register(_shutdown_executor)
+
+
+def submit(fn, *args, **kwargs):
+    """Schedules `fn(*args, **kwargs)` on the shared worker pool.
+
+    :param fn: function to call; usually one that sends HTTP requests
+    :type fn: function
+    :returns: future for the result of the call. Its exception is the
+              DCOSException raised by the call, if any.
+    :rtype: concurrent.futures.Future
+    """
+
+    return _get_executor().submit(fn, *args, **kwargs)
+
+
+def request_async(method, url, **kwargs):
+    """Sends an HTTP request on the shared worker pool.
+
+    :param method: method for the new Request object
+    :type method: str
+    :param url: URL for the new Request object
+    :type url: str
+    :param kwargs: Additional arguments to :py:func:`request`
+    :type kwargs: dict
+    :returns: future for the response
+    :rtype: concurrent.futures.Future
+    """
+
+    return submit(request, method, url, **kwargs)
+
+
+def gather(functions, max_concurrency=None, return_exceptions=False):
+    """Calls the argument-less `functions` concurrently, with at most
+    `max_concurrency` of them running at once.
+
+    :param functions: functions to call
+    :type functions: [function]
+    :param max_concurrency: maximum number of concurrent calls. Defaults to
+                            the HTTP pool size.
+    :type max_concurrency: int
+    :param return_exceptions: if True, a DCOSException raised by a call is
+                              returned in place of its result; otherwise
+                              the first one, in the order of `functions`,
+                              is raised once all the calls finished
+    :type return_exceptions: bool
+    :returns: the results in the order of `functions`
+    :rtype: list
+    """
+
+    functions = list(functions)
+    if not functions:
+        return []
+
+    if max_concurrency is None:
+        max_concurrency = _max_concurrency()
+
+    workers = min(max_concurrency, len(functions))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fn) for fn in functions]
+
+    results = []
+    for future in futures:
+        error = future.exception()
+        if error is None:
+            results.append(future.result())
+        elif return_exceptions and isinstance(error, DCOSException):
+            results.append(error)
+        else:
+            raise error
+
+    return results
+
+
+def gather_requests(request_args, max_concurrency=None,
+                    return_exceptions=False):
+    """Sends several HTTP requests concurrently. See :py:func:`gather`.
+
+    :param request_args: the keyword arguments to :py:func:`request` of
+                         each request. E.g. {'method': 'get', 'url': url}
+    :type request_args: [dict]
+    :param max_concurrency: maximum number of requests in flight
+    :type max_concurrency: int
+    :param return_exceptions: return errors in place of responses
+    :type return_exceptions: bool
+    :returns: the responses in the order of `request_args`
+    :rtype: [Response | DCOSException]
+    """
+
+    return gather(
+        [functools.partial(request, **kwargs) for kwargs in request_args],
+        max_concurrency,
+        return_exceptions)
+
+
+class AsyncProxy(object):
+    """Runs the methods of a client on the shared worker pool. Calling a
+    method returns a future for what the client's method returns.
+
+    :param client: client to wrap. E.g. dcos.marathon.Client
+    :type client: object
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+        if not callable(method):
+            return method
+
+        @functools.wraps(method)
+        def submit_method(*args, **kwargs):
+            return submit(method, *args, **kwargs)
+
+        return submit_method
+
+
 def head(url, to_error=_default_to_error, **kwargs):
     """Sends a HEAD request.
 
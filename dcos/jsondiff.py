@@ -0,0 +1,224 @@
+import collections
+import difflib
+import hashlib
+import json
+
+Change = collections.namedtuple('Change', ['op', 'path', 'old', 'new'])
+"""A difference between two JSON documents.
+
+:param op: 'add', 'remove' or 'replace'
+:type op: str
+:param path: the keys and list indices from the root to the changed value
+:type path: tuple
+:param old: the value that was removed or replaced; None for 'add'
+:type old: dict | list | str | int | float | bool | None
+:param new: the value that was added or the replacement; None for
+            'remove'
+:type new: dict | list | str | int | float | bool | None
+"""
+
+
+def diff(old, new):
+    """Computes the changes that turn `old` into `new`.
+
+    Both documents are hashed bottom-up first, so identical subtrees are
+    recognized by comparing two digests and are never walked.  Lists are
+    aligned with a sequence matcher over the digests of their elements or,
+    for lists of objects with unique ids such as the apps of a group, over
+    the ids, so that an element that changed is diffed in place.
+
+    The changes are in the order of a JSON patch: applying them one after
+    the other, with the list indices as they are at that point, turns
+    `old` into `new`.
+
+    :param old: the original document
+    :type old: dict | list | str | int | float | bool | None
+    :param new: the changed document
+    :type new: dict | list | str | int | float | bool | None
+    :returns: the changes
+    :rtype: [Change]
+    """
+
+    changes = []
+    _diff(_Node(old), _Node(new), (), changes)
+    return changes
+
+
+def to_patch(changes):
+    """
+    :param changes: changes returned by :py:func:`diff`
+    :type changes: [Change]
+    :returns: the changes as a JSON patch (RFC 6902)
+    :rtype: [dict]
+    """
+
+    patch = []
+    for change in changes:
+        operation = {'op': change.op, 'path': pointer(change.path)}
+        if change.op != 'remove':
+            operation['value'] = change.new
+        patch.append(operation)
+
+    return patch
+
+
+def pointer(path):
+    """
+    :param path: keys and list indices
+    :type path: tuple
+    :returns: the JSON pointer (RFC 6901) to `path`
+    :rtype: str
+    """
+
+    return ''.join(
+        '/' + str(token).replace('~', '~0').replace('/', '~1')
+        for token in path)
+
+
+class _Node(object):
+    """A JSON value with the digests of it and of all of its children.
+
+    :param value: JSON value
+    :type value: dict | list | str | int | float | bool | None
+    """
+
+    __slots__ = ('value', 'digest', 'children')
+
+    def __init__(self, value):
+        self.value = value
+
+        digest = hashlib.sha1()
+        if isinstance(value, dict):
+            self.children = dict((key, _Node(child))
+                                 for key, child in value.items())
+            digest.update(b'{')
+            for key in sorted(self.children):
+                digest.update(json.dumps(key).encode('utf-8'))
+                digest.update(self.children[key].digest)
+        elif isinstance(value, list):
+            self.children = [_Node(child) for child in value]
+            digest.update(b'[')
+            for child in self.children:
+                digest.update(child.digest)
+        else:
+            self.children = None
+            # Marathon returns numbers such as cpus as doubles, so 1.0 must
+            # hash like the 1 of a definition file.
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            digest.update(json.dumps(value).encode('utf-8'))
+
+        self.digest = digest.digest()
+
+
+def _diff(old, new, path, changes):
+    """
+    :param old: the original value
+    :type old: _Node
+    :param new: the changed value
+    :type new: _Node
+    :param path: path of the values
+    :type path: tuple
+    :param changes: receives the changes
+    :type changes: [Change]
+    :rtype: None
+    """
+
+    if old.digest == new.digest:
+        return
+
+    if isinstance(old.value, dict) and isinstance(new.value, dict):
+        _diff_dicts(old.children, new.children, path, changes)
+    elif isinstance(old.value, list) and isinstance(new.value, list):
+        _diff_lists(old.children, new.children, path, changes)
+    else:
+        changes.append(Change('replace', path, old.value, new.value))
+
+
+def _diff_dicts(old, new, path, changes):
+    """
+    :param old: the children of the original object
+    :type old: dict of str to _Node
+    :param new: the children of the changed object
+    :type new: dict of str to _Node
+    :param path: path of the objects
+    :type path: tuple
+    :param changes: receives the changes
+    :type changes: [Change]
+    :rtype: None
+    """
+
+    for key in sorted(old):
+        if key not in new:
+            changes.append(Change('remove', path + (key,),
+                                  old[key].value, None))
+        else:
+            _diff(old[key], new[key], path + (key,), changes)
+
+    for key in sorted(new):
+        if key not in old:
+            changes.append(Change('add', path + (key,),
+                                  None, new[key].value))
+
+
+def _diff_lists(old, new, path, changes):
+    """
+    :param old: the elements of the original list
+    :type old: [_Node]
+    :param new: the elements of the changed list
+    :type new: [_Node]
+    :param path: path of the lists
+    :type path: tuple
+    :param changes: receives the changes
+    :type changes: [Change]
+    :rtype: None
+    """
+
+    old_keys = _element_keys(old)
+    new_keys = _element_keys(new)
+    if old_keys is None or new_keys is None:
+        old_keys = [node.digest for node in old]
+        new_keys = [node.digest for node in new]
+
+    matcher = difflib.SequenceMatcher(None, old_keys, new_keys,
+                                      autojunk=False)
+
+    # Going from the end of the list keeps the indices of the blocks that
+    # are still to be changed valid.
+    for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+        if tag == 'equal' or (tag == 'replace' and i2 - i1 == j2 - j1):
+            for offset in range(i2 - i1):
+                _diff(old[i1 + offset], new[j1 + offset],
+                      path + (i1 + offset,), changes)
+            continue
+
+        for index in range(i2 - 1, i1 - 1, -1):
+            changes.append(Change('remove', path + (index,),
+                                  old[index].value, None))
+        for offset in range(j2 - j1):
+            changes.append(Change('add', path + (i1 + offset,),
+                                  None, new[j1 + offset].value))
+
+
+def _element_keys(elements):
+    """
+    :param elements: the elements of a list
+    :type elements: [_Node]
+    :returns: the ids of the elements if they are all objects with unique
+              ids; None otherwise
+    :rtype: [str] | None
+    """
+
+    if not elements:
+        return []
+
+    keys = []
+    for node in elements:
+        if not isinstance(node.value, dict) or 'id' not in node.value:
+            return None
+        keys.append(json.dumps(node.value['id']))
+
+    if len(set(keys)) != len(keys):
+        return None
+
+    return keys
@@ -0,0 +1,354 @@
+import codecs
+import json
+import re
+
+from dcos.errors import DCOSException
+
+_WHITESPACE = ' \t\n\r'
+
+# Characters that end a number, true, false or null
+_SCALAR_END = re.compile(r'[,\]}\s]')
+
+
+def load_sections(chunks, sections):
+    """Incrementally decodes a JSON object from `chunks`, keeping only the
+    top-level keys in `sections`. The other keys are dropped as they
+    arrive, so neither the whole document nor the skipped values are ever
+    held in memory.
+
+    For each key in `sections` the value is either None, to keep the value
+    as is, or a list of fields. In the latter case the value must be a list
+    of objects, which are decoded one at a time and reduced to those fields.
+    E.g. {'slaves': None, 'frameworks': ['id', 'tasks']}
+
+    :param chunks: the JSON document in pieces, e.g. from
+                   requests.Response.iter_content
+    :type chunks: iterable of bytes | str
+    :param sections: the top-level keys to keep
+    :type sections: dict of str to (None | [str])
+    :returns: an object with the selected keys that are in the document
+    :rtype: dict
+    """
+
+    reader = _Reader(chunks)
+    result = {}
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.advance()
+        return result
+
+    while True:
+        key = reader.read_string()
+        reader.expect(':')
+
+        if key not in sections:
+            reader.skip_value()
+        elif sections[key] is None:
+            result[key] = reader.read_value()
+        else:
+            result[key] = list(_project(reader, sections[key]))
+
+        if reader.next_char() == '}':
+            return result
+        reader.assert_last(',')
+
+
+def iter_section(chunks, key):
+    """Incrementally decodes the list under the top-level `key` of a JSON
+    object from `chunks`, yielding its elements one at a time.  Reading
+    stops as soon as the caller stops iterating, so a search for one
+    element only reads the document up to that element.
+
+    :param chunks: the JSON document in pieces, e.g. from
+                   requests.Response.iter_content
+    :type chunks: iterable of bytes | str
+    :param key: the top-level key of the list
+    :type key: str
+    :returns: the elements of the list; nothing if there is no such key
+    :rtype: iterator
+    """
+
+    reader = _Reader(chunks)
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        if reader.read_string() == key:
+            reader.expect(':')
+            for element in _iter_list(reader):
+                yield element
+            return
+
+        reader.expect(':')
+        reader.skip_value()
+
+        if reader.next_char() == '}':
+            return
+        reader.assert_last(',')
+
+
+def _project(reader, fields):
+    """Decodes a list of objects one element at a time and keeps only
+    `fields` of each element.  The other fields are skipped as they are
+    read, without decoding the whole element.
+
+    :param reader: reader positioned at the start of the list
+    :type reader: _Reader
+    :param fields: fields to keep
+    :type fields: [str]
+    :returns: the projected elements
+    :rtype: iterator of dict
+    """
+
+    for _ in _iter_elements(reader, '['):
+        result = {}
+        for key in _iter_elements(reader, '{'):
+            if key in fields:
+                result[key] = reader.read_value()
+            else:
+                reader.skip_value()
+        yield result
+
+
+def _iter_list(reader):
+    """Decodes a list one element at a time.
+
+    :param reader: reader positioned at the start of the list
+    :type reader: _Reader
+    :returns: the elements
+    :rtype: iterator
+    """
+
+    for _ in _iter_elements(reader, '['):
+        yield reader.read_value()
+
+
+def _iter_elements(reader, opening):
+    """Walks the elements of a list or the members of an object.  For
+    each of them, the caller must consume the element's value, or the
+    member's value after the key is yielded.
+
+    :param reader: reader positioned at the start of the list or object
+    :type reader: _Reader
+    :param opening: '[' for a list, '{' for an object
+    :type opening: str
+    :returns: None for each element of a list, or the key of each member
+              of an object
+    :rtype: iterator of None | str
+    """
+
+    closing = ']' if opening == '[' else '}'
+
+    reader.expect(opening)
+    if reader.peek() == closing:
+        reader.advance()
+        return
+
+    while True:
+        if opening == '{':
+            key = reader.read_string()
+            reader.expect(':')
+            yield key
+        else:
+            yield None
+
+        if reader.next_char() == closing:
+            return
+        reader.assert_last(',')
+
+
+def _loads(text):
+    """
+    :param text: JSON value
+    :type text: str
+    :returns: the decoded value
+    :rtype: dict | list | str | int | float | bool | None
+    """
+
+    try:
+        return json.loads(text)
+    except ValueError as error:
+        raise DCOSException('Error decoding JSON: {}'.format(error))
+
+
+class _Reader(object):
+    """Buffered reader over a stream of JSON text.
+
+    :param chunks: the JSON document in pieces
+    :type chunks: iterable of bytes | str
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._last = None
+
+    def _fill(self, minimum=1):
+        """Drops the consumed part of the buffer and appends at least
+        `minimum` characters from the stream.
+
+        :param minimum: number of characters to read
+        :type minimum: int
+        :returns: False if the stream ended before anything was read
+        :rtype: bool
+        """
+
+        pieces = [self._buffer[self._pos:]]
+        read = 0
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._decoder.decode(chunk)
+            pieces.append(chunk)
+            read += len(chunk)
+            if read >= minimum:
+                break
+
+        self._buffer = ''.join(pieces)
+        self._pos = 0
+        return read > 0
+
+    def _fail(self, expected):
+        raise DCOSException(
+            'Error decoding JSON: expected {} but found {!r}'.format(
+                expected,
+                self._buffer[self._pos:self._pos + 20] or 'end of input'))
+
+    def peek(self):
+        """
+        :returns: the next non-whitespace character without consuming it
+        :rtype: str
+        """
+
+        while True:
+            while self._pos < len(self._buffer):
+                if self._buffer[self._pos] not in _WHITESPACE:
+                    return self._buffer[self._pos]
+                self._pos += 1
+
+            if not self._fill():
+                return ''
+
+    def advance(self):
+        self._pos += 1
+
+    def next_char(self):
+        """
+        :returns: the next non-whitespace character
+        :rtype: str
+        """
+
+        char = self.peek()
+        self._pos += 1
+        self._last = char
+        return char
+
+    def expect(self, char):
+        if self.next_char() != char:
+            self._pos -= 1
+            self._fail(repr(char))
+
+    def assert_last(self, char):
+        if self._last != char:
+            self._pos -= 1
+            self._fail(repr(char))
+
+    def read_string(self):
+        """
+        :returns: the decoded string at the current position
+        :rtype: str
+        """
+
+        if self.peek() != '"':
+            self._fail('a string')
+
+        return self.read_value()
+
+    def read_value(self):
+        """
+        :returns: the decoded value at the current position
+        :rtype: dict | list | str | int | float | bool | None
+        """
+
+        first = self.peek()
+        if first == '':
+            self._fail('a value')
+
+        if first not in '{["':
+            parts = []
+            self._scan_until(_SCALAR_END, parts.append)
+            return _loads(''.join(parts))
+
+        # An object or list that is not in the buffer yet is decoded one
+        # element at a time, so that it is never decoded more than once
+        if first != '"':
+            try:
+                value, self._pos = self._json_decoder.raw_decode(
+                    self._buffer, self._pos)
+                return value
+            except ValueError:
+                pass
+
+            if first == '[':
+                return list(_iter_list(self))
+            return dict((key, self.read_value())
+                        for key in _iter_elements(self, '{'))
+
+        # A truncated string never decodes, so keep reading until it is
+        # complete. Doubling the buffer on each attempt bounds the work to
+        # twice the size of the value.
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(
+                    self._buffer, self._pos)
+            except ValueError as error:
+                if not self._fill(len(self._buffer) - self._pos):
+                    raise DCOSException(
+                        'Error decoding JSON: {}'.format(error))
+            else:
+                self._pos = end
+                return value
+
+    def skip_value(self):
+        """Consumes the value at the current position. The elements of a
+        list or object are decoded and dropped one at a time, so only one
+        of them is in memory at once.
+
+        :rtype: None
+        """
+
+        first = self.peek()
+        if first not in '{[':
+            self.read_value()
+            return
+
+        for _ in _iter_elements(self, first):
+            self.read_value()
+
+    def _scan_until(self, pattern, emit):
+        """Consumes text up to the first match of `pattern`, or the end of
+        the stream.
+
+        :param pattern: pattern that ends the value
+        :type pattern: re.RegexObject
+        :param emit: receives the pieces of the value
+        :type emit: function
+        :rtype: None
+        """
+
+        while True:
+            match = pattern.search(self._buffer, self._pos)
+            if match is not None:
+                emit(self._buffer[self._pos:match.start()])
+                self._pos = match.start()
+                return
+
+            emit(self._buffer[self._pos:])
+            self._pos = len(self._buffer)
+            if not self._fill():
+                return
@@ -1,13 +1,55 @@
+import collections
+import fnmatch
 import json
+import posixpath
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 from distutils.version import LooseVersion
 
-from dcos import http, util
+import requests
+from dcos import cache, http, jsonstream, sse, util
 from dcos.errors import DCOSException, DefaultError, Error
 
 from six.moves import urllib
 
 logger = util.get_logger(__name__)
 
+_STREAM_CHUNK_SIZE = 64 * 1024
+"""Size of the pieces in which streamed responses are decoded"""
+
+APPS_CACHE_NAME = 'marathon-apps'
+"""Name of the cache of app listings, under ~/.dcos/cache"""
+
+DEFAULT_APPS_CACHE_TTL = 5
+"""Default number of seconds for which app listings are cached, so that
+commands run in quick succession share them"""
+
+VERSIONS_CACHE_NAME = 'marathon-versions'
+"""Name of the cache of app and group versions, under ~/.dcos/cache"""
+
+VERSIONS_CACHE_SIZE = 1000
+"""Maximum number of entries in the cache of app and group versions"""
+
+APP_EMBEDS = {
+    'tasksStaged': 'apps.counts',
+    'tasksRunning': 'apps.counts',
+    'tasksHealthy': 'apps.counts',
+    'tasksUnhealthy': 'apps.counts',
+    'deployments': 'apps.deployments',
+    'tasks': 'apps.tasks',
+    'lastTaskFailure': 'apps.lastTaskFailure',
+}
+"""The embed parameter of v2/apps that includes each of the app fields
+that are not part of the app's definition"""
+
+STATUS_FIELDS = frozenset(list(APP_EMBEDS) + ['version', 'versionInfo'])
+"""Fields of apps and groups that Marathon maintains, as opposed to those
+of their definitions"""
+
+DEPLOYMENT_EVENTS = ['deployment_step_success', 'deployment_success',
+                     'deployment_failed']
+"""Types of the events that report a deployment's progress"""
+
 
 def create_client(config=None):
     """Creates a Marathon client with the supplied configuration.
@@ -23,8 +65,21 @@ def create_client(config=None):
 
     marathon_uri = _get_marathon_uri(config)
 
+    apps_cache = None
+    ttl = config.get('marathon.apps_cache_ttl', DEFAULT_APPS_CACHE_TTL)
+    if ttl > 0:
+        apps_cache = cache.FileCache(cache.cache_dir(APPS_CACHE_NAME), ttl)
+
+    versions_cache = None
+    if config.get('marathon.versions_cache', True):
+        # Versions never change once they are written, so they stay fresh
+        # until they are evicted
+        versions_cache = cache.FileCache(
+            cache.cache_dir(VERSIONS_CACHE_NAME), float('inf'),
+            VERSIONS_CACHE_SIZE)
+
     logger.info('Creating marathon client with: %r', marathon_uri)
-    return Client(marathon_uri)
+    return Client(marathon_uri, apps_cache, versions_cache)
 
 
 def _get_marathon_uri(config):
@@ -74,10 +129,23 @@ class Client(object):
 
     :param marathon_uri: the base URI for the Marathon server
     :type marathon_uri: str
+    :param apps_cache: if set, app listings, version lists and the
+                       server's info are served from this cache while they
+                       are fresh.  It is cleared whenever this client
+                       changes an app, group or deployment.
+    :type apps_cache: dcos.cache.FileCache
+    :param versions_cache: if set, the definitions of past app and group
+                           versions are kept in this cache.  They never
+                           change, so they are only fetched once.  Without
+                           an apps cache, the version lists are kept there
+                           too, and revalidated on every use.
+    :type versions_cache: dcos.cache.FileCache
     """
 
-    def __init__(self, marathon_uri):
+    def __init__(self, marathon_uri, apps_cache=None, versions_cache=None):
         self._base_uri = marathon_uri
+        self._apps_cache = apps_cache
+        self._versions_cache = versions_cache
 
         min_version = "0.8.1"
         version = LooseVersion(self.get_about()["version"])
@@ -98,6 +166,18 @@ class Client(object):
 
         return urllib.parse.urljoin(self._base_uri, path)
 
+    def asynchronous(self):
+        """Lets requests for many apps be made at once, e.g. to list the
+        tasks of every app: `client.asynchronous().get_tasks(app_id)`
+        returns a future of the app's tasks.
+
+        :returns: this client, with each method returning a future.  See
+                  :py:class:`dcos.http.AsyncProxy`.
+        :rtype: dcos.http.AsyncProxy
+        """
+
+        return http.AsyncProxy(self)
+
     def get_about(self):
         """Returns info about Marathon instance
 
@@ -107,9 +187,7 @@ class Client(object):
 
         url = self._create_url('v2/info')
 
-        response = http.get(url, to_error=_to_error)
-
-        return response.json()
+        return self._get_json(url)
 
     def get_app(self, app_id, version=None):
         """Returns a representation of the requested application version. If
@@ -124,19 +202,15 @@ class Client(object):
         """
 
         app_id = self.normalize_app_id(app_id)
-        if version is None:
-            url = self._create_url('v2/apps{}'.format(app_id))
-        else:
-            url = self._create_url(
-                'v2/apps{}/versions/{}'.format(app_id, version))
+        if version is not None:
+            # Looks like Marathon return different JSON for versions
+            return self._get_version('apps', app_id, version)
+
+        url = self._create_url('v2/apps{}'.format(app_id))
 
         response = http.get(url, to_error=_to_error)
 
-        # Looks like Marathon return different JSON for versions
-        if version is None:
-            return response.json()['app']
-        else:
-            return response.json()
+        return response.json()['app']
 
     def get_groups(self):
         """Get a list of known groups.
@@ -164,27 +238,85 @@ class Client(object):
         """
 
         group_id = self.normalize_app_id(group_id)
-        if version is None:
-            url = self._create_url('v2/groups{}'.format(group_id))
-        else:
-            url = self._create_url(
-                'v2/groups{}/versions/{}'.format(group_id, version))
+        if version is not None:
+            return self._get_version('groups', group_id, version)
+
+        url = self._create_url('v2/groups{}'.format(group_id))
 
         response = http.get(url, to_error=_to_error)
 
         return response.json()
 
+    def _get_version(self, id_type, id_, version):
+        """Returns a past version of an app or group, from the versions
+        cache if it has a copy.
+
+        :param id_type: type of the id ("apps" or "groups")
+        :type id_type: str
+        :param id_: the normalized ID of the app or group
+        :type id_: str
+        :param version: version as a ISO8601 datetime
+        :type version: str
+        :returns: the definition of the app or group at `version`
+        :rtype: dict
+        """
+
+        url = self._create_url(
+            'v2/{}{}/versions/{}'.format(id_type, id_, version))
+
+        if self._versions_cache is None:
+            return http.get(url, to_error=_to_error).json()
+
+        # The cluster, the app or group and the version identify the
+        # definition.  The cache is shared by every configured cluster.
+        key = json.dumps([self._base_uri, id_type, id_, version])
+        definition = self._versions_cache.get_fresh(key)
+        if definition is not None:
+            logger.info('Using cached copy of %r', url)
+            return definition
+
+        definition = http.get(url, to_error=_to_error).json()
+        self._versions_cache.put(key, definition)
+        return definition
+
     def get_app_versions(self, app_id, max_count=None):
         """Asks Marathon for all the versions of the Application up to a
         maximum count.
 
-        :param app_id: the ID of the application or group
+        :param app_id: the ID of the application
         :type app_id: str
+        :param max_count: the maximum number of version to fetch
+        :type max_count: int
+        :returns: a list of all the version of the application, newest
+                  first
+        :rtype: [str]
+        """
+
+        return self._get_versions('apps', app_id, max_count)
+
+    def get_group_versions(self, group_id, max_count=None):
+        """Asks Marathon for all the versions of the group up to a maximum
+        count.
+
+        :param group_id: the ID of the group
+        :type group_id: str
+        :param max_count: the maximum number of version to fetch
+        :type max_count: int
+        :returns: a list of all the version of the group, newest first
+        :rtype: [str]
+        """
+
+        return self._get_versions('groups', group_id, max_count)
+
+    def _get_versions(self, id_type, id_, max_count):
+        """
         :param id_type: type of the id ("apps" or "groups")
-        :type app_id: str
+        :type id_type: str
+        :param id_: the ID of the app or group
+        :type id_: str
         :param max_count: the maximum number of version to fetch
         :type max_count: int
-        :returns: a list of all the version of the application
+        :returns: the versions of the app or group, newest first
         :rtype: [str]
         """
 
@@ -193,29 +325,209 @@ class Client(object):
                 'Maximum count must be a positive number: {}'.format(max_count)
             )
 
-        app_id = self.normalize_app_id(app_id)
+        id_ = self.normalize_app_id(id_)
 
-        url = self._create_url('v2/apps{}/versions'.format(app_id))
+        url = self._create_url('v2/{}{}/versions'.format(id_type, id_))
 
-        response = http.get(url, to_error=_to_error)
+        # Marathon lists the versions of an app in an object, but those
+        # of a group as is
+        if self._apps_cache is None and self._versions_cache is not None:
+            document = self._revalidate_json(
+                self._versions_cache,
+                json.dumps([self._base_uri, id_type, id_]),
+                url)
+        else:
+            document = self._get_json(url)
+        versions = document['versions'] if id_type == 'apps' else document
 
         if max_count is None:
-            return response.json()['versions']
+            return versions
         else:
-            return response.json()['versions'][:max_count]
+            return versions[:max_count]
 
-    def get_apps(self):
+    def get_apps(self, embed=None, fields=None, fresh=False):
         """Get a list of known applications.
 
+        :param embed: the embed parameters of the request, which add
+                      fields such as the apps' tasks. E.g. ['apps.tasks'].
+                      See `APP_EMBEDS`.
+        :type embed: [str]
+        :param fields: if set, the response is decoded as it streams in
+                       and only these fields of each app are kept
+        :type fields: [str]
+        :param fresh: if True, ask Marathon for the list even if the apps
+                      cache has a fresh copy of it
+        :type fresh: bool
         :returns: list of known applications
         :rtype: [dict]
         """
 
         url = self._create_url('v2/apps')
 
-        response = http.get(url, to_error=_to_error)
+        params = None
+        if embed:
+            params = {'embed': sorted(embed)}
+
+        sections = None
+        if fields is not None:
+            sections = {'apps': sorted(fields)}
+
+        return self._get_json(url, params, sections, fresh)['apps']
+
+    def _get_json(self, url, params=None, sections=None, fresh=False):
+        """Gets a JSON document, from the apps cache if it has a fresh copy.
+        A stale copy is revalidated if Marathon sent validators for it.
+
+        :param url: url of the document
+        :type url: str
+        :param params: query parameters
+        :type params: dict
+        :param sections: if set, the response is decoded as it streams in
+                         and only these sections are kept.  See
+                         :py:func:`dcos.jsonstream.load_sections`.
+        :type sections: dict
+        :param fresh: if True, a fresh cached copy is revalidated too
+        :type fresh: bool
+        :returns: the document
+        :rtype: dict | list
+        """
 
-        return response.json()['apps']
+        if self._apps_cache is None:
+            return self._fetch_json(url, params, sections)[0]
+
+        key = json.dumps([url, params, sections], sort_keys=True)
+        entry = self._apps_cache.get(key)
+        if entry is not None and not fresh and \
+                self._apps_cache.is_fresh(entry):
+            logger.info('Using cached copy of %r', url)
+            return entry.value
+
+        return self._revalidate_json(
+            self._apps_cache, key, url, params, sections, entry)
+
+    def _revalidate_json(self, json_cache, key, url, params=None,
+                         sections=None, entry=None):
+        """Gets a JSON document, unless the cached copy is still valid.
+
+        :param json_cache: cache of the document
+        :type json_cache: dcos.cache.FileCache
+        :param key: key of the document in `json_cache`
+        :type key: str
+        :param url: url of the document
+        :type url: str
+        :param params: query parameters
+        :type params: dict
+        :param sections: sections to decode; all of them if None
+        :type sections: dict
+        :param entry: the cached copy, if it was already read
+        :type entry: dcos.cache.CacheEntry
+        :returns: the document
+        :rtype: dict | list
+        """
+
+        if entry is None:
+            entry = json_cache.get(key)
+
+        headers = {'Accept': 'application/json'}
+        if entry is not None:
+            headers.update(cache.conditional_headers(entry.validators))
+
+        document, validators = self._fetch_json(
+            url, params, sections, headers)
+        if document is None:
+            logger.info('Cached copy of %r is still valid', url)
+            json_cache.touch(key, entry)
+            return entry.value
+
+        json_cache.put(key, document, validators)
+        return document
+
+    def _fetch_json(self, url, params, sections, headers=None):
+        """
+        :param url: url of the document
+        :type url: str
+        :param params: query parameters
+        :type params: dict
+        :param sections: sections to decode; all of them if None
+        :type sections: dict
+        :param headers: request headers, e.g. for a conditional request
+        :type headers: dict
+        :returns: the document, or None if Marathon answered 304 Not
+                  Modified, and the validators of the response
+        :rtype: (dict, dict)
+        """
+
+        def is_success(status):
+            return 200 <= status < 300 or status == 304
+
+        kwargs = {'is_success': is_success}
+        if headers is not None:
+            kwargs['headers'] = headers
+
+        response = http.get(url,
+                            params=params,
+                            to_error=_to_error,
+                            stream=sections is not None,
+                            **kwargs)
+        try:
+            if response.status_code == 304:
+                document = None
+            elif sections is None:
+                document = response.json()
+            else:
+                document = jsonstream.load_sections(
+                    response.iter_content(_STREAM_CHUNK_SIZE), sections)
+        finally:
+            response.close()
+
+        return document, cache.validators(response)
+
+    def _changed(self):
+        """Clears the apps cache after a change.
+
+        :rtype: None
+        """
+
+        if self._apps_cache is not None:
+            self._apps_cache.clear()
+
+    def match_app_ids(self, patterns):
+        """Resolves app ids and unix glob patterns over the ids of the
+        deployed apps, e.g. '/group/*'.  The apps are only listed if there
+        is a pattern, and then by Marathon rather than from the apps cache,
+        since the ids are about to be changed.
+
+        :param patterns: app ids and glob patterns
+        :type patterns: [str]
+        :returns: the matching app ids, without duplicates, in the order of
+                  `patterns`
+        :rtype: [str]
+        """
+
+        app_ids = None
+        matches = []
+        seen = set()
+        for pattern in patterns:
+            pattern = '/' + pattern.strip('/')
+            if not is_app_id_pattern(pattern):
+                found = [pattern]
+            else:
+                if app_ids is None:
+                    app_ids = sorted(
+                        app['id']
+                        for app in self.get_apps(fields=['id'], fresh=True))
+                found = [app_id for app_id in app_ids
+                         if fnmatch.fnmatchcase(app_id, pattern)]
+                if not found:
+                    raise DCOSException(
+                        'No application matches {!r}'.format(pattern))
+
+            for app_id in found:
+                if app_id not in seen:
+                    seen.add(app_id)
+                    matches.append(app_id)
+
+        return matches
 
     def add_app(self, app_resource):
         """Add a new application.
@@ -237,6 +549,7 @@ class Client(object):
         response = http.post(url,
                              json=app_json,
                              to_error=_to_error)
+        self._changed()
 
         return response.json()
 
@@ -268,6 +581,7 @@ class Client(object):
                             params=params,
                             json=payload,
                             to_error=_to_error)
+        self._changed()
 
         return response.json().get('deploymentId')
 
@@ -301,6 +615,146 @@ class Client(object):
 
         return self._update(group_id, payload, force, "groups")
 
+    def deploy_apps(self, apps, force=None, interval=1, timeout=None):
+        """Adds or updates several apps concurrently, on the shared worker
+        pool, in the order of their dependencies.  The apps are submitted
+        level by level: the deployments of the apps that other apps in
+        `apps` depend on are followed together until they finish, and only
+        then are those apps submitted.  Dependencies on apps that are not
+        in `apps` are left to Marathon.
+
+        :param apps: app definitions
+        :type apps: [dict]
+        :param force: whether to override running deployments
+        :type force: bool
+        :param interval: number of seconds between polls of a deployment
+                         when the event stream is unavailable
+        :type interval: int
+        :param timeout: maximum number of seconds to wait for the
+                        deployments that other apps depend on
+        :type timeout: float
+        :returns: the result for each app as soon as it is known: its id,
+                  'action' ('add' or 'update'), 'deploymentId' and 'error',
+                  which is None if the app was deployed.  The apps that
+                  depend on an app that failed are not submitted.
+        :rtype: generator of dict
+        """
+
+        apps, dependencies = _dependency_graph(apps)
+
+        existing = set(app['id']
+                       for app in self.get_apps(fields=['id'], fresh=True))
+
+        dependents = collections.defaultdict(list)
+        for app_id in sorted(dependencies):
+            for dependency in dependencies[app_id]:
+                dependents[dependency].append(app_id)
+
+        waiting = dict((app_id, len(dependencies[app_id]))
+                       for app_id in apps)
+        skipped = set()
+        deadline = None if timeout is None else time.time() + timeout
+
+        def result(app_id, deployment_id, error):
+            return {'id': app_id,
+                    'action': 'update' if app_id in existing else 'add',
+                    'deploymentId': deployment_id,
+                    'error': error}
+
+        def finish(app_id, error):
+            # Releases the dependents of a deployed app, or returns the
+            # results of the dependents skipped because it was not
+            if error is None:
+                for dependent in dependents[app_id]:
+                    waiting[dependent] -= 1
+                return []
+
+            results = []
+            for dependent in _transitive_dependents(app_id, dependents):
+                if dependent not in skipped:
+                    skipped.add(dependent)
+                    results.append(result(
+                        dependent, None,
+                        'Dependency {} was not deployed'.format(app_id)))
+            return results
+
+        level = sorted(app_id for app_id in apps if waiting[app_id] == 0)
+        while level:
+            futures = dict(
+                (http.submit(self._deploy_app,
+                             apps[app_id],
+                             app_id in existing,
+                             force), app_id)
+                for app_id in level)
+
+            # The deployments that other apps wait for are followed
+            # together, from here rather than from the worker pool, once
+            # the whole level was submitted
+            followed = {}
+            while futures:
+                done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=futures.get):
+                    app_id = futures.pop(future)
+                    error = future.exception()
+                    if error is not None and \
+                            not isinstance(error, DCOSException):
+                        raise error
+
+                    if error is None and dependents[app_id]:
+                        followed[app_id] = future.result()
+                        continue
+
+                    error = str(error) if error else None
+                    yield result(app_id,
+                                 None if error else future.result(),
+                                 error)
+                    for skipped_result in finish(app_id, error):
+                        yield skipped_result
+
+            if followed:
+                remaining = None
+                if deadline is not None:
+                    remaining = max(deadline - time.time(), 0)
+                failed, pending = self._await_deployments(
+                    followed.values(), remaining, interval)
+
+                for app_id in sorted(followed):
+                    deployment_id = followed[app_id]
+                    error = None
+                    if deployment_id in failed:
+                        error = 'Deployment {} failed'.format(deployment_id)
+                    elif deployment_id in pending:
+                        error = 'Timed out waiting for deployment {}'.format(
+                            deployment_id)
+
+                    yield result(app_id, deployment_id, error)
+                    for skipped_result in finish(app_id, error):
+                        yield skipped_result
+
+            level = sorted(set(
+                dependent
+                for app_id in level
+                for dependent in dependents[app_id]
+                if waiting[dependent] == 0 and dependent not in skipped))
+
+    def _deploy_app(self, app, exists, force):
+        """
+        :param app: app definition with a normalized id
+        :type app: dict
+        :param exists: whether to update the app rather than add it
+        :type exists: bool
+        :param force: whether to override running deployments
+        :type force: bool
+        :returns: the resulting deployment ID
+        :rtype: str
+        """
+
+        if exists:
+            return self.update_app(app['id'], app, force)
+
+        deployments = self.add_app(app).get('deployments') or [{}]
+        return deployments[0].get('id')
+
     def scale_app(self, app_id, instances, force=None):
         """Scales an application to the requested number of instances.
 
@@ -311,7 +765,7 @@ class Client(object):
         :param force: whether to override running deployments
         :type force: bool
         :returns: the resulting deployment ID
-        :rtype: bool
+        :rtype: str
         """
 
         app_id = self.normalize_app_id(app_id)
@@ -323,16 +777,13 @@ class Client(object):
 
         url = self._create_url('v2/apps{}'.format(app_id))
 
-        response, error = http.put(url,
-                                   params=params,
-                                   json={'instances': int(instances)},
-                                   to_error=_to_error)
-
-        if error is not None:
-            return (None, error)
+        response = http.put(url,
+                            params=params,
+                            json={'instances': int(instances)},
+                            to_error=_to_error)
+        self._changed()
 
-        deployment = response.json()['deploymentId']
-        return (deployment, None)
+        return response.json()['deploymentId']
 
     def stop_app(self, app_id, force=None):
         """Scales an application to zero instances.
@@ -342,7 +793,7 @@ class Client(object):
         :param force: whether to override running deployments
         :type force: bool
         :returns: the resulting deployment ID
-        :rtype: bool
+        :rtype: str
         """
 
         return self.scale_app(app_id, 0, force)
@@ -354,7 +805,8 @@ class Client(object):
         :type app_id: str
         :param force: whether to override running deployments
         :type force: bool
-        :rtype: None
+        :returns: the resulting deployment ID, if Marathon reports it
+        :rtype: str
         """
 
         app_id = self.normalize_app_id(app_id)
@@ -366,7 +818,13 @@ class Client(object):
 
         url = self._create_url('v2/apps{}'.format(app_id))
 
-        http.delete(url, params=params, to_error=_to_error)
+        response = http.delete(url, params=params, to_error=_to_error)
+        self._changed()
+
+        try:
+            return response.json().get('deploymentId')
+        except ValueError:
+            return None
 
     def remove_group(self, group_id, force=None):
         """Completely removes the requested application.
@@ -388,6 +846,7 @@ class Client(object):
         url = self._create_url('v2/groups{}'.format(group_id))
 
         http.delete(url, params=params, to_error=_to_error)
+        self._changed()
 
     def restart_app(self, app_id, force=None):
         """Performs a rolling restart of all of the tasks.
@@ -412,6 +871,7 @@ class Client(object):
         response = http.post(url,
                              params=params,
                              to_error=_to_error)
+        self._changed()
 
         return response.json()
 
@@ -460,6 +920,245 @@ class Client(object):
 
         return deployments
 
+    def get_events(self, event_types=None, read_timeout=None):
+        """Subscribes to Marathon's event stream.  The subscription is
+        made before this method returns, so no event that happens after
+        the call is missed.
+
+        :param event_types: if set, only these types of events are
+                            requested. E.g. ['deployment_success']
+        :type event_types: [str]
+        :param read_timeout: if set, iterating the events fails once the
+                             server sent nothing for this many seconds
+        :type read_timeout: float
+        :returns: the events as they arrive.  Close the iterator to
+                  unsubscribe, whether or not it was iterated.
+        :rtype: iterator of dict
+        """
+
+        url = self._create_url('v2/events')
+
+        params = None
+        if event_types is not None:
+            params = {'event_type': event_types}
+
+        # By default wait forever for the next event, but not for the
+        # connection
+        response = http.get(url,
+                            params=params,
+                            headers={'Accept': 'text/event-stream'},
+                            stream=True,
+                            timeout=(http.default_timeout(), read_timeout),
+                            to_error=_events_to_error)
+
+        content_type = response.headers.get('Content-Type', '')
+        if not content_type.startswith('text/event-stream'):
+            response.close()
+            raise DCOSException(
+                'Marathon did not return an event stream: {!r}'.format(
+                    content_type))
+
+        return _EventStream(response)
+
+    def watch_deployment(self, deployment_id, max_count=None, interval=1):
+        """Follows a deployment until it finishes.  The deployment's steps
+        are reported as Marathon's event stream announces them.  If the
+        stream is unavailable, the deployment is polled every `interval`
+        seconds instead.
+
+        :param deployment_id: the deployment id
+        :type deployment_id: str
+        :param max_count: maximum number of updates to report
+        :type max_count: int
+        :param interval: number of seconds between polls
+        :type interval: int
+        :returns: the deployment and then each event of the deployment,
+                  or the deployment after each poll.  Raises a
+                  DCOSException if the deployment failed.
+        :rtype: generator of dict
+        """
+
+        count = 0
+
+        # A single update is the deployment itself; the stream is not
+        # needed for it
+        if max_count is not None and max_count <= 1:
+            events = None
+        else:
+            try:
+                events = self.get_events(DEPLOYMENT_EVENTS)
+            except DCOSException as e:
+                logger.info('Polling deployment %r instead of watching '
+                            'events: %s', deployment_id, e)
+                events = None
+
+        if events is not None:
+            try:
+                deployment = self.get_deployment(deployment_id)
+                if deployment is None:
+                    return
+
+                yield deployment
+                count += 1
+
+                for event in events:
+                    if _event_deployment_id(event) != deployment_id:
+                        continue
+
+                    yield event
+                    count += 1
+
+                    if event['eventType'] == 'deployment_success':
+                        return
+                    elif event['eventType'] == 'deployment_failed':
+                        raise DCOSException(
+                            'Deployment {} failed'.format(deployment_id))
+
+                    # Do not wait on the stream for an update that will
+                    # not be reported
+                    if max_count is not None and count >= max_count:
+                        return
+
+                logger.info('Event stream ended; polling deployment %r',
+                            deployment_id)
+            except requests.exceptions.RequestException as e:
+                logger.info('Event stream failed; polling deployment %r: '
+                            '%r', deployment_id, e)
+            finally:
+                events.close()
+
+        while max_count is None or count < max_count:
+            if count > 0:
+                time.sleep(interval)
+
+            deployment = self.get_deployment(deployment_id)
+            if deployment is None:
+                return
+
+            yield deployment
+            count += 1
+
+    def wait_for_deployments(self, deployment_ids, timeout=None, interval=1):
+        """Waits until all of the deployments finished.  They are tracked
+        together, through one subscription to Marathon's event stream or,
+        if the stream is unavailable, by listing the deployments every
+        `interval` seconds, so the cost does not grow with their number.
+
+        :param deployment_ids: the deployment ids; None is ignored
+        :type deployment_ids: [str]
+        :param timeout: maximum number of seconds to wait
+        :type timeout: float
+        :param interval: number of seconds between polls
+        :type interval: float
+        :returns: once the deployments finished.  Raises a DCOSException
+                  if any of them failed, as far as the event stream
+                  reported, or if they did not finish in time.
+        :rtype: None
+        """
+
+        failed, pending = self._await_deployments(
+            deployment_ids, timeout, interval)
+
+        if pending:
+            raise DCOSException(
+                'Timed out waiting for deployments: {}'.format(
+                    ', '.join(sorted(pending))))
+
+        if failed:
+            raise DCOSException('Deployments failed: {}'.format(
+                ', '.join(sorted(failed))))
+
+    def _await_deployments(self, deployment_ids, timeout, interval):
+        """
+        :param deployment_ids: the deployment ids; None is ignored
+        :type deployment_ids: [str]
+        :param timeout: maximum number of seconds to wait
+        :type timeout: float
+        :param interval: number of seconds between polls
+        :type interval: float
+        :returns: the deployments that failed, as far as the event stream
+                  reported, and those that did not finish in time
+        :rtype: (set of str, set of str)
+        """
+
+        pending = set(deployment_id for deployment_id in deployment_ids
+                      if deployment_id is not None)
+        failed = set()
+        if not pending:
+            return failed, pending
+
+        deadline = None if timeout is None else time.time() + timeout
+
+        def expired():
+            return deadline is not None and time.time() > deadline
+
+        try:
+            # Nothing is worth reading past the deadline, however the
+            # subscription took
+            events = self.get_events(
+                DEPLOYMENT_EVENTS,
+                read_timeout=None if deadline is None else max(
+                    deadline - time.time(), 0.001))
+        except DCOSException as e:
+            logger.info('Polling deployments instead of watching events: '
+                        '%s', e)
+        else:
+            try:
+                # A deployment that finished after the subscription but
+                # before the listing is no longer pending, but its event
+                # still reports whether it failed
+                tracked = set(pending)
+                pending.intersection_update(self._running_deployments())
+                for event in events if pending else ():
+                    # On a busy cluster most events are about other
+                    # deployments, so the deadline is checked for each one
+                    if expired():
+                        break
+
+                    deployment_id = _event_deployment_id(event)
+                    if deployment_id not in tracked:
+                        continue
+
+                    if event['eventType'] == 'deployment_success':
+                        pending.discard(deployment_id)
+                    elif event['eventType'] == 'deployment_failed':
+                        pending.discard(deployment_id)
+                        failed.add(deployment_id)
+
+                    if not pending:
+                        break
+                else:
+                    if pending:
+                        logger.info('Event stream ended; polling deployments')
+            except requests.exceptions.RequestException as e:
+                logger.info('Event stream failed; polling deployments: %r',
+                            e)
+            finally:
+                events.close()
+
+        while pending:
+            pending.intersection_update(self._running_deployments())
+            if not pending:
+                break
+
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                time.sleep(min(interval, remaining))
+            else:
+                time.sleep(interval)
+
+        return failed, pending
+
+    def _running_deployments(self):
+        """
+        :returns: the ids of the deployments in progress
+        :rtype: set of str
+        """
+
+        return set(deployment['id'] for deployment in self.get_deployments())
+
     def _cancel_deployment(self, deployment_id, force):
         """Cancels an application deployment.
 
@@ -485,6 +1184,7 @@ class Client(object):
             url,
             params=params,
             to_error=_to_error)
+        self._changed()
 
         if force:
             return None
@@ -521,23 +1221,21 @@ class Client(object):
         :rtype: [dict]
         """
 
-        url = self._create_url('v2/tasks')
-
-        response = http.get(url, to_error=_to_error)
+        if app_id is None:
+            url = self._create_url('v2/tasks')
+            response = http.get(url, to_error=_to_error)
+            return response.json()['tasks']
 
-        if app_id is not None:
-            app_id = self.normalize_app_id(app_id)
-            tasks = [
-                task for task in response.json()['tasks']
-                if app_id == task['appId']
-            ]
-        else:
-            tasks = response.json()['tasks']
+        tasks = self._get_app_tasks(app_id)
+        if tasks is None:
+            return []
 
         return tasks
 
     def get_task(self, task_id):
-        """Returns a task
+        """Returns a task.  Only the tasks of the task's app are fetched if
+        the app's id can be derived from `task_id`.  Otherwise, the tasks
+        of all apps are scanned as they stream in, up to the first match.
 
         :param task_id: the id of the task
         :type task_id: str
@@ -545,16 +1243,48 @@ class Client(object):
         :rtype: dict
         """
 
+        app_id = _task_app_id(task_id)
+        if app_id is not None:
+            tasks = self._get_app_tasks(app_id)
+            if tasks is not None:
+                task = next(
+                    (task for task in tasks if task_id == task['id']),
+                    None)
+                if task is not None:
+                    return task
+
         url = self._create_url('v2/tasks')
+        response = http.get(url, to_error=_to_error, stream=True)
+        try:
+            return next(
+                (task for task in jsonstream.iter_section(
+                    response.iter_content(_STREAM_CHUNK_SIZE), 'tasks')
+                 if task_id == task['id']),
+                None)
+        finally:
+            response.close()
+
+    def _get_app_tasks(self, app_id):
+        """
+        :param app_id: the id of the application
+        :type app_id: str
+        :returns: the tasks of the application, or None if there is no such
+                  application
+        :rtype: [dict]
+        """
 
-        response = http.get(url, to_error=_to_error)
+        app_id = self.normalize_app_id(app_id)
+        url = self._create_url('v2/apps{}/tasks'.format(app_id))
 
-        task = next(
-            (task for task in response.json()['tasks']
-             if task_id == task['id']),
-            None)
+        response = http.get(
+            url,
+            is_success=lambda status: 200 <= status < 300 or status == 404,
+            to_error=_to_error)
+
+        if response.status_code == 404:
+            return None
 
-        return task
+        return response.json()['tasks']
 
     def normalize_app_id(self, app_id):
         """Normalizes the application id.
@@ -584,10 +1314,228 @@ class Client(object):
             group_json = group_resource
 
         response = http.post(url, json=group_json, to_error=_to_error)
+        self._changed()
 
         return response.json()
 
 
+def app_embeds(fields):
+    """
+    :param fields: app fields
+    :type fields: [str]
+    :returns: the embed parameters that v2/apps needs to include `fields`
+    :rtype: [str]
+    """
+
+    return sorted(set(APP_EMBEDS[field]
+                      for field in fields
+                      if field in APP_EMBEDS))
+
+
+def definition(document):
+    """
+    :param document: an app or group as returned by Marathon
+    :type document: dict
+    :returns: a copy of `document`, and of the apps and groups it
+              contains, without the fields in `STATUS_FIELDS`
+    :rtype: dict
+    """
+
+    result = dict((key, value)
+                  for key, value in document.items()
+                  if key not in STATUS_FIELDS)
+
+    for key in ('apps', 'groups'):
+        if isinstance(result.get(key), list):
+            result[key] = [definition(child) for child in result[key]]
+
+    return result
+
+
+def _dependency_graph(apps):
+    """Indexes apps by their normalized ids and resolves the dependencies
+    among them.  Relative dependencies are relative to the app's group.
+
+    :param apps: app definitions
+    :type apps: [dict]
+    :returns: copies of the apps with normalized ids by id, and the ids of
+              the apps in `apps` that each app depends on
+    :rtype: (dict of str to dict, dict of str to set of str)
+    """
+
+    by_id = {}
+    for app in apps:
+        if not app.get('id'):
+            raise DCOSException('Every app must have an id')
+
+        app = dict(app, id='/' + app['id'].strip('/'))
+        if app['id'] in by_id:
+            raise DCOSException(
+                'App {!r} is defined more than once'.format(app['id']))
+        by_id[app['id']] = app
+
+    dependencies = {}
+    for app_id, app in by_id.items():
+        group = posixpath.dirname(app_id)
+        resolved = set(
+            posixpath.normpath(posixpath.join(group, dependency))
+            for dependency in app.get('dependencies') or [])
+        dependencies[app_id] = resolved.intersection(by_id) - {app_id}
+
+    # Kahn's algorithm: whatever cannot be ordered is part of a cycle
+    remaining = dict((app_id, set(deps))
+                     for app_id, deps in dependencies.items())
+    ready = [app_id for app_id, deps in remaining.items() if not deps]
+    while ready:
+        done = ready.pop()
+        del remaining[done]
+        for app_id, deps in remaining.items():
+            if done in deps:
+                deps.discard(done)
+                if not deps:
+                    ready.append(app_id)
+
+    if remaining:
+        raise DCOSException(
+            'The dependencies of these apps contain a cycle: {}'.format(
+                ', '.join(sorted(remaining))))
+
+    return by_id, dependencies
+
+
+def _transitive_dependents(app_id, dependents):
+    """
+    :param app_id: app id
+    :type app_id: str
+    :param dependents: the ids of the apps that depend on each app
+    :type dependents: dict of str to [str]
+    :returns: the ids of the apps that depend on `app_id`, directly or
+              not, in order
+    :rtype: [str]
+    """
+
+    result = []
+    stack = list(reversed(dependents[app_id]))
+    while stack:
+        dependent = stack.pop()
+        if dependent not in result:
+            result.append(dependent)
+            stack.extend(reversed(dependents[dependent]))
+
+    return result
+
+
+def is_app_id_pattern(app_id):
+    """
+    :param app_id: app id or unix glob pattern
+    :type app_id: str
+    :returns: whether `app_id` is a glob pattern
+    :rtype: bool
+    """
+
+    return any(char in app_id for char in '*?[')
+
+
+def _events_to_error(response):
+    """
+    :param response: HTTP response object or Error
+    :type response: requests.Response | Error
+    :returns: an error that does not depend on the response's body, which
+              need not be JSON
+    :rtype: Error
+    """
+
+    if isinstance(response, Error):
+        return response
+
+    return DefaultError('Event stream unavailable: {}'.format(
+        response.status_code))
+
+
+class _EventStream(object):
+    """The events of a streamed v2/events response.
+
+    :param response: streamed response of v2/events
+    :type response: requests.Response
+    """
+
+    def __init__(self, response):
+        self._response = response
+        self._events = _iter_marathon_events(response)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._events)
+
+    next = __next__
+
+    def close(self):
+        """Unsubscribes from the event stream.  Unlike closing a generator
+        that was never started, this also closes the response.
+
+        :rtype: None
+        """
+
+        self._events.close()
+        self._response.close()
+
+
+def _iter_marathon_events(response):
+    """
+    :param response: streamed response of v2/events
+    :type response: requests.Response
+    :returns: the decoded events
+    :rtype: generator of dict
+    """
+
+    try:
+        # Read the events as they arrive rather than in fixed-size chunks
+        for event in sse.iter_events(response.iter_content(None)):
+            try:
+                yield json.loads(event.data)
+            except ValueError:
+                logger.info('Ignoring malformed %r event: %r',
+                            event.event, event.data)
+    finally:
+        response.close()
+
+
+def _event_deployment_id(event):
+    """
+    :param event: Marathon event
+    :type event: dict
+    :returns: the id of the deployment the event is about, if any
+    :rtype: str
+    """
+
+    plan = event.get('plan')
+    if plan is not None:
+        return plan.get('id')
+
+    return event.get('id')
+
+
+def _task_app_id(task_id):
+    """Derives the id of a task's app from the task's id, which Marathon
+    builds from the app's id with '/' replaced by '_', a '.' and a UUID.
+    E.g. 'group_app.d44dd7f2-f9b7-11e4-bb43-56847afe9799'.  App ids cannot
+    contain '_', so the mapping can be reversed.
+
+    :param task_id: the id of the task
+    :type task_id: str
+    :returns: the app's id, or None if `task_id` is not of that form
+    :rtype: str
+    """
+
+    app_part, sep, _ = task_id.rpartition('.')
+    if not sep or not app_part:
+        return None
+
+    return '/' + app_part.replace('_', '/')
+
+
 def _default_marathon_error(message=""):
     """
     :param message: additional message
@@ -1,33 +1,108 @@
 import fnmatch
 import itertools
+import json
+import marshal
+import re
 
-from dcos import http, util
+import six
+from dcos import cache, http, jsonstream, util
 from dcos.errors import DCOSException
 
 from six.moves import urllib
 
 logger = util.get_logger(__name__)
 
+STREAM_CHUNK_SIZE = 64 * 1024
+"""Size of the pieces in which a streamed state.json is decoded"""
 
-def get_master(config=None):
+_TASK_FRAMEWORK_FIELDS = ['id', 'name', 'user', 'active', 'hostname']
+
+TASK_SECTIONS = {
+    'slaves': None,
+    'frameworks': _TASK_FRAMEWORK_FIELDS + ['tasks'],
+}
+"""Sections of state.json needed to list running tasks"""
+
+COMPLETED_TASK_SECTIONS = {
+    'slaves': None,
+    'frameworks': _TASK_FRAMEWORK_FIELDS + ['completed_tasks'],
+    'completed_frameworks': _TASK_FRAMEWORK_FIELDS + ['completed_tasks'],
+}
+"""Sections of state.json needed to list completed tasks"""
+
+SERVICE_SECTIONS = {
+    'frameworks': None,
+}
+"""Sections of state.json needed to list services"""
+
+STATE_CACHE_NAME = 'mesos-state'
+"""Name of the cache of master states, under ~/.dcos/cache"""
+
+TASKS_VIEW = 'tasks'
+"""View of the master's state with running tasks, slaves and frameworks"""
+
+COMPLETED_TASKS_VIEW = 'completed_tasks'
+"""View of the master's state with completed tasks, slaves and
+frameworks"""
+
+SERVICES_VIEW = 'services'
+"""View of the master's state with complete framework records"""
+
+SERVICES_SUMMARY_VIEW = 'services_summary'
+"""View of the master's state with framework summaries: ids, names,
+hosts, resources and task counts, but no task records"""
+
+_NOT_MODIFIED = object()
+"""Marks a document that did not change since it was cached"""
+
+_ACTIVE_TASK_STATES = ['TASK_STAGING', 'TASK_STARTING', 'TASK_RUNNING',
+                       'TASK_KILLING']
+
+_GLOB_CHARS = re.compile(r'[*?[]')
+
+_VIEW_SECTIONS = {
+    TASKS_VIEW: TASK_SECTIONS,
+    COMPLETED_TASKS_VIEW: COMPLETED_TASK_SECTIONS,
+    SERVICES_VIEW: SERVICE_SECTIONS,
+    SERVICES_SUMMARY_VIEW: SERVICE_SECTIONS,
+}
+
+
+def get_master(config=None, view=None, use_cache=True, compact=False):
     """Create a Master object using the URLs stored in the user's
     configuration.
 
     :param config: config
     :type config: Toml
+    :param view: if set, only fetch the part of the master's state that
+                 this view needs. See :py:meth:`MasterClient.get_view`.
+    :type view: str
+    :param use_cache: whether to use the state cache, if it is enabled by
+                      `core.state_cache_ttl`
+    :type use_cache: bool
+    :param compact: whether to keep the state in compact records. See
+                    :py:class:`Master`.
+    :type compact: bool
     :returns: master state object
     :rtype: Master
     """
 
-    return Master(get_master_client(config).get_state())
+    client = get_master_client(config, use_cache)
+    if view is None:
+        return Master(client.get_state(), compact)
+
+    return Master(client.get_view(view), compact)
 
 
-def get_master_client(config=None):
+def get_master_client(config=None, use_cache=False):
     """Create a Mesos master client using the URLs stored in the user's
     configuration.
 
     :param config: config
     :type config: Toml
+    :param use_cache: whether to cache the master's state for
+                      `core.state_cache_ttl` seconds
+    :type use_cache: bool
     :returns: mesos master client
     :rtype: MasterClient
     """
@@ -36,7 +111,13 @@ def get_master_client(config=None):
         config = util.get_config()
 
     mesos_url = _get_mesos_url(config)
-    return MasterClient(mesos_url)
+
+    state_cache = None
+    ttl = config.get('core.state_cache_ttl', 0)
+    if use_cache and ttl > 0:
+        state_cache = cache.FileCache(cache.cache_dir(STATE_CACHE_NAME), ttl)
+
+    return MasterClient(mesos_url, state_cache)
 
 
 def _get_mesos_url(config):
@@ -55,15 +136,144 @@ def _get_mesos_url(config):
         return mesos_master_url
 
 
+def compile_task_filter(fltr):
+    """Compiles a task filter into a predicate, so that the filter is
+    parsed and its patterns are translated only once.
+
+    A filter is a pattern, which matches the task's id, or `field=pattern`,
+    which matches one of the fields in `TASK_FILTER_FIELDS`.  E.g.
+    `state=TASK_RUNNING`, `framework=marathon` or `host=10.0.*`.  A pattern
+    matches a value if it is a substring of the value or a unix glob
+    pattern that matches all of it.  A pattern that starts with `re:` is
+    instead a regular expression that matches part of the value.
+
+    :param fltr: a filter, or a list of filters that must all match.  An
+                 empty filter matches all tasks.
+    :type fltr: str | [str]
+    :returns: a function that returns whether the filter matches a task,
+              given the task and its master
+    :rtype: (dict, Master) -> bool
+    """
+
+    if isinstance(fltr, six.string_types):
+        fltr = [fltr]
+
+    predicates = [_compile_term(term) for term in fltr if term]
+
+    if not predicates:
+        return lambda task, master: True
+    elif len(predicates) == 1:
+        return predicates[0]
+    else:
+        return lambda task, master: all(predicate(task, master)
+                                        for predicate in predicates)
+
+
+def _compile_term(term):
+    """
+    :param term: a single filter; see :py:func:`compile_task_filter`
+    :type term: str
+    :returns: predicate on a task and its master
+    :rtype: (dict, Master) -> bool
+    """
+
+    if term.startswith('re:') or '=' not in term:
+        field, pattern = 'id', term
+    else:
+        field, _, pattern = term.partition('=')
+
+    if field not in TASK_FILTER_FIELDS:
+        raise DCOSException(
+            'Unknown task field {!r} in filter {!r}. Expected one of: '
+            '{}'.format(field, term, ', '.join(sorted(TASK_FILTER_FIELDS))))
+
+    get_value = TASK_FILTER_FIELDS[field]
+    matches = _compile_pattern(pattern)
+    return lambda task, master: matches(get_value(task, master))
+
+
+def _compile_pattern(pattern):
+    """
+    :param pattern: substring, unix glob pattern, or regular expression
+                    prefixed with `re:`
+    :type pattern: str
+    :returns: predicate on a value
+    :rtype: str -> bool
+    """
+
+    if pattern.startswith('re:'):
+        try:
+            regex = re.compile(pattern[3:])
+        except re.error as e:
+            raise DCOSException(
+                'Invalid regular expression {!r}: {}'.format(pattern[3:], e))
+        return lambda value: regex.search(value) is not None
+
+    if _GLOB_CHARS.search(pattern) is None:
+        # Without wildcards a glob only matches the pattern itself, which
+        # the substring test already covers
+        return lambda value: pattern in value
+
+    glob = re.compile(fnmatch.translate(pattern))
+    return lambda value: pattern in value or glob.match(value) is not None
+
+
+def _task_framework_name(task, master):
+    """
+    :param task: task
+    :type task: dict
+    :param master: the task's master
+    :type master: Master
+    :returns: name of the task's framework, or '' if it is unknown
+    :rtype: str
+    """
+
+    try:
+        return master.framework(task['framework_id'])['name']
+    except DCOSException:
+        return ''
+
+
+def _task_hostname(task, master):
+    """
+    :param task: task
+    :type task: dict
+    :param master: the task's master
+    :type master: Master
+    :returns: hostname of the task's slave, or '' if it is unknown
+    :rtype: str
+    """
+
+    try:
+        return master.slave_by_id(task['slave_id'])['hostname']
+    except DCOSException:
+        return ''
+
+
+TASK_FILTER_FIELDS = {
+    'id': lambda task, master: task['id'],
+    'name': lambda task, master: task.get('name', ''),
+    'state': lambda task, master: task.get('state', ''),
+    'framework': _task_framework_name,
+    'host': _task_hostname,
+}
+"""Fields that task filters can match, and how to read them from a task
+and its master"""
+
+
 class MasterClient:
     """Client for communicating with the Mesos master
 
     :param url: URL for the Mesos master
     :type url: str
+    :param state_cache: cache for the master's state. If None, the state is
+                        fetched on every call.
+    :type state_cache: dcos.cache.FileCache
     """
 
-    def __init__(self, url):
+    def __init__(self, url, state_cache=None):
         self._base_url = url
+        self._state_cache = state_cache
 
     def _create_url(self, path):
         """Creates the url from the provided path.
@@ -76,17 +286,183 @@ class MasterClient:
 
         return urllib.parse.urljoin(self._base_url, path)
 
-    def get_state(self):
+    def asynchronous(self):
+        """Lets several master endpoints be fetched at the same time, e.g.
+        `client.asynchronous().get_state_summary()` while the slaves are
+        being read.
+
+        :returns: this client, with each method returning a future.  See
+                  :py:class:`dcos.http.AsyncProxy`.
+        :rtype: dcos.http.AsyncProxy
+        """
+
+        return http.AsyncProxy(self)
+
+    def get_view(self, view):
+        """Get the part of the master's state needed for `view`, from the
+        cheapest endpoint that serves it. Falls back to the matching
+        sections of state.json on masters without that endpoint.
+
+        :param view: one of TASKS_VIEW, COMPLETED_TASKS_VIEW, SERVICES_VIEW
+                     or SERVICES_SUMMARY_VIEW
+        :type view: str
+        :returns: a state-like object with the keys the view needs
+        :rtype: dict
+        """
+
+        if view == SERVICES_SUMMARY_VIEW:
+            summary = self._get_json('master/state-summary', optional=True)
+            if summary is not None:
+                return summary
+            logger.info('Master does not serve state-summary')
+        elif view == SERVICES_VIEW:
+            frameworks = self.get_frameworks(optional=True)
+            if frameworks is not None:
+                return frameworks
+            logger.info('Master does not serve frameworks')
+
+        return self.get_state(_VIEW_SECTIONS[view])
+
+    def get_state(self, sections=None):
         """Get the Mesos master state json object
 
+        :param sections: if set, the response is decoded as it streams in
+                         and only these top-level sections are kept. See
+                         :py:func:`dcos.jsonstream.load_sections`.
+        :type sections: dict
         :returns: Mesos' master state json object
         :rtype: dict
         """
 
-        return http.get(self._create_url('master/state.json')).json()
+        return self._get_json('master/state.json', sections=sections)
+
+    def get_state_summary(self):
+        """Get the summary of the master's state: the slaves and frameworks
+        with their resources and task counts, but without their tasks.
+
+        :returns: Mesos' master state-summary json object
+        :rtype: dict
+        """
+
+        return self._get_json('master/state-summary')
+
+    def get_frameworks(self, optional=False):
+        """Get the frameworks known to the master, with their tasks
+
+        :param optional: if True, return None when the master does not
+                         serve master/frameworks
+        :type optional: bool
+        :returns: an object with the 'frameworks', 'completed_frameworks'
+                  and 'unregistered_frameworks' lists
+        :rtype: dict
+        """
+
+        return self._get_json('master/frameworks', optional=optional)
+
+    def get_slaves(self):
+        """Get the slaves registered with the master, without the
+        frameworks and tasks of state.json
+
+        :returns: the slaves
+        :rtype: [dict]
+        """
+
+        return self._get_json('master/slaves')['slaves']
+
+    def _get_json(self, path, params=None, sections=None, optional=False):
+        """Gets a JSON document from the master. With a state cache, a fresh
+        cached document is returned without contacting the master, and a
+        stale one is revalidated if the master sent validators for it.
+
+        :param path: url path
+        :type path: str
+        :param params: query parameters
+        :type params: dict
+        :param sections: if set, the response is decoded as it streams in
+                         and only these top-level sections are kept
+        :type sections: dict
+        :param optional: if True, return None when the master does not
+                         serve `path`
+        :type optional: bool
+        :returns: the decoded document
+        :rtype: dict
+        """
+
+        url = self._create_url(path)
+
+        if self._state_cache is None:
+            document, _ = self._fetch_json(url, params, sections, optional)
+            return document
+
+        key = json.dumps([url, params, sections], sort_keys=True)
+        entry = self._state_cache.get(key)
+        if entry is not None and self._state_cache.is_fresh(entry):
+            logger.info('Using cached copy of %r', url)
+            return entry.value
+
+        headers = {'Accept': 'application/json'}
+        if entry is not None:
+            headers.update(cache.conditional_headers(entry.validators))
+
+        document, validators = self._fetch_json(
+            url, params, sections, optional, headers)
+        if document is _NOT_MODIFIED:
+            logger.info('Cached copy of %r is still valid', url)
+            self._state_cache.touch(key, entry)
+            return entry.value
+
+        if document is not None:
+            self._state_cache.put(key, document, validators)
+        return document
+
+    def _fetch_json(self, url, params, sections, optional, headers=None):
+        """
+        :param url: url of the document
+        :type url: str
+        :param params: query parameters
+        :type params: dict
+        :param sections: sections to decode; all of them if None
+        :type sections: dict
+        :param optional: if True, return None on 404 Not Found
+        :type optional: bool
+        :param headers: request headers, e.g. for a conditional request
+        :type headers: dict
+        :returns: the document, or _NOT_MODIFIED if the master answered
+                  304 Not Modified, and the validators of the response
+        :rtype: (dict, dict)
+        """
+
+        def is_success(status):
+            return (200 <= status < 300 or status == 304 or
+                    (optional and status == 404))
+
+        kwargs = {'is_success': is_success}
+        if headers is not None:
+            kwargs['headers'] = headers
+
+        response = http.get(url,
+                            params=params,
+                            stream=sections is not None,
+                            **kwargs)
+        try:
+            if response.status_code == 304:
+                document = _NOT_MODIFIED
+            elif response.status_code == 404:
+                document = None
+            elif sections is None:
+                document = response.json()
+            else:
+                document = jsonstream.load_sections(
+                    response.iter_content(STREAM_CHUNK_SIZE),
+                    sections)
+        finally:
+            response.close()
+
+        return document, cache.validators(response)
 
     def shutdown_framework(self, framework_id):
-        """Shuts down a Mesos framework
+        """Shuts down a Mesos framework, and clears the state cache, whose
+        copies still list the framework as active
 
         :returns: None
         """
@@ -96,19 +472,34 @@ class MasterClient:
         data = 'frameworkId={}'.format(framework_id)
         http.post(self._create_url('master/shutdown'), data=data)
 
+        if self._state_cache is not None:
+            self._state_cache.clear()
+
 
 class Master(object):
     """Mesos Master Model
 
     :param state: Mesos master state json
     :type state: dict
+    :param compact: if True, the slaves, frameworks and tasks in `state`
+                    are replaced with compact records, which keep the
+                    fields the tables and filters read in slots and the
+                    rest of each record serialized. This takes much less
+                    memory for large states. `state` is converted in place.
+    :type compact: bool
     """
 
-    def __init__(self, state):
+    def __init__(self, state, compact=False):
+        if compact:
+            _compact_state(state)
         self._state = state
+        self._slave_index = None
+        self._framework_index = None
 
     def state(self):
-        """Returns master's master/state.json.
+        """Returns master's master/state.json.  With compact records, the
+        slaves, frameworks and tasks are :py:class:`CompactRecord`
+        instances rather than dicts.
 
         :returns: state.json
         :rtype: dict
@@ -133,7 +524,7 @@ class Master(object):
             raise DCOSException('Slave {} no longer exists'.format(fltr))
 
         elif len(slaves) > 1:
-            matches = ['\t{0}'.format(slave.id) for slave in slaves]
+            matches = ['\t{0}'.format(slave['id']) for slave in slaves]
             raise DCOSException(
                 "There are multiple slaves with that id. " +
                 "Please choose one: {}".format('\n'.join(matches)))
@@ -141,6 +532,25 @@ class Master(object):
         else:
             return slaves[0]
 
+    def slave_by_id(self, slave_id):
+        """Returns the slave with exactly the id `slave_id`.  Raises a
+        DCOSException if there is no such slave.
+
+        :param slave_id: the slave's id
+        :type slave_id: str
+        :returns: the slave
+        :rtype: Slave
+        """
+
+        if self._slave_index is None:
+            self._slave_index = dict((slave['id'], Slave(slave))
+                                     for slave in self.state()['slaves'])
+
+        try:
+            return self._slave_index[slave_id]
+        except KeyError:
+            raise DCOSException('Slave {} no longer exists'.format(slave_id))
+
     def slaves(self, fltr=""):
         """Returns those slaves that have `fltr` in their 'id'
 
@@ -178,13 +588,12 @@ class Master(object):
         else:
             return tasks[0]
 
-    # TODO (thomas): need to filter on task state as well as id
     def tasks(self, fltr="", completed=False):
         """Returns tasks running under the master
 
-        :param fltr: May be a substring or unix glob pattern.  Only
-                     return tasks whose 'id' matches `fltr`.
-        :type fltr: str
+        :param fltr: a task filter, or a list of filters that must all
+                     match. See :py:func:`compile_task_filter`.
+        :type fltr: str | [str]
         :param completed: also include completed tasks
         :type completed: bool
         :returns: a list of tasks
@@ -192,19 +601,31 @@ class Master(object):
 
         """
 
+        return list(self.iter_tasks(fltr, completed))
+
+    def iter_tasks(self, fltr="", completed=False):
+        """Like :py:meth:`tasks`, but yields the tasks one at a time in the
+        master's order, wrapping each one only when it is consumed.
+
+        :param fltr: a task filter, or a list of filters that must all
+                     match. See :py:func:`compile_task_filter`.
+        :type fltr: str | [str]
+        :param completed: also include completed tasks
+        :type completed: bool
+        :returns: the matching tasks
+        :rtype: iterator of Task
+        """
+
+        matches = compile_task_filter(fltr)
+
         keys = ['tasks']
         if completed:
             keys = ['completed_tasks']
 
-        tasks = []
         for framework in self._framework_dicts(completed, completed):
-            tasks += \
-                [Task(task, self)
-                 for task in _merge(framework, *keys)
-                 if fltr in task['id'] or
-                 fnmatch.fnmatchcase(task['id'], fltr)]
-
-        return tasks
+            for task in _merge(framework, *keys):
+                if matches(task, self):
+                    yield Task(task, self)
 
     def framework(self, framework_id):
         """Returns a framework by id
@@ -215,10 +636,16 @@ class Master(object):
         :rtype: Framework
         """
 
-        for f in self._framework_dicts(inactive=True):
-            if f['id'] == framework_id:
-                return Framework(f)
-        raise DCOSException('No Framework with id [{}]'.format(framework_id))
+        if self._framework_index is None:
+            self._framework_index = dict(
+                (f['id'], Framework(f))
+                for f in self._framework_dicts(inactive=True))
+
+        try:
+            return self._framework_index[framework_id]
+        except KeyError:
+            raise DCOSException(
+                'No Framework with id [{}]'.format(framework_id))
 
     def frameworks(self, inactive=False, completed=False):
         """Returns a list of all frameworks
@@ -279,7 +706,40 @@ class Framework(object):
         self._framework = framework
 
     def dict(self):
-        return self._framework
+        return _as_dict(self._framework)
+
+    def task_count(self):
+        """Returns the number of the framework's tasks that are not in a
+        terminal state. Works for framework records from state.json as well
+        as summaries from state-summary, which only have per-state counts.
+
+        :returns: number of active tasks
+        :rtype: int
+        """
+
+        if 'tasks' in self._framework:
+            return len(self._framework['tasks'])
+
+        return sum(self._framework.get(state, 0)
+                   for state in _ACTIVE_TASK_STATES)
+
+    def resources(self):
+        """Returns the resources the framework holds, whether they are
+        used by its tasks or offered to it. Summaries from state-summary
+        have no total, so it is added up from the used and offered
+        resources.
+
+        :returns: the framework's cpus, mem and disk
+        :rtype: dict
+        """
+
+        if 'resources' in self._framework:
+            return self._framework['resources']
+
+        used = self._framework.get('used_resources', {})
+        offered = self._framework.get('offered_resources', {})
+        return dict((name, used.get(name, 0) + offered.get(name, 0))
+                    for name in ('cpus', 'mem', 'disk'))
 
     def __getitem__(self, name):
         return self._framework[name]
@@ -306,7 +766,7 @@ class Task(object):
         :rtype: dict
         """
 
-        return self._task
+        return _as_dict(self._task)
 
     def framework(self):
         """Returns the task's framework
@@ -324,7 +784,7 @@ class Task(object):
         :rtype: Slave
         """
 
-        return self._master.slave(self["slave_id"])
+        return self._master.slave_by_id(self["slave_id"])
 
     def user(self):
         """Task owner
@@ -353,3 +813,156 @@ def _merge(d, *keys):
     """
 
     return itertools.chain(*[d[k] for k in keys])
+
+
+_MISSING = object()
+"""Marks a field that is not in a compact record"""
+
+
+class CompactRecord(object):
+    """A read-only record of a Mesos slave, framework or task that keeps
+    the fields in `FIELDS` in slots and the rest of the record marshalled
+    into a single string.  The values of the fields in `INTERNED` are
+    shared between records.  Supports the dict lookups that the models
+    use; :py:meth:`dict` rebuilds the full record.
+
+    :param record: the record
+    :type record: dict
+    :param strings: table of shared strings
+    :type strings: dict of str to str
+    """
+
+    __slots__ = ('_rest',)
+
+    FIELDS = ()
+    """Fields that are kept in slots"""
+
+    INTERNED = ()
+    """Fields whose values are shared between records"""
+
+    def __init__(self, record, strings):
+        rest = dict(record)
+        for field in self.FIELDS:
+            value = rest.pop(field, _MISSING)
+            if field in self.INTERNED and value is not _MISSING:
+                value = strings.setdefault(value, value)
+            setattr(self, field, value)
+
+        self._rest = marshal.dumps(rest) if rest else None
+
+    def _rest_dict(self):
+        """
+        :returns: the fields that are not in slots
+        :rtype: dict
+        """
+
+        if self._rest is None:
+            return {}
+        return marshal.loads(self._rest)
+
+    def __getitem__(self, name):
+        if name in self.FIELDS:
+            value = getattr(self, name)
+            if value is _MISSING:
+                raise KeyError(name)
+            return value
+
+        return self._rest_dict()[name]
+
+    def __contains__(self, name):
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def dict(self):
+        """
+        :returns: the full record
+        :rtype: dict
+        """
+
+        record = self._rest_dict()
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is _MISSING:
+                continue
+            if isinstance(value, list):
+                value = [_as_dict(element) for element in value]
+            record[field] = value
+
+        return record
+
+
+class CompactSlave(CompactRecord):
+    """Compact record of a Mesos slave"""
+
+    FIELDS = ('id', 'hostname')
+    __slots__ = FIELDS
+
+
+class CompactFramework(CompactRecord):
+    """Compact record of a Mesos framework.  Its tasks are compact
+    records."""
+
+    FIELDS = ('id', 'name', 'user', 'active', 'hostname', 'tasks',
+              'completed_tasks')
+    INTERNED = ('user',)
+    __slots__ = FIELDS
+
+
+class CompactTask(CompactRecord):
+    """Compact record of a Mesos task"""
+
+    FIELDS = ('id', 'name', 'state', 'framework_id', 'slave_id')
+    INTERNED = ('name', 'state', 'framework_id', 'slave_id')
+    __slots__ = FIELDS
+
+
+def _compact_state(state):
+    """Replaces the slaves, frameworks and tasks of a master's state with
+    compact records.  Each list is replaced as soon as it is converted, so
+    the dicts it held can be freed right away.
+
+    :param state: Mesos master state json
+    :type state: dict
+    :rtype: None
+    """
+
+    strings = {}
+
+    if 'slaves' in state:
+        state['slaves'] = [CompactSlave(slave, strings)
+                           for slave in state['slaves']]
+
+    for key in ('frameworks', 'completed_frameworks'):
+        if key not in state:
+            continue
+
+        frameworks = state[key]
+        for i, framework in enumerate(frameworks):
+            for tasks_key in ('tasks', 'completed_tasks'):
+                if tasks_key in framework:
+                    framework[tasks_key] = [
+                        CompactTask(task, strings)
+                        for task in framework[tasks_key]]
+            frameworks[i] = CompactFramework(framework, strings)
+
+
+def _as_dict(record):
+    """
+    :param record: a record from the master's state
+    :type record: dict | CompactRecord
+    :returns: the record as a dict
+    :rtype: dict
+    """
+
+    if isinstance(record, CompactRecord):
+        return record.dict()
+    return record
@@ -2,20 +2,27 @@ import abc
 import base64
 import collections
 import copy
+import functools
 import hashlib
 import json
+import marshal
 import os
+import re
 import shutil
 import stat
 import subprocess
+import tarfile
+import tempfile
 import zipfile
 from distutils.version import LooseVersion
 
 import git
 import portalocker
 import pystache
+import requests
 import six
-from dcos import constants, emitting, errors, marathon, mesos, subcommand, util
+from dcos import (cache, constants, emitting, errors, http, marathon, mesos,
+                  subcommand, util)
 from dcos.errors import DCOSException
 
 from six.moves import urllib
@@ -35,6 +42,33 @@ PACKAGE_COMMAND_KEY = 'DCOS_PACKAGE_COMMAND'
 PACKAGE_REGISTRY_VERSION_KEY = 'DCOS_PACKAGE_REGISTRY_VERSION'
 PACKAGE_FRAMEWORK_NAME_KEY = 'DCOS_PACKAGE_FRAMEWORK_NAME'
 
+SEARCH_INDEX_NAME = '.search-index'
+"""Name of the file with a registry's search index, in the registry's
+cache directory"""
+
+_SEARCH_INDEX_VERSION = 1
+
+_VALIDATORS_NAME = '.validators'
+"""Name of the file with the HTTP validators of a source's content, in
+the source's cache directory"""
+
+_MIRROR_SUFFIX = '.git'
+"""Suffix of the directory, next to a source's cache directory, where the
+source may keep a mirror of its upstream repository"""
+
+_NOT_MODIFIED = object()
+"""Marks source content that did not change since it was cached"""
+
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+_SPOOL_MAX_SIZE = 64 * 1024 * 1024
+"""Size up to which an exported git registry is kept in memory"""
+
+_SEARCH_THRESHOLD = 0.5
+"""Minimum rank required to appear in search results"""
+
+_SEARCH_TOKEN = re.compile(r'\w+', re.UNICODE)
+
 
 def install_app(pkg, version, init_client, options, app_id):
     """Installs a package's application
@@ -430,10 +464,12 @@ def installed_apps(init_client, endpoints=False):
         valid_apps.append(decoded)
 
     if endpoints:
-        for app in valid_apps:
-            tasks = init_client.get_tasks(app["appId"])
+        # Fetch the tasks of every app concurrently
+        pending = [init_client.asynchronous().get_tasks(app["appId"])
+                   for app in valid_apps]
+        for app, future in zip(valid_apps, pending):
             app['endpoints'] = [{"host": t["host"], "ports": t["ports"]}
-                                for t in tasks]
+                                for t in future.result()]
 
     return valid_apps
 
@@ -449,29 +485,24 @@ def search(query, cfg):
     :rtype: [IndexEntries]
     """
 
-    threshold = 0.5  # Minimum rank required to appear in results
-    results = []
-
-    def clean_package_entry(entry):
-        result = entry.copy()
-        result.update({
-            'versions': list(entry['versions'].keys())
-        })
-        return result
+    return [IndexEntries(registry.source, registry.search(query))
+            for registry in registries(cfg)]
 
-    for registry in registries(cfg):
-        source_results = []
-        index = registry.get_index()
 
-        for pkg in index['packages']:
-            rank = _search_rank(pkg, query)
-            if rank >= threshold:
-                source_results.append(clean_package_entry(pkg))
-
-        entries = IndexEntries(registry.source, source_results)
-        results.append(entries)
+def _clean_package_entry(entry):
+    """
+    :param entry: package index entry
+    :type entry: dict
+    :returns: the entry as search results show it, with a list of the
+              package's versions
+    :rtype: dict
+    """
 
-    return results
+    result = entry.copy()
+    result.update({
+        'versions': list(entry['versions'].keys())
+    })
+    return result
 
 
 def _search_rank(pkg, query):
@@ -499,6 +530,89 @@ def _search_rank(pkg, query):
     return result
 
 
+def _build_search_index(index):
+    """Builds an inverted index of the words in the names, tags and
+    descriptions of the packages in `index`.
+
+    Every word is mapped to the fields that contain it, as a flat list of
+    (package number, field) pairs.  The field is 0 for the name, -1 for
+    the description and n for the nth tag.  Each package is kept
+    serialized on its own, so that a search only decodes the packages it
+    finds.
+
+    :param index: the registry's package index
+    :type index: dict
+    :returns: the search index
+    :rtype: dict
+    """
+
+    postings = {}
+    for number, pkg in enumerate(index['packages']):
+        fields = [(0, pkg['name']), (-1, pkg['description'])]
+        fields += [(field, tag)
+                   for field, tag in enumerate(pkg['tags'], start=1)]
+
+        for field, text in fields:
+            for token in set(_SEARCH_TOKEN.findall(text.lower())):
+                postings.setdefault(token, []).extend((number, field))
+
+    return {'version': _SEARCH_INDEX_VERSION,
+            'packages': [marshal.dumps(_clean_package_entry(pkg))
+                         for pkg in index['packages']],
+            'postings': postings}
+
+
+def _search_index(search_index, query):
+    """Finds the packages that match `query` with the same ranks as
+    :py:func:`_search_rank`.
+
+    A field can only contain the query if, for each run of word characters
+    in the query, it has a word that contains that run, so the candidate
+    fields are found from the words of the index.  A query that is a
+    single run is ranked from its candidates alone; other queries are
+    checked against the candidate packages.
+
+    :param search_index: index built by :py:func:`_build_search_index`
+    :type search_index: dict
+    :param query: Search term
+    :type query: str
+    :returns: the matching packages, in index order
+    :rtype: [dict]
+    """
+
+    packages = search_index['packages']
+
+    q = query.lower()
+    words = _SEARCH_TOKEN.findall(q)
+    if not words:
+        return [pkg for pkg in (marshal.loads(data) for data in packages)
+                if _search_rank(pkg, query) >= _SEARCH_THRESHOLD]
+
+    matches = None
+    for word in set(words):
+        fields = set()
+        for token, posting in search_index['postings'].items():
+            if word in token:
+                fields.update(zip(posting[::2], posting[1::2]))
+        matches = fields if matches is None else matches & fields
+
+    if words != [q]:
+        candidates = sorted(set(number for number, _ in matches))
+        return [pkg
+                for pkg in (marshal.loads(packages[number])
+                            for number in candidates)
+                if _search_rank(pkg, query) >= _SEARCH_THRESHOLD]
+
+    ranks = {}
+    for number, field in matches:
+        weight = 2.0 if field == 0 else 0.5 if field < 0 else 1.0
+        ranks[number] = ranks.get(number, 0.0) + weight
+
+    return [marshal.loads(packages[number])
+            for number in sorted(ranks)
+            if ranks[number] >= _SEARCH_THRESHOLD]
+
+
 def _extract_default_values(config_schema):
     """
     :param config_schema: A json-schema describing configuration options.
@@ -649,6 +763,11 @@ def _acquire_file_lock(lock_file_path):
 def update_sources(config, validate=False):
     """Overwrites the local package cache with the latest source data.
 
+    The sources are fetched and staged concurrently, on at most
+    `core.http_pool_size` threads. Each staged source then replaces its
+    cache directory, in the order of the sources. A source that did not
+    change since it was cached keeps its cache directory.
+
     :param config: Configuration dictionary
     :type config: dcos.config.Toml
     :rtype: None
@@ -672,40 +791,51 @@ def update_sources(config, validate=False):
 
     with _acquire_file_lock(lock_path):
 
-        # list sources
-        sources = list_sources(config)
+        # list sources. A source that is configured more than once is
+        # only updated once, so that no two threads share its cache and
+        # mirror directories.
+        sources = []
+        for source in list_sources(config):
+            if all(source.hash() != other.hash() for other in sources):
+                sources.append(source)
 
         for source in sources:
-
             emitter.publish('Updating source [{}]'.format(source))
 
-            # create a temporary staging directory
-            with util.tempdir() as tmp_dir:
+        # create a temporary staging directory in the cache directory, so
+        # that moving a staged source into place does not copy it
+        with util.tempdir(cache_dir) as tmp_dir:
 
-                stage_dir = os.path.join(tmp_dir, source.hash())
+            stage_dirs = [os.path.join(tmp_dir, source.hash())
+                          for source in sources]
 
-                # copy to the staging directory
-                try:
-                    source.copy_to_cache(stage_dir)
-                except DCOSException as e:
-                    errors.append(e.message)
-                    continue
+            target_dirs = [os.path.join(cache_dir, source.hash())
+                           for source in sources]
 
-                # check the version
-                # TODO(jsancio): move this to the validation when it is forced
-                Registry(source, stage_dir).check_version(
-                    LooseVersion('1.0'),
-                    LooseVersion('2.0'))
+            # copy the sources to their staging directories
+            results = http.gather(
+                [functools.partial(_stage_source, source, stage_dir,
+                                   target_dir, validate)
+                 for source, stage_dir, target_dir in zip(
+                     sources, stage_dirs, target_dirs)],
+                return_exceptions=True)
 
-                # validate content
-                if validate:
-                    validation_errors = Registry(source, stage_dir).validate()
-                    if len(validation_errors) > 0:
-                        errors += validation_errors
-                        continue  # keep updating the other sources
+            for source, stage_dir, target_dir, result in zip(
+                    sources, stage_dirs, target_dirs, results):
+
+                # the version of the source is not supported
+                if isinstance(result, DCOSException):
+                    raise result
+
+                # the cached copy is up to date
+                if result is _NOT_MODIFIED:
+                    continue
+
+                if len(result) > 0:
+                    errors += result
+                    continue  # keep updating the other sources
 
                 # remove the $CACHE/source.hash() directory
-                target_dir = os.path.join(cache_dir, source.hash())
                 try:
                     if os.path.exists(target_dir):
                         shutil.rmtree(target_dir, ignore_errors=False)
@@ -722,6 +852,103 @@ def update_sources(config, validate=False):
         raise DCOSException(util.list_to_err(errors))
 
 
+def _stage_source(source, stage_dir, cache_path, validate):
+    """Copies a source to a staging directory, checks it and builds its
+    search index. Raises a DCOSException if the source's version is not
+    supported.
+
+    :param source: the source to stage
+    :type source: Source
+    :param stage_dir: Path to the staging directory
+    :type stage_dir: str
+    :param cache_path: Path to the source's current cache directory
+    :type cache_path: str
+    :param validate: whether to validate the source's content
+    :type validate: bool
+    :returns: the errors that keep the source from being updated, or
+              _NOT_MODIFIED if the cached copy is up to date
+    :rtype: [str | Error] | object
+    """
+
+    # copy to the staging directory
+    try:
+        validators = source.copy_to_cache(stage_dir,
+                                          _cached_validators(cache_path),
+                                          cache_path + _MIRROR_SUFFIX)
+    except DCOSException as e:
+        return [str(e)]
+
+    if validators is _NOT_MODIFIED:
+        return _NOT_MODIFIED
+
+    # check the version
+    # TODO(jsancio): move this to the validation when it is forced
+    Registry(source, stage_dir).check_version(
+        LooseVersion('1.0'),
+        LooseVersion('2.0'))
+
+    # validate content
+    if validate:
+        validation_errors = Registry(source, stage_dir).validate()
+        if len(validation_errors) > 0:
+            return validation_errors
+
+    # build the search index of the staged registry
+    try:
+        Registry(source, stage_dir).build_search_index()
+    except DCOSException as e:
+        logger.warning('Unable to index source [%s]: %s', source, e)
+    else:
+        # only a complete copy may be revalidated later
+        if validators:
+            try:
+                _write_validators(stage_dir, validators)
+            except DCOSException as e:
+                logger.warning(
+                    'Unable to store validators of source [%s]: %s',
+                    source, e)
+
+    return []
+
+
+def _cached_validators(cache_path):
+    """
+    :param cache_path: Path to a source's cache directory
+    :type cache_path: str
+    :returns: the HTTP validators of the cached content, if there is a
+              complete copy
+    :rtype: dict | None
+    """
+
+    validators_path = os.path.join(cache_path, _VALIDATORS_NAME)
+    if not (os.path.isfile(validators_path) and
+            os.path.isfile(os.path.join(cache_path, SEARCH_INDEX_NAME))):
+        return None
+
+    try:
+        with util.open_file(validators_path) as fd:
+            return json.load(fd)
+    except (DCOSException, ValueError) as e:
+        logger.info('Ignoring unreadable validators %r: %r',
+                    validators_path, e)
+        return None
+
+
+def _write_validators(cache_path, validators):
+    """Stores the HTTP validators of a source's content with the content.
+
+    :param cache_path: Path to the source's staged or cached content
+    :type cache_path: str
+    :param validators: validators returned by `Source.copy_to_cache`
+    :type validators: dict
+    :rtype: None
+    """
+
+    validators_path = os.path.join(cache_path, _VALIDATORS_NAME)
+    with util.open_file(validators_path, 'w') as fd:
+        json.dump(validators, fd)
+
+
 class Source:
     """A source of DCOS packages."""
 
@@ -756,12 +983,22 @@ class Source:
         cache_dir = util.get_config_vals(config, ['package.cache'])[0]
         return os.path.join(cache_dir, self.hash())
 
-    def copy_to_cache(self, target_dir):
+    def copy_to_cache(self, target_dir, validators=None, mirror_dir=None):
         """Copies the source content to the supplied local directory.
 
         :param target_dir: Path to the destination directory.
         :type target_dir: str
-        :rtype: None
+        :param validators: validators of the cached content, as returned by
+                           an earlier copy, if there is a cached copy
+        :type validators: dict
+        :param mirror_dir: Path to a directory that is kept between
+                           updates, where the source may keep a copy of its
+                           upstream data to make later copies cheaper
+        :type mirror_dir: str
+        :returns: the validators of the copied content, if any, or
+                  _NOT_MODIFIED if it did not change since `validators`
+                  and nothing was copied
+        :rtype: dict | object | None
         """
 
         raise NotImplementedError
@@ -790,11 +1027,15 @@ class FileSource(Source):
 
         return self._url
 
-    def copy_to_cache(self, target_dir):
+    def copy_to_cache(self, target_dir, validators=None, mirror_dir=None):
         """Copies the source content to the supplied local directory.
 
         :param target_dir: Path to the destination directory.
         :type target_dir: str
+        :param validators: ignored; the content is always copied
+        :type validators: dict
+        :param mirror_dir: ignored; the source is local
+        :type mirror_dir: str
         :rtype: None
         """
 
@@ -828,57 +1069,120 @@ class HttpSource(Source):
 
         return self._url
 
-    def copy_to_cache(self, target_dir):
-        """Copies the source content to the supplied local directory.
+    def copy_to_cache(self, target_dir, validators=None, mirror_dir=None):
+        """Copies the source content to the supplied local directory. With
+        `validators`, the zip file is only downloaded if it changed.
 
         :param target_dir: Path to the destination directory.
         :type target_dir: str
-        :returns: The error, if one occurred
-        :rtype: None
+        :param validators: validators of the cached zip file
+        :type validators: dict
+        :param mirror_dir: ignored; the zip file is not kept
+        :type mirror_dir: str
+        :returns: the ETag and Last-Modified headers of the zip file, or
+                  _NOT_MODIFIED if it did not change
+        :rtype: dict | object
         """
 
+        def is_success(status):
+            return 200 <= status < 300 or status == 304
+
         try:
-            with util.tempdir() as tmp_dir:
+            # Download the zip file, unless it did not change.
+            response = http.get(
+                self.url,
+                is_success=is_success,
+                stream=True,
+                headers=cache.conditional_headers(validators or {}))
+            try:
+                if response.status_code == 304:
+                    return _NOT_MODIFIED
+
+                # Reading a zip file needs its central directory at the
+                # end, so the download is buffered.  zipfile needs a
+                # seekable() file, which SpooledTemporaryFile lacks before
+                # Python 3.11.
+                with tempfile.TemporaryFile() as packages_file:
+                    for chunk in response.iter_content(_DOWNLOAD_CHUNK_SIZE):
+                        packages_file.write(chunk)
+
+                    packages_file.seek(0)
+                    with zipfile.ZipFile(packages_file, 'r') as packages_zip:
+                        _extract_registry(packages_zip, target_dir)
+            finally:
+                response.close()
+
+            return cache.validators(response)
+
+        except (DCOSException, requests.exceptions.RequestException,
+                zipfile.BadZipfile, IOError, OSError) as e:
+            raise DCOSException(
+                'Unable to fetch packages from [{}]: {}'.format(self.url, e))
+        except Exception as e:
+            logger.exception(e)
+            raise DCOSException(
+                'Unable to fetch packages from [{}]: {!r}'.format(
+                    self.url, e))
+
 
-                tmp_file = os.path.join(tmp_dir, 'packages.zip')
+def _extract_registry(packages_zip, target_dir):
+    """Extracts the single top-level directory of a registry zip file into
+    `target_dir`, and makes the registry's scripts executable.
 
-                # Download the zip file.
-                urllib.request.urlretrieve(self.url, tmp_file)
+    :param packages_zip: the registry zip file
+    :type packages_zip: zipfile.ZipFile
+    :param target_dir: Path to the destination directory.
+    :type target_dir: str
+    :rtype: None
+    """
 
-                # Unzip the downloaded file.
-                packages_zip = zipfile.ZipFile(tmp_file, 'r')
-                packages_zip.extractall(tmp_dir)
+    # Set appropriate file permissions on the scripts.
+    x_mode = (stat.S_IRUSR | stat.S_IWUSR | stat.S_IXUSR |
+              stat.S_IRGRP | stat.S_IWGRP | stat.S_IXGRP)
 
-                # Move the enclosing directory to the target directory
-                enclosing_dirs = [item
-                                  for item in os.listdir(tmp_dir)
-                                  if os.path.isdir(
-                                      os.path.join(tmp_dir, item))]
+    enclosing_dirs = set()
+    os.makedirs(target_dir)
 
-                # There should only be one directory present after extracting.
-                assert(len(enclosing_dirs) is 1)
+    for info in packages_zip.infolist():
+        parts = [part for part in info.filename.split('/') if part]
+        if not parts:
+            continue
 
-                enclosing_dir = os.path.join(tmp_dir, enclosing_dirs[0])
+        # Files next to the enclosing directory, e.g. a README, are not
+        # part of the registry
+        if len(parts) == 1 and not info.filename.endswith('/'):
+            continue
 
-                shutil.copytree(enclosing_dir, target_dir)
+        # There should only be one directory at the top of the zip file.
+        enclosing_dirs.add(parts[0])
+        if len(enclosing_dirs) > 1:
+            raise DCOSException('More than one top-level directory')
 
-                # Set appropriate file permissions on the scripts.
-                x_mode = (stat.S_IRUSR | stat.S_IWUSR | stat.S_IXUSR |
-                          stat.S_IRGRP | stat.S_IWGRP | stat.S_IXGRP)
+        parts = parts[1:]
+        if not parts:
+            continue
+        if any(part in ('.', '..') or '\\' in part for part in parts):
+            raise DCOSException(
+                'Invalid path in zip file [{}]'.format(info.filename))
 
-                scripts_dir = os.path.join(target_dir, 'scripts')
-                scripts = os.listdir(scripts_dir)
+        path = os.path.join(target_dir, *parts)
+        if info.filename.endswith('/'):
+            if not os.path.isdir(path):
+                os.makedirs(path)
+            continue
 
-                for script in scripts:
-                    script_path = os.path.join(scripts_dir, script)
-                    if os.path.isfile(script_path):
-                        os.chmod(script_path, x_mode)
+        parent = os.path.dirname(path)
+        if not os.path.isdir(parent):
+            os.makedirs(parent)
 
-                return None
+        with packages_zip.open(info) as member, open(path, 'wb') as fd:
+            shutil.copyfileobj(member, fd, _DOWNLOAD_CHUNK_SIZE)
 
-        except Exception:
-            raise DCOSException(
-                'Unable to fetch packages from [{}]'.format(self.url))
+        if len(parts) == 2 and parts[0] == 'scripts':
+            os.chmod(path, x_mode)
+
+    if not enclosing_dirs:
+        raise DCOSException('No top-level directory')
 
 
 class GitSource(Source):
@@ -900,11 +1204,21 @@ class GitSource(Source):
 
         return self._url
 
-    def copy_to_cache(self, target_dir):
+    def copy_to_cache(self, target_dir, validators=None, mirror_dir=None):
         """Copies the source content to the supplied local directory.
 
+        With `mirror_dir`, a bare mirror of the master branch is kept there
+        and updated with shallow fetches, which only transfer the objects
+        of the latest commit that the mirror does not have yet.  The files
+        of that commit are then exported from the mirror.  Otherwise the
+        repository is cloned.
+
         :param target_dir: Path to the destination directory.
         :type target_dir: str
+        :param validators: ignored; the content is always copied
+        :type validators: dict
+        :param mirror_dir: Path to the mirror of the repository
+        :type mirror_dir: str
         :returns: The error, if one occurred
         :rtype: None
         """
@@ -919,6 +1233,10 @@ class GitSource(Source):
 it is installed and on the system search path.
 PATH = {}""".format(os.environ[constants.PATH_ENV]))
 
+            if mirror_dir is not None:
+                self._export(self._fetch(mirror_dir), target_dir)
+                return None
+
             # Clone git repo into the supplied target directory.
             git.Repo.clone_from(self._url,
                                 to_path=target_dir,
@@ -929,9 +1247,60 @@ PATH = {}""".format(os.environ[constants.PATH_ENV]))
             shutil.rmtree(os.path.join(target_dir, ".git"))
             return None
 
-        except git.exc.GitCommandError:
+        except (git.exc.GitCommandError, tarfile.TarError, OSError) as e:
             raise DCOSException(
-                'Unable to fetch packages from [{}]'.format(self.url))
+                'Unable to fetch packages from [{}]: {}'.format(self.url, e))
+
+    def _fetch(self, mirror_dir):
+        """Updates the master branch of the mirror in `mirror_dir` with a
+        shallow fetch, creating the mirror first if it is missing or
+        corrupt.  A mirror that fails to fetch is left in place.
+
+        :param mirror_dir: Path to the mirror of the repository
+        :type mirror_dir: str
+        :returns: the mirror
+        :rtype: git.Repo
+        """
+
+        mirror = None
+        if os.path.isdir(mirror_dir):
+            try:
+                mirror = git.Repo(mirror_dir)
+                mirror.git.rev_parse('--verify', 'refs/heads/master')
+            except (git.exc.GitCommandError,
+                    git.exc.InvalidGitRepositoryError):
+                logger.info('Recreating mirror [%s] of [%s]',
+                            mirror_dir, self)
+                shutil.rmtree(mirror_dir)
+                mirror = None
+
+        if mirror is None:
+            mirror = git.Repo.init(mirror_dir, bare=True)
+
+        mirror.git.fetch(self._url,
+                         '+refs/heads/master:refs/heads/master',
+                         depth=1)
+        return mirror
+
+    def _export(self, mirror, target_dir):
+        """Writes the files of the mirror's master branch to `target_dir`.
+
+        :param mirror: the mirror of the repository
+        :type mirror: git.Repo
+        :param target_dir: Path to the destination directory.
+        :type target_dir: str
+        :rtype: None
+        """
+
+        with tempfile.SpooledTemporaryFile(
+                max_size=_SPOOL_MAX_SIZE) as archive:
+            mirror.archive(archive, treeish='refs/heads/master',
+                           format='tar')
+            archive.seek(0)
+
+            os.makedirs(target_dir)
+            with tarfile.open(fileobj=archive, mode='r') as tar:
+                tar.extractall(target_dir)
 
 
 class Error(errors.Error):
@@ -1059,6 +1428,67 @@ class Registry():
         except ValueError:
             raise DCOSException('Unable to parse [{}]'.format(index_path))
 
+    def build_search_index(self):
+        """Builds the search index of this registry's packages and stores it
+        in $BASE/.search-index.
+
+        :rtype: None
+        """
+
+        search_index = _build_search_index(self.get_index())
+
+        index_path = os.path.join(self._base_path, SEARCH_INDEX_NAME)
+        try:
+            with open(index_path, 'wb') as fd:
+                marshal.dump(search_index, fd)
+        except (IOError, OSError) as e:
+            raise util.io_exception(index_path, e.errno)
+
+    def get_search_index(self):
+        """Returns the search index stored by :py:meth:`build_search_index`.
+
+        :returns: the search index, or None if there is no readable one
+        :rtype: dict | None
+        """
+
+        index_path = os.path.join(self._base_path, SEARCH_INDEX_NAME)
+        try:
+            # marshal.load reads a file in small pieces; reading it whole
+            # first is much faster.
+            with open(index_path, 'rb') as fd:
+                search_index = marshal.loads(fd.read())
+        except (IOError, OSError):
+            return None
+        except (EOFError, ValueError, TypeError) as e:
+            logger.info('Ignoring unreadable search index %r: %r',
+                        index_path, e)
+            return None
+
+        if (not isinstance(search_index, dict) or
+                search_index.get('version') != _SEARCH_INDEX_VERSION):
+            return None
+
+        return search_index
+
+    def search(self, query):
+        """Returns the packages in this registry that match `query`. Uses
+        the search index if there is one, and scans the package index
+        otherwise.
+
+        :param query: The search term
+        :type query: str
+        :returns: the matching index entries, with lists of versions
+        :rtype: [dict]
+        """
+
+        search_index = self.get_search_index()
+        if search_index is not None:
+            return _search_index(search_index, query)
+
+        return [_clean_package_entry(pkg)
+                for pkg in self.get_index()['packages']
+                if _search_rank(pkg, query) >= _SEARCH_THRESHOLD]
+
     def get_package(self, package_name):
         """Returns the named package, if it exists.
 
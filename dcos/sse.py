@@ -0,0 +1,67 @@
+import codecs
+import collections
+
+Event = collections.namedtuple('Event', ['event', 'data', 'id'])
+"""A server-sent event.
+
+:param event: the event's type; 'message' if the server did not set one
+:type event: str
+:param data: the event's data
+:type data: str
+:param id: the last event id the server set, if any
+:type id: str
+"""
+
+
+def iter_events(chunks):
+    """Parses a text/event-stream as it arrives, yielding each event as
+    soon as its terminating blank line is read.  Comments, which servers
+    send to keep the connection alive, are skipped.
+
+    :param chunks: the stream in pieces, e.g. from
+                   requests.Response.iter_content
+    :type chunks: iterable of bytes | str
+    :returns: the events
+    :rtype: iterator of Event
+    """
+
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    event_type = None
+    data = []
+    last_id = None
+
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        buffer += chunk
+
+        # A trailing CR may be the first half of a CRLF
+        end = len(buffer) - 1 if buffer.endswith('\r') else len(buffer)
+        lines = buffer[:end].replace('\r\n', '\n').replace('\r', '\n')
+        lines = lines.split('\n')
+        buffer = lines.pop() + buffer[end:]
+
+        for line in lines:
+            if not line:
+                if data:
+                    yield Event(event_type or 'message',
+                                '\n'.join(data),
+                                last_id)
+                event_type = None
+                data = []
+                continue
+
+            if line.startswith(':'):
+                continue
+
+            field, _, value = line.partition(':')
+            if value.startswith(' '):
+                value = value[1:]
+
+            if field == 'event':
+                event_type = value
+            elif field == 'data':
+                data.append(value)
+            elif field == 'id':
+                last_id = value
@@ -1,6 +1,7 @@
 import collections
 import contextlib
 import functools
+import itertools
 import json
 import logging
 import os
@@ -32,17 +33,20 @@ def get_logger(name):
 
 
 @contextlib.contextmanager
-def tempdir():
+def tempdir(dir=None):
     """A context manager for temporary directories.
 
     The lifetime of the returned temporary directory corresponds to the
     lexical scope of the returned file descriptor.
 
+    :param dir: directory in which to create the temporary directory;
+                the system's default if None
+    :type dir: str
     :return: Reference to a temporary directory
     :rtype: str
     """
 
-    tmpdir = tempfile.mkdtemp()
+    tmpdir = tempfile.mkdtemp(dir=dir)
     try:
         yield tmpdir
     finally:
@@ -509,6 +513,58 @@ def table(fields, objs, sortby=None):
     return tb
 
 
+def stream_table(fields, objs, sample_size=100):
+    """Renders a table like :py:func:`table`, one line at a time, while
+    `objs` is consumed. Nothing is sorted or buffered beyond the first
+    `sample_size` rows, which set the column widths. A later value that
+    does not fit is not truncated: it pushes the rest of its row to the
+    right, up to the first column with room to spare, where the row falls
+    back in line with the others.
+
+    :param fields: An OrderedDict, where each element represents a
+                   column.  The key is the column header, and the
+                   value is the function that transforms an element of
+                   `objs` into a value for that column.
+    :type fields: OrderdDict(str, function)
+    :param objs: objects to render into rows
+    :type objs: iterable of object
+    :param sample_size: number of rows that set the column widths
+    :type sample_size: int
+    :returns: the header line and then one line per object; nothing if
+              there are no objects
+    :rtype: iterator of str
+    """
+
+    rows = ([six.text_type(fn(obj)) for fn in fields.values()]
+            for obj in objs)
+
+    sample = list(itertools.islice(rows, sample_size))
+    if not sample:
+        return
+
+    header = [k.upper() for k in fields.keys()]
+    widths = [max(len(value) for value in column)
+              for column in zip(header, *sample)]
+
+    # Each column after the first starts at a fixed offset, unless the
+    # values before it ran past that offset
+    offsets = []
+    offset = 1
+    for width in widths[:-1]:
+        offset += width + 2
+        offsets.append(offset)
+
+    def render(row):
+        line = ' ' + row[0]
+        for offset, value in zip(offsets, row[1:]):
+            line += ' ' * max(offset - len(line), 2) + value
+        return line.rstrip()
+
+    yield render(header)
+    for row in itertools.chain(sample, rows):
+        yield render(row)
+
+
 @contextlib.contextmanager
 def open_file(path,  *args):
     """Context manager that opens a file, and raises a DCOSException if
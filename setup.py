@@ -58,7 +58,8 @@ setup(
 
     # You can just specify the packages manually here if your project is
     # simple. Or you can use find_packages().
-    packages=find_packages(exclude=['pydoc', 'tests', 'cli', 'bin']),
+    packages=find_packages(exclude=['pydoc', 'tests', 'cli', 'bin',
+                                    'benchmarks', 'benchmarks.*']),
 
     # List run-time dependencies here.  These will be installed by pip when
     # your project is installed. For an analysis of "install_requires" vs pip's
@@ -0,0 +1,80 @@
+import os
+
+from dcos import cache, util
+
+
+def test_put_and_get():
+    with util.tempdir() as tmp_dir:
+        file_cache = cache.FileCache(os.path.join(tmp_dir, 'cache'), 60)
+        value = {'slaves': [{'id': 'S0', 'used': 0.5, 'active': True}],
+                 'leader': None}
+
+        assert file_cache.get('key') is None
+
+        file_cache.put('key', value, {'ETag': '"1"'})
+        entry = file_cache.get('key')
+
+        assert entry.value == value
+        assert entry.validators == {'ETag': '"1"'}
+        assert file_cache.is_fresh(entry)
+        assert file_cache.get_fresh('key') == value
+        assert file_cache.get('other') is None
+
+
+def test_stale_entries():
+    with util.tempdir() as tmp_dir:
+        file_cache = cache.FileCache(tmp_dir, 0)
+        file_cache.put('key', [1, 2])
+
+        assert file_cache.get_fresh('key') is None
+        assert file_cache.get('key').value == [1, 2]
+
+
+def test_unreadable_entries():
+    with util.tempdir() as tmp_dir:
+        file_cache = cache.FileCache(tmp_dir, 60)
+        file_cache.put('key', 'value')
+
+        for name in os.listdir(tmp_dir):
+            with open(os.path.join(tmp_dir, name), 'wb') as cache_file:
+                cache_file.write(b'\x00garbage')
+
+        assert file_cache.get('key') is None
+
+
+def test_conditional_headers():
+    assert cache.conditional_headers({}) == {}
+    assert cache.conditional_headers(
+        {'ETag': '"1"', 'Last-Modified': 'Mon, 01 Jun 2015 00:00:00 GMT'}
+    ) == {'If-None-Match': '"1"',
+          'If-Modified-Since': 'Mon, 01 Jun 2015 00:00:00 GMT'}
+
+
+def test_clear():
+    with util.tempdir() as tmp_dir:
+        file_cache = cache.FileCache(os.path.join(tmp_dir, 'cache'), 60)
+        file_cache.clear()
+
+        file_cache.put('a', 1)
+        file_cache.put('b', 2)
+        file_cache.clear()
+
+        assert file_cache.get('a') is None
+        assert file_cache.get('b') is None
+
+
+def test_max_entries():
+    with util.tempdir() as tmp_dir:
+        file_cache = cache.FileCache(tmp_dir, 60, max_entries=2)
+        for i, key in enumerate(['a', 'b', 'c']):
+            file_cache.put(key, i)
+            # Entries are evicted in the order of their files' mtimes
+            os.utime(file_cache._path(key), (i, i))
+
+        file_cache.put('d', 3)
+
+        assert len(os.listdir(tmp_dir)) == 2
+        assert file_cache.get('a') is None
+        assert file_cache.get('b') is None
+        assert file_cache.get_fresh('c') == 2
+        assert file_cache.get_fresh('d') == 3
@@ -0,0 +1,33 @@
+import json
+
+from dcos import emitting
+
+
+def test_publish_stream_json():
+    objs = [{'id': 'a', 'ports': [1, 2]}, {'id': 'b'}]
+    lines = []
+    emitter = emitting.FlatEmitter(lines.append)
+
+    emitting.publish_stream(emitter, iter(objs), None, True)
+
+    assert lines == \
+        json.dumps(objs, sort_keys=True, indent=2,
+                   separators=(',', ': ')).split('\n')
+
+
+def test_publish_stream_json_empty():
+    lines = []
+    emitting.publish_stream(emitting.FlatEmitter(lines.append), [], None,
+                            True)
+
+    assert lines == ['[]']
+
+
+def test_publish_stream_table():
+    lines = []
+    emitting.publish_stream(emitting.FlatEmitter(lines.append),
+                            ['a', 'b'],
+                            lambda objs: (obj.upper() for obj in objs),
+                            False)
+
+    assert lines == ['A', 'B']
@@ -0,0 +1,263 @@
+import threading
+import time
+
+import requests
+from benchmarks.servers import StandInHandler, StandInServer
+from dcos import http
+from dcos.errors import DCOSException
+
+import pytest
+
+
+def test_session_is_shared_per_host():
+    try:
+        session = http.get_session('http://example.com:8080/v2/apps')
+
+        assert http.get_session('http://EXAMPLE.com:8080/v2/info') is session
+        assert http.get_session('http://example.com/v2/info') is not session
+        assert http.get_session('https://example.com:8080/') is not session
+    finally:
+        http.close_sessions()
+
+
+def test_close_sessions():
+    session = http.get_session('http://example.com/')
+    http.close_sessions()
+
+    assert http.get_session('http://example.com/') is not session
+    http.close_sessions()
+
+
+def test_requests_reuse_connections():
+    with StandInServer() as server:
+        for _ in range(5):
+            http.get(server.url + 'v2/info')
+
+        assert server.requests == 5
+        assert server.connections == 1
+
+
+class _PathHandler(StandInHandler):
+    """Echoes the path back, failing for paths under /fail."""
+
+    def do_GET(self):
+        if self.path.startswith('/fail'):
+            self.send_json(503, {'message': 'unavailable'})
+        else:
+            self.send_json(200, {'path': self.path})
+
+
+def test_gather_requests():
+    with StandInServer(_PathHandler) as server:
+        responses = http.gather_requests(
+            [{'method': 'get', 'url': server.url + str(i)}
+             for i in range(20)],
+            max_concurrency=4)
+
+    assert [r.json()['path'] for r in responses] == \
+        ['/{}'.format(i) for i in range(20)]
+
+
+def test_gather_requests_errors():
+    with StandInServer(_PathHandler) as server:
+        request_args = [{'method': 'get', 'url': server.url + 'ok'},
+                        {'method': 'get', 'url': server.url + 'fail',
+                         'retry': http.NO_RETRY}]
+        with pytest.raises(DCOSException) as excinfo:
+            http.gather_requests(request_args)
+
+        results = http.gather_requests(request_args,
+                                       return_exceptions=True)
+
+    assert '503' in str(excinfo.value)
+    assert results[0].json() == {'path': '/ok'}
+    assert isinstance(results[1], DCOSException)
+
+
+def test_gather_bounds_concurrency():
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+    barrier = threading.Event()
+
+    def call():
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        barrier.wait(0.01)
+        with lock:
+            state['running'] -= 1
+        return True
+
+    assert http.gather([call] * 10, max_concurrency=3) == [True] * 10
+    assert state['peak'] <= 3
+
+
+def test_async_proxy():
+    class Client(object):
+        name = 'client'
+
+        def echo(self, value):
+            return value
+
+    proxy = http.AsyncProxy(Client())
+
+    assert proxy.name == 'client'
+    assert proxy.echo(42).result() == 42
+
+
+class _FlakyHandler(StandInHandler):
+    """Fails the first `failures` requests with 503."""
+
+    failures = 2
+
+    def do_GET(self):
+        if self.server.requests < self.failures:
+            self.send_json(503, {'message': 'leader election'})
+        else:
+            self.send_json(200, {})
+
+    do_POST = do_GET
+
+
+_FAST_RETRY = http.RetryPolicy(retries=3, backoff=0.01)
+
+
+def test_retry_transient_status():
+    with StandInServer(_FlakyHandler) as server:
+        response = http.get(server.url, retry=_FAST_RETRY)
+
+        assert response.status_code == 200
+        assert server.requests == 3
+
+
+def test_retry_gives_up():
+    with StandInServer(_FlakyHandler) as server:
+        with pytest.raises(DCOSException) as excinfo:
+            http.get(server.url,
+                     retry=http.RetryPolicy(retries=1, backoff=0.01))
+
+        assert '503' in str(excinfo.value)
+        assert server.requests == 2
+
+
+def test_no_retry_for_post():
+    with StandInServer(_FlakyHandler) as server:
+        with pytest.raises(DCOSException):
+            http.post(server.url, json={}, retry=_FAST_RETRY)
+
+        assert server.requests == 1
+
+
+def test_retry_deadline():
+    policy = http.RetryPolicy(retries=10, backoff=10, deadline=0.5)
+    with StandInServer(_FlakyHandler) as server:
+        start = time.time()
+        with pytest.raises(DCOSException):
+            http.get(server.url, retry=policy)
+
+        assert time.time() - start < 0.5
+
+
+def test_timeout_without_deadline(monkeypatch):
+    timeouts = []
+
+    def send(session, prepared, timeout=None, stream=False):
+        timeouts.append(timeout)
+        raise requests.exceptions.ConnectionError('refused')
+
+    monkeypatch.setattr(requests.Session, 'send', send)
+    monkeypatch.setattr(http, 'default_timeout', lambda: 45.0)
+    try:
+        with pytest.raises(DCOSException):
+            http.get('http://example.com/',
+                     retry=http.RetryPolicy(retries=1, backoff=0.01))
+    finally:
+        http.close_sessions()
+
+    assert timeouts == [45.0, 45.0]
+
+
+def test_no_retry_for_put_after_read_timeout(monkeypatch):
+    methods = []
+
+    def send(session, prepared, timeout=None, stream=False):
+        methods.append(prepared.method)
+        raise requests.exceptions.ReadTimeout('timed out')
+
+    monkeypatch.setattr(requests.Session, 'send', send)
+    try:
+        for method in ('PUT', 'GET'):
+            with pytest.raises(DCOSException):
+                http.request(method, 'http://example.com/', retry=_FAST_RETRY)
+    finally:
+        http.close_sessions()
+
+    assert methods == ['PUT'] + ['GET'] * (_FAST_RETRY.retries + 1)
+
+
+def test_configured_deadline(monkeypatch):
+    config = {'core.http_retries': 5, 'core.http_deadline': 20}
+    monkeypatch.setattr(http, '_get_config_value',
+                        lambda key, default: config.get(key, default))
+    http._clear_settings()
+    try:
+        policy = http._default_retry_policy()
+        assert (policy.retries, policy.deadline) == (5, 20.0)
+
+        del config['core.http_deadline']
+        http._clear_settings()
+        assert http._default_retry_policy().deadline is None
+    finally:
+        http._clear_settings()
+
+
+def test_settings_are_read_once(monkeypatch):
+    keys = []
+
+    def get_config_value(key, default):
+        keys.append(key)
+        return {'core.http_timeout': 45}.get(key, default)
+
+    monkeypatch.setattr(http, '_get_config_value', get_config_value)
+    http._clear_settings()
+    try:
+        with StandInServer(_PathHandler) as server:
+            for i in range(3):
+                http.get(server.url + str(i))
+            http.gather_requests([{'method': 'get', 'url': server.url}])
+            assert http.default_timeout() == 45.0
+            assert http._default_retry_policy().retries == \
+                http.DEFAULT_RETRIES
+    finally:
+        http._clear_settings()
+
+    assert sorted(keys) == ['core.http_deadline', 'core.http_pool_size',
+                            'core.http_retries', 'core.http_timeout']
+
+
+def test_retry_rules():
+    policy = http.RetryPolicy(
+        statuses={500: frozenset(['POST'])},
+        exceptions=[(ValueError, http.ALL_METHODS)])
+
+    assert policy.retries_status('post', 500)
+    assert not policy.retries_status('get', 500)
+    assert not policy.retries_status('post', 503)
+    assert policy.retries_exception('patch', ValueError())
+    assert not policy.retries_exception('get', KeyError())
+
+    default = http.RetryPolicy()
+    connect_timeout = requests.exceptions.ConnectTimeout()
+    assert default.retries_exception('post', connect_timeout)
+    assert not default.retries_exception(
+        'post', requests.exceptions.ReadTimeout())
+    assert default.retries_exception(
+        'get', requests.exceptions.ReadTimeout())
+    assert not default.retries_exception(
+        'put', requests.exceptions.ReadTimeout())
+    assert not default.retries_exception(
+        'delete', requests.exceptions.ConnectionError())
+    assert default.retries_exception('put', connect_timeout)
+
+    for retry in range(1, 10):
+        assert 0 <= default.wait(retry) <= default.max_backoff
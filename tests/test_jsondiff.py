@@ -0,0 +1,113 @@
+import copy
+import random
+
+from dcos import jsondiff
+
+import pytest
+
+
+def _apply(document, patch):
+    """Applies a JSON patch that only adds, removes and replaces."""
+
+    root = [copy.deepcopy(document)]
+    for operation in patch:
+        tokens = [token.replace('~1', '/').replace('~0', '~')
+                  for token in operation['path'].split('/')[1:]]
+
+        parent, key = root, 0
+        for token in tokens:
+            parent = parent[key]
+            key = int(token) if isinstance(parent, list) else token
+
+        if operation['op'] == 'remove':
+            del parent[key]
+        elif operation['op'] == 'add' and isinstance(parent, list):
+            parent.insert(key, operation['value'])
+        else:
+            parent[key] = operation['value']
+
+    return root[0]
+
+
+def _patch(old, new):
+    return jsondiff.to_patch(jsondiff.diff(old, new))
+
+
+def test_identical():
+    app = {'id': '/web', 'env': {'A': '1'}, 'ports': [0, 0]}
+
+    assert jsondiff.diff(app, copy.deepcopy(app)) == []
+
+
+def test_changes():
+    old = {'id': '/web', 'cpus': 1, 'env': {'A': '1', 'a/b': 'x'}}
+    new = {'id': '/web', 'cpus': 2, 'env': {'A': '1'}, 'mem': 64}
+
+    assert jsondiff.diff(old, new) == [
+        jsondiff.Change('replace', ('cpus',), 1, 2),
+        jsondiff.Change('remove', ('env', 'a/b'), 'x', None),
+        jsondiff.Change('add', ('mem',), None, 64),
+    ]
+    assert _patch(old, new) == [
+        {'op': 'replace', 'path': '/cpus', 'value': 2},
+        {'op': 'remove', 'path': '/env/a~1b'},
+        {'op': 'add', 'path': '/mem', 'value': 64},
+    ]
+
+
+def test_lists_aligned_by_id():
+    old = {'apps': [{'id': '/a', 'cpus': 1},
+                    {'id': '/b', 'cpus': 1},
+                    {'id': '/c', 'cpus': 1}]}
+    new = {'apps': [{'id': '/b', 'cpus': 2},
+                    {'id': '/c', 'cpus': 1},
+                    {'id': '/d', 'cpus': 1}]}
+
+    assert _patch(old, new) == [
+        {'op': 'add', 'path': '/apps/3', 'value': {'id': '/d', 'cpus': 1}},
+        {'op': 'replace', 'path': '/apps/1/cpus', 'value': 2},
+        {'op': 'remove', 'path': '/apps/0'},
+    ]
+    assert _apply(old, _patch(old, new)) == new
+
+
+def test_equal_numbers():
+    old = {'cpus': 1, 'mem': 128, 'ports': [0, 2]}
+    new = {'cpus': 1.0, 'mem': 128.0, 'ports': [0.0, 2.0]}
+
+    assert jsondiff.diff(old, new) == []
+    assert _patch({'cpus': 1}, {'cpus': 1.5}) == \
+        [{'op': 'replace', 'path': '/cpus', 'value': 1.5}]
+
+
+def test_root_replaced():
+    assert _patch([1], {'a': 1}) == \
+        [{'op': 'replace', 'path': '', 'value': {'a': 1}}]
+
+
+def _random_value(rng, depth):
+    kind = rng.randint(0, 5 if depth < 4 else 2)
+    if kind == 0:
+        return rng.randint(0, 3)
+    elif kind == 1:
+        return rng.choice(['a', 'b', None, True])
+    elif kind == 2:
+        return rng.choice(['x', 'y', 'z'])
+    elif kind == 3:
+        return [_random_value(rng, depth + 1)
+                for _ in range(rng.randint(0, 4))]
+    elif kind == 4:
+        return [{'id': str(i), 'v': _random_value(rng, depth + 1)}
+                for i in rng.sample(range(6), rng.randint(0, 4))]
+    else:
+        return dict((rng.choice('abcd'), _random_value(rng, depth + 1))
+                    for _ in range(rng.randint(0, 4)))
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_patch_round_trip(seed):
+    rng = random.Random(seed)
+    old = _random_value(rng, 0)
+    new = _random_value(rng, 0)
+
+    assert _apply(old, _patch(old, new)) == new
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import json
+
+from benchmarks.mesos_state import generate_state
+from dcos import jsonstream, mesos
+from dcos.errors import DCOSException
+
+import pytest
+
+STATE = {
+    'flags': {'quorum': '1', 'nested': [{'a': '}]["'}, [1, 2.5e3, None]]},
+    'slaves': [{'id': 'S0', 'hostname': 'agent-0'}],
+    'frameworks': [
+        {'id': 'F0',
+         'name': u'marathön',
+         'user': 'root',
+         'offers': [{'id': 'O0'}],
+         'tasks': [{'id': 'a\\"b}', 'state': 'TASK_RUNNING'}]},
+        {'id': 'F1', 'name': 'chronos', 'tasks': []},
+    ],
+    'completed_frameworks': [],
+    'activated_slaves': 1,
+    'leader': 'master@10.0.0.1:5050',
+    'pending': True,
+}
+
+
+def _chunks(text, size):
+    data = text.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.fixture(params=[1, 2, 7, 4096])
+def chunk_size(request):
+    return request.param
+
+
+def test_load_sections(chunk_size):
+    chunks = _chunks(json.dumps(STATE, indent=2), chunk_size)
+    sections = {'slaves': None,
+                'activated_slaves': None,
+                'pending': None,
+                'missing': None}
+
+    assert jsonstream.load_sections(chunks, sections) == {
+        'slaves': STATE['slaves'],
+        'activated_slaves': 1,
+        'pending': True,
+    }
+
+
+def test_load_sections_projection(chunk_size):
+    chunks = _chunks(json.dumps(STATE), chunk_size)
+
+    result = jsonstream.load_sections(
+        chunks,
+        {'frameworks': ['id', 'name', 'tasks'], 'completed_frameworks': []})
+
+    assert result == {
+        'frameworks': [
+            {'id': 'F0',
+             'name': u'marathön',
+             'tasks': STATE['frameworks'][0]['tasks']},
+            {'id': 'F1', 'name': 'chronos', 'tasks': []},
+        ],
+        'completed_frameworks': [],
+    }
+
+
+def test_load_sections_empty_object():
+    assert jsonstream.load_sections([b' { } '], {'slaves': None}) == {}
+
+
+def test_load_sections_text_chunks():
+    result = jsonstream.load_sections(['{"a": ', '[1, 2]', '}'], {'a': None})
+    assert result == {'a': [1, 2]}
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '[]',
+    '{"slaves": [1, 2}',
+    '{"slaves": [1, 2]',
+    '{"slaves" [1]}',
+    '{slaves: []}',
+])
+def test_load_sections_invalid(text):
+    with pytest.raises(DCOSException):
+        jsonstream.load_sections(_chunks(text, 3), {'slaves': None})
+
+
+def test_iter_section_stops_early():
+    def chunks():
+        yield '{"other": [1, {"a": 2}], "tasks": [{"id": 1}, '
+        yield '{"id": 2}, '
+        raise AssertionError('read past the match')
+
+    tasks = jsonstream.iter_section(chunks(), 'tasks')
+    assert next(tasks) == {'id': 1}
+    assert next(tasks) == {'id': 2}
+
+
+def test_iter_section_missing():
+    assert list(jsonstream.iter_section(['{"a": 1}'], 'tasks')) == []
+    assert list(jsonstream.iter_section(['{}'], 'tasks')) == []
+    assert list(jsonstream.iter_section(['{"tasks": []}'], 'tasks')) == []
+
+
+def test_load_sections_large_elements():
+    state = generate_state(agents=5, frameworks=2, tasks=200,
+                           completed_tasks=200)
+    chunks = _chunks(json.dumps(state), 1024)
+
+    result = jsonstream.load_sections(chunks, mesos.TASK_SECTIONS)
+
+    assert result == {
+        'slaves': state['slaves'],
+        'frameworks': [
+            dict((field, framework[field])
+                 for field in mesos.TASK_SECTIONS['frameworks'])
+            for framework in state['frameworks']],
+    }
@@ -0,0 +1,615 @@
+import json
+import time
+
+from benchmarks.marathon_server import MarathonStandIn, MarathonState
+from benchmarks.servers import StandInHandler, StandInServer
+from dcos import cache, http, marathon
+from dcos.errors import DCOSException
+
+import pytest
+
+TASKS = [
+    {'id': 'web.1', 'appId': '/web'},
+    {'id': 'group_api.2', 'appId': '/group/api'},
+    {'id': 'legacy-task', 'appId': '/legacy'},
+]
+
+
+class _TasksHandler(StandInHandler):
+    """Serves TASKS per app and for the whole cluster, and records the
+    paths it was asked for."""
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+
+        if self.path == '/v2/info':
+            self.send_json(200, {'version': '0.11.0'})
+        elif self.path == '/v2/tasks':
+            self.send_json(200, {'tasks': TASKS})
+        elif self.path.startswith('/v2/apps/') and \
+                self.path.endswith('/tasks'):
+            app_id = self.path[len('/v2/apps'):-len('/tasks')]
+            tasks = [task for task in TASKS if task['appId'] == app_id]
+            if tasks:
+                self.send_json(200, {'tasks': tasks})
+            else:
+                self.send_json(404, {'message': 'App does not exist'})
+        else:
+            self.send_json(404, {'message': 'Not found'})
+
+
+@pytest.fixture
+def server():
+    with StandInServer(_TasksHandler) as server:
+        server.server.paths = []
+        yield server
+
+
+def test_get_tasks_uses_app_endpoint(server):
+    client = marathon.Client(server.url)
+
+    assert client.get_tasks('group/api') == [TASKS[1]]
+    assert client.get_tasks('missing') == []
+    assert client.get_tasks(None) == TASKS
+    assert server.server.paths[1:] == ['/v2/apps/group/api/tasks',
+                                       '/v2/apps/missing/tasks',
+                                       '/v2/tasks']
+
+
+def test_get_task_derives_app_id(server):
+    client = marathon.Client(server.url)
+
+    assert client.get_task('group_api.2') == TASKS[1]
+    assert '/v2/tasks' not in server.server.paths
+
+
+def test_get_task_falls_back_to_scan(server):
+    client = marathon.Client(server.url)
+
+    assert client.get_task('legacy-task') == TASKS[2]
+    assert client.get_task('web.missing') is None
+    assert server.server.paths[1:] == ['/v2/tasks',
+                                       '/v2/apps/web/tasks',
+                                       '/v2/tasks']
+
+
+DEPLOYMENT = {'id': 'd1', 'affectedApps': ['/web'], 'steps': []}
+
+EVENTS = [
+    ('deployment_step_success',
+     {'eventType': 'deployment_step_success', 'plan': {'id': 'other'}}),
+    ('deployment_step_success',
+     {'eventType': 'deployment_step_success', 'plan': {'id': 'd1'}}),
+    ('deployment_success',
+     {'eventType': 'deployment_success', 'id': 'd1'}),
+]
+
+
+class _DeploymentHandler(StandInHandler):
+    """Serves DEPLOYMENT for the first `polls` requests, and `events` on
+    the event stream if it is set."""
+
+    def do_GET(self):
+        if self.path == '/v2/info':
+            self.send_json(200, {'version': '0.11.0'})
+        elif self.path == '/v2/deployments':
+            self.server.polls -= 1
+            self.send_json(200, [DEPLOYMENT] if self.server.polls >= 0
+                           else [])
+        elif self.path.startswith('/v2/events') and \
+                self.server.events is not None:
+            self.start_event_stream()
+            for event_type, data in self.server.events:
+                self.send_event(event_type, data)
+            self.end_event_stream()
+        else:
+            self.send_json(404, {'message': 'Not found'})
+
+
+def _watch(events, polls=1, max_count=None):
+    with StandInServer(_DeploymentHandler) as server:
+        server.server.events = events
+        server.server.polls = polls
+        client = marathon.Client(server.url)
+        return list(client.watch_deployment('d1', max_count, 0))
+
+
+def test_watch_deployment_events():
+    assert _watch(EVENTS) == [DEPLOYMENT, EVENTS[1][1], EVENTS[2][1]]
+    assert _watch(EVENTS, max_count=2) == [DEPLOYMENT, EVENTS[1][1]]
+
+
+def test_watch_deployment_failed():
+    with pytest.raises(DCOSException) as excinfo:
+        _watch([('deployment_failed',
+                 {'eventType': 'deployment_failed', 'id': 'd1'})])
+
+    assert 'failed' in str(excinfo.value)
+
+
+def test_watch_deployment_polls_without_events():
+    assert _watch(None, polls=3) == [DEPLOYMENT] * 3
+    assert _watch(None, polls=3, max_count=2) == [DEPLOYMENT] * 2
+
+
+def test_watch_deployment_polls_after_stream_ends():
+    assert _watch(EVENTS[:2], polls=2) == \
+        [DEPLOYMENT, EVENTS[1][1], DEPLOYMENT]
+
+
+def _record_event_streams(monkeypatch):
+    streams = []
+    get = http.get
+
+    def record(url, *args, **kwargs):
+        response = get(url, *args, **kwargs)
+        if kwargs.get('stream'):
+            streams.append(response)
+        return response
+
+    monkeypatch.setattr(http, 'get', record)
+    return streams
+
+
+def test_watch_deployment_closes_unread_stream(monkeypatch):
+    streams = _record_event_streams(monkeypatch)
+
+    assert _watch(EVENTS, polls=0) == []
+    assert len(streams) == 1
+    assert streams[0].raw.closed
+
+
+class _QuietHandler(_DeploymentHandler):
+    """Sends `events` and then keeps the event stream open without
+    sending anything more."""
+
+    def do_GET(self):
+        if self.path.startswith('/v2/events'):
+            self.start_event_stream()
+            for event_type, data in self.server.events:
+                self.send_event(event_type, data)
+            time.sleep(5)
+        else:
+            _DeploymentHandler.do_GET(self)
+
+
+def test_watch_deployment_stops_on_quiet_stream():
+    with StandInServer(_QuietHandler) as server:
+        server.server.events = EVENTS[:2]
+        server.server.polls = 2
+        client = marathon.Client(server.url)
+        start = time.time()
+        assert list(client.watch_deployment('d1', 1, 0)) == [DEPLOYMENT]
+        assert list(client.watch_deployment('d1', 2, 0)) == \
+            [DEPLOYMENT, EVENTS[1][1]]
+
+    assert time.time() - start < 2
+
+
+class _AppsHandler(StandInHandler):
+    """Serves a few apps and accepts scaling them."""
+
+    def do_GET(self):
+        if self.path.startswith('/v2/apps?'):
+            self.send_json(200, {'apps': [
+                {'id': '/db', 'cmd': 'run', 'instances': 1,
+                 'tasksRunning': 1, 'embed': self.path.split('?')[1]}]})
+        elif self.path == '/v2/info':
+            self.send_json(200, {'version': '0.11.0'})
+        elif self.path == '/v2/apps':
+            self.send_json(200, {'apps': getattr(
+                self.server, 'apps',
+                [{'id': '/web/api'}, {'id': '/web/ui'}, {'id': '/db'}])})
+        else:
+            self.send_json(404, {'message': 'Not found'})
+
+    def do_PUT(self):
+        self.read_body()
+        self.send_json(200, {'deploymentId': 'd-' + self.path})
+
+
+def test_match_app_ids():
+    with StandInServer(_AppsHandler) as server:
+        client = marathon.Client(server.url)
+        assert client.match_app_ids(['db/', 'web/*', '/web/api']) == \
+            ['/db', '/web/api', '/web/ui']
+        assert client.match_app_ids(['/missing']) == ['/missing']
+
+        with pytest.raises(DCOSException):
+            client.match_app_ids(['/missing/*'])
+
+
+def test_match_app_ids_bypasses_cache(tmpdir):
+    apps_cache = cache.FileCache(str(tmpdir), float('inf'))
+    with StandInServer(_AppsHandler) as server:
+        client = marathon.Client(server.url, apps_cache)
+        assert client.match_app_ids(['/web/*']) == ['/web/api', '/web/ui']
+        assert len(client.get_apps(fields=['id'])) == 3
+
+        server.server.apps = [{'id': '/web/api'}, {'id': '/web/new'}]
+        assert client.match_app_ids(['/web/*']) == ['/web/api', '/web/new']
+
+
+def test_scale_app():
+    with StandInServer(_AppsHandler) as server:
+        client = marathon.Client(server.url)
+        assert client.scale_app('web/api', 3) == 'd-/v2/apps/web/api'
+
+
+def test_get_apps_projection():
+    with StandInServer(_AppsHandler) as server:
+        client = marathon.Client(server.url)
+        apps = client.get_apps(
+            embed=marathon.app_embeds(['id', 'tasksRunning']),
+            fields=['id', 'tasksRunning', 'embed'])
+
+    assert apps == [{'id': '/db', 'tasksRunning': 1,
+                     'embed': 'embed=apps.counts'}]
+
+
+def test_apps_cache(tmpdir):
+    apps_cache = cache.FileCache(str(tmpdir), 60)
+    with StandInServer(_AppsHandler) as server:
+        client = marathon.Client(server.url, apps_cache)
+        apps = client.get_apps()
+        requests = server.requests
+
+        client = marathon.Client(server.url, apps_cache)
+        assert client.get_apps() == apps
+        assert server.requests == requests
+
+        client.scale_app('db', 2)
+        client.get_apps()
+        assert server.requests == requests + 2
+
+
+def test_apps_cache_by_default(tmpdir, monkeypatch):
+    monkeypatch.setattr(cache, 'cache_dir',
+                        lambda name: str(tmpdir.join(name)))
+
+    with StandInServer(_AppsHandler) as server:
+        config = {'marathon.url': server.url}
+        apps = marathon.create_client(config).get_apps()
+        requests = server.requests
+
+        assert marathon.create_client(config).get_apps() == apps
+        assert server.requests == requests
+
+        config['marathon.apps_cache_ttl'] = 0
+        marathon.create_client(config).get_apps()
+        assert server.requests == requests + 2
+
+
+class _VersionsHandler(StandInHandler):
+    """Serves the versions of /web, with an ETag for the version list, and
+    records the paths it was asked for."""
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+
+        if self.path == '/v2/info':
+            self.send_json(200, {'version': '0.11.0'})
+        elif self.path == '/v2/apps/web/versions':
+            if self.headers.get('If-None-Match') == '"v2"':
+                self.server.paths[-1] += ' 304'
+                self.send_response(304)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                self.server.count_request()
+            else:
+                self.send_json(200, {'versions': ['v2', 'v1']},
+                               {'ETag': '"v2"'})
+        elif self.path.startswith('/v2/apps/web/versions/'):
+            version = self.path.rpartition('/')[2]
+            self.send_json(200, {'id': '/web', 'version': version})
+        else:
+            self.send_json(404, {'message': 'Not found'})
+
+
+@pytest.mark.parametrize('with_apps_cache', [True, False])
+def test_versions_cache(tmpdir, with_apps_cache):
+    apps_cache = None
+    if with_apps_cache:
+        apps_cache = cache.FileCache(str(tmpdir.join('apps')), 0)
+    versions_cache = cache.FileCache(str(tmpdir.join('versions')),
+                                     float('inf'), 10)
+    with StandInServer(_VersionsHandler) as server:
+        server.server.paths = []
+        for _ in range(2):
+            client = marathon.Client(
+                server.url, apps_cache, versions_cache)
+            assert client.get_app_versions('web', 1) == ['v2']
+            assert client.get_app('web', 'v1') == \
+                {'id': '/web', 'version': 'v1'}
+
+    assert server.server.paths == ['/v2/info',
+                                   '/v2/apps/web/versions',
+                                   '/v2/apps/web/versions/v1',
+                                   '/v2/info',
+                                   '/v2/apps/web/versions 304']
+
+
+def test_versions_cache_per_cluster(tmpdir):
+    versions_cache = cache.FileCache(str(tmpdir), float('inf'), 10)
+    with StandInServer(_VersionsHandler) as server_a, \
+            StandInServer(_VersionsHandler) as server_b:
+        server_a.server.paths = []
+        server_b.server.paths = []
+        client_a = marathon.Client(server_a.url, None, versions_cache)
+        client_b = marathon.Client(server_b.url, None, versions_cache)
+        assert client_a.get_app_versions('web') == ['v2', 'v1']
+        assert client_a.get_app('web', 'v1') == \
+            {'id': '/web', 'version': 'v1'}
+        assert client_b.get_app_versions('web') == ['v2', 'v1']
+        assert client_b.get_app('web', 'v1') == \
+            {'id': '/web', 'version': 'v1'}
+
+    assert server_b.server.paths == ['/v2/info',
+                                     '/v2/apps/web/versions',
+                                     '/v2/apps/web/versions/v1']
+
+
+class _DeployHandler(StandInHandler):
+    """Has the app /db, accepts new apps except /broken, and records the
+    apps it was asked to add or update."""
+
+    def do_GET(self):
+        if self.path == '/v2/info':
+            self.send_json(200, {'version': '0.11.0'})
+        elif self.path == '/v2/apps':
+            self.send_json(200, {'apps': [{'id': '/db', 'cmd': 'run'}]})
+        elif self.path == '/v2/deployments':
+            self.send_json(200, [])
+        else:
+            self.send_json(404, {'message': 'Not found'})
+
+    def do_POST(self):
+        app = json.loads(self.read_body().decode('utf-8'))
+        self.server.submitted.append(app['id'])
+        if app['id'] == '/broken':
+            self.send_json(422, {'message': 'Invalid app'})
+        else:
+            self.send_json(201, dict(
+                app, deployments=[{'id': 'd' + app['id']}]))
+
+    def do_PUT(self):
+        self.read_body()
+        self.server.submitted.append(self.path[len('/v2/apps'):])
+        self.send_json(200, {'deploymentId': 'd' + self.path})
+
+
+def _deploy(apps):
+    with StandInServer(_DeployHandler) as server:
+        server.server.submitted = []
+        client = marathon.Client(server.url)
+        results = list(client.deploy_apps(apps, interval=0))
+
+    return results, server.server.submitted
+
+
+def test_deploy_apps_in_dependency_order():
+    results, submitted = _deploy([
+        {'id': 'web/ui', 'dependencies': ['../web/api']},
+        {'id': '/web/api', 'dependencies': ['/db', '/external']},
+        {'id': 'db/'},
+    ])
+
+    assert submitted == ['/db', '/web/api', '/web/ui']
+    assert results == [
+        {'id': '/db', 'action': 'update', 'deploymentId': 'd/v2/apps/db',
+         'error': None},
+        {'id': '/web/api', 'action': 'add', 'deploymentId': 'd/web/api',
+         'error': None},
+        {'id': '/web/ui', 'action': 'add', 'deploymentId': 'd/web/ui',
+         'error': None},
+    ]
+
+
+def test_deploy_apps_skips_dependents_of_failures():
+    results, submitted = _deploy([
+        {'id': '/broken'},
+        {'id': '/a', 'dependencies': ['/broken']},
+        {'id': '/b', 'dependencies': ['/a', '/broken']},
+    ])
+
+    assert submitted == ['/broken']
+    assert [(result['id'], result['error']) for result in results] == [
+        ('/broken', 'Error: Invalid app'),
+        ('/a', 'Dependency /broken was not deployed'),
+        ('/b', 'Dependency /broken was not deployed'),
+    ]
+
+
+class _LevelHandler(_DeployHandler):
+    """Keeps the deployments of the apps under /root/ running until all of
+    them were submitted, and records the subscriptions to the event
+    stream."""
+
+    def do_GET(self):
+        if self.path == '/v2/deployments':
+            roots = [app_id for app_id in self.server.submitted
+                     if app_id.startswith('/root/')]
+            self.send_json(200, [{'id': 'd' + app_id} for app_id in roots]
+                           if len(roots) < self.server.roots else [])
+        elif self.path.startswith('/v2/events'):
+            self.server.subscriptions += 1
+            self.send_json(404, {'message': 'Not found'})
+        else:
+            _DeployHandler.do_GET(self)
+
+
+def test_deploy_apps_wider_than_pool(monkeypatch):
+    pool_size = 2
+    roots = 2 * pool_size
+    monkeypatch.setattr(http, '_max_concurrency', lambda: pool_size)
+    monkeypatch.setattr(http, '_executor', None)
+
+    apps = []
+    for i in range(roots):
+        apps.append({'id': '/root/{}'.format(i)})
+        apps.append({'id': '/leaf/{}'.format(i),
+                     'dependencies': ['/root/{}'.format(i)]})
+
+    with StandInServer(_LevelHandler) as server:
+        server.server.submitted = []
+        server.server.roots = roots
+        server.server.subscriptions = 0
+        client = marathon.Client(server.url)
+        try:
+            results = list(client.deploy_apps(apps, interval=0.01, timeout=5))
+        finally:
+            http._shutdown_executor()
+
+    assert [result['error'] for result in results] == [None] * 2 * roots
+    assert sorted(server.server.submitted[roots:]) == \
+        ['/leaf/{}'.format(i) for i in range(roots)]
+    assert server.server.subscriptions == 1
+
+
+def test_deploy_apps_rejects_cycles():
+    with pytest.raises(DCOSException) as excinfo:
+        _deploy([
+            {'id': '/a', 'dependencies': ['/b']},
+            {'id': '/b', 'dependencies': ['/a']},
+            {'id': '/c', 'dependencies': ['/a']},
+        ])
+
+    assert str(excinfo.value) == \
+        'The dependencies of these apps contain a cycle: /a, /b, /c'
+
+
+class _WaitHandler(StandInHandler):
+    """Lists the deployments in `running` as in progress, and sends
+    `events` on the event stream if it is set."""
+
+    def do_GET(self):
+        if self.path == '/v2/info':
+            self.send_json(200, {'version': '0.11.0'})
+        elif self.path == '/v2/deployments':
+            self.server.polls += 1
+            self.send_json(200, [{'id': deployment_id}
+                                 for deployment_id in self.server.running])
+        elif self.path.startswith('/v2/events') and \
+                self.server.events is not None:
+            self.start_event_stream()
+            for event_type, deployment_id in self.server.events:
+                self.send_event(event_type,
+                                {'eventType': event_type, 'id': deployment_id})
+            self.end_event_stream()
+        else:
+            self.send_json(404, {'message': 'Not found'})
+
+
+def _wait_for(deployment_ids, running, events, timeout=None):
+    with StandInServer(_WaitHandler) as server:
+        server.server.running = set(running)
+        server.server.events = events
+        server.server.polls = 0
+        client = marathon.Client(server.url)
+        client.wait_for_deployments(deployment_ids, timeout, 0.01)
+
+    return server.server.polls
+
+
+def test_wait_for_deployments_events():
+    events = [('deployment_success', 'other'),
+              ('deployment_success', 'd1'),
+              ('deployment_success', 'd2')]
+
+    assert _wait_for(['d1', 'd2', 'done', None], ['d1', 'd2'], events) == 1
+
+
+def test_wait_for_deployments_closes_unread_stream(monkeypatch):
+    streams = _record_event_streams(monkeypatch)
+
+    assert _wait_for(['d1'], [], [('deployment_success', 'd1')]) == 1
+    assert len(streams) == 1
+    assert streams[0].raw.closed
+
+
+def test_wait_for_deployments_failed():
+    with pytest.raises(DCOSException) as excinfo:
+        _wait_for(['d1', 'd2'], ['d1', 'd2'],
+                  [('deployment_failed', 'd2'), ('deployment_success', 'd1')])
+
+    assert str(excinfo.value) == 'Deployments failed: d2'
+
+
+def test_wait_for_deployments_polls():
+    assert _wait_for(['d1', 'd2'], [], None) == 1
+
+    with pytest.raises(DCOSException) as excinfo:
+        _wait_for(['d1', 'd2'], ['d2'], None, timeout=0.05)
+
+    assert str(excinfo.value) == 'Timed out waiting for deployments: d2'
+
+
+class _BusyHandler(_WaitHandler):
+    """Keeps /d1 running and streams events of other deployments for
+    several seconds."""
+
+    def do_GET(self):
+        if self.path.startswith('/v2/events'):
+            self.start_event_stream()
+            try:
+                for _ in range(500):
+                    self.send_event('deployment_step_success',
+                                    {'eventType': 'deployment_step_success',
+                                     'plan': {'id': 'other'}})
+                    time.sleep(0.01)
+                self.end_event_stream()
+            except (IOError, OSError):
+                pass
+        else:
+            _WaitHandler.do_GET(self)
+
+
+def test_wait_for_deployments_times_out_on_busy_stream():
+    with StandInServer(_BusyHandler) as server:
+        server.server.running = set(['d1'])
+        server.server.polls = 0
+        client = marathon.Client(server.url)
+        start = time.time()
+        with pytest.raises(DCOSException) as excinfo:
+            client.wait_for_deployments(['d1'], 0.2, 0.01)
+
+    assert str(excinfo.value) == 'Timed out waiting for deployments: d1'
+    assert time.time() - start < 2
+
+
+@pytest.fixture
+def stand_in():
+    state = MarathonState(deployment_duration=0.05)
+    state.generate(apps=20, groups=2, instances=2, versions=3)
+    with MarathonStandIn(state) as server:
+        yield server
+
+
+def test_stand_in_versions(stand_in):
+    client = marathon.Client(stand_in.url)
+
+    versions = client.get_app_versions('/group-1/app-1')
+    assert len(versions) == 3
+    assert client.get_app('/group-1/app-1', versions[-1])['version'] == \
+        versions[-1]
+    assert len(client.get_group_versions('/group-1')) > 1
+
+
+def test_stand_in_deployments(stand_in):
+    client = marathon.Client(stand_in.url)
+
+    deployment_id = client.scale_app('/group-1/app-1', 3)
+    with pytest.raises(DCOSException):
+        client.scale_app('/group-1/app-1', 4)
+
+    client.wait_for_deployments([deployment_id], timeout=5, interval=0.01)
+    assert client.get_app('/group-1/app-1')['tasksRunning'] == 3
+
+
+def test_stand_in_injected_errors(stand_in):
+    client = marathon.Client(stand_in.url)
+    stand_in.fail('GET', '^/v2/apps$', status=500)
+
+    with pytest.raises(DCOSException):
+        client.get_apps()
+    assert len(client.get_apps()) == 20
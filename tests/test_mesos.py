@@ -0,0 +1,323 @@
+import copy
+
+from benchmarks.mesos_server import MesosStandIn
+from benchmarks.mesos_state import generate_state
+from benchmarks.servers import StandInHandler, StandInServer
+from dcos import cache, http, mesos, util
+from dcos.errors import DCOSException
+
+import pytest
+
+STATE = {
+    'slaves': [{'id': 'S0', 'hostname': 'agent-0'}],
+    'frameworks': [{
+        'id': 'F0',
+        'name': 'marathon',
+        'user': 'root',
+        'active': True,
+        'hostname': 'master-0',
+        'offers': [],
+        'tasks': [{'id': 'app.1', 'name': 'app', 'framework_id': 'F0',
+                   'slave_id': 'S0', 'state': 'TASK_RUNNING'}],
+        'completed_tasks': [],
+    }],
+    'completed_frameworks': [],
+    'orphan_tasks': [],
+}
+
+
+SUMMARY = {
+    'slaves': [{'id': 'S0', 'hostname': 'agent-0'}],
+    'frameworks': [{'id': 'F0', 'name': 'marathon', 'active': True,
+                    'hostname': 'master-0', 'TASK_RUNNING': 1,
+                    'TASK_FINISHED': 3, 'used_resources': {'cpus': 1.0}}],
+}
+
+
+class _StateHandler(StandInHandler):
+
+    def do_GET(self):
+        if self.path.startswith('/master/state-summary'):
+            self.send_json(200, SUMMARY)
+        elif not self.path.startswith('/master/state.json'):
+            self.send_json(404, {})
+        elif self.headers.get('If-None-Match') == '"1"':
+            self.server.count_request()
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            self.send_json(200, STATE, {'ETag': '"1"'})
+
+
+def test_get_state_sections():
+    with StandInServer(_StateHandler) as server:
+        client = mesos.MasterClient(server.url)
+        full = client.get_state()
+        state = client.get_state(mesos.TASK_SECTIONS)
+
+    assert full == STATE
+    assert sorted(state.keys()) == ['frameworks', 'slaves']
+    assert 'offers' not in state['frameworks'][0]
+
+    task = mesos.Master(state).task('app')
+    assert task.user() == 'root'
+    assert task.slave()['hostname'] == 'agent-0'
+
+
+def test_task_lookups_use_exact_ids():
+    state = generate_state(agents=20, frameworks=3, tasks=200)
+    master = mesos.Master(state)
+
+    slaves = dict((s['id'], s) for s in state['slaves'])
+    frameworks = dict((f['id'], f) for f in state['frameworks'])
+    for task in master.tasks():
+        # Agent ids such as ...-S1 are substrings of ...-S10
+        assert task.slave()['hostname'] == \
+            slaves[task['slave_id']]['hostname']
+        assert task.user() == frameworks[task['framework_id']]['user']
+
+
+def test_iter_tasks():
+    state = generate_state(agents=5, frameworks=2, tasks=50)
+    master = mesos.Master(state)
+
+    tasks = master.iter_tasks()
+    first = next(tasks)
+    assert first['id'] == state['frameworks'][0]['tasks'][0]['id']
+    assert [t['id'] for t in master.tasks()] == \
+        [first['id']] + [t['id'] for t in tasks]
+
+
+def test_task_filters():
+    state = {
+        'slaves': [{'id': 'S0', 'hostname': 'agent-0'},
+                   {'id': 'S1', 'hostname': 'agent-1'}],
+        'frameworks': [{
+            'id': 'F0', 'name': 'marathon', 'active': True,
+            'tasks': [
+                {'id': 'web.1', 'name': 'web', 'framework_id': 'F0',
+                 'slave_id': 'S0', 'state': 'TASK_RUNNING'},
+                {'id': 'web.2', 'name': 'web', 'framework_id': 'F0',
+                 'slave_id': 'S1', 'state': 'TASK_STAGING'},
+            ]}, {
+            'id': 'F1', 'name': 'chronos', 'active': True,
+            'tasks': [
+                {'id': 'job*1', 'name': 'job', 'framework_id': 'F1',
+                 'slave_id': 'S1', 'state': 'TASK_RUNNING'},
+            ]}],
+    }
+    master = mesos.Master(state)
+
+    def ids(fltr):
+        return [task['id'] for task in master.tasks(fltr)]
+
+    assert ids('') == ['web.1', 'web.2', 'job*1']
+    assert ids([]) == ['web.1', 'web.2', 'job*1']
+    assert ids('web') == ['web.1', 'web.2']
+    assert ids('*.2') == ['web.2']
+    assert ids('job*1') == ['job*1']
+    assert ids('re:^w.*1$') == ['web.1']
+    assert ids('re:[0-9]=?$') == ['web.1', 'web.2', 'job*1']
+    assert ids('state=TASK_RUNNING') == ['web.1', 'job*1']
+    assert ids('framework=chronos') == ['job*1']
+    assert ids('host=agent-1') == ['web.2', 'job*1']
+    assert ids(['host=agent-1', 'framework=mara*']) == ['web.2']
+    assert ids('name=re:^j') == ['job*1']
+
+    with pytest.raises(DCOSException):
+        mesos.compile_task_filter('owner=root')
+
+    with pytest.raises(DCOSException):
+        mesos.compile_task_filter('re:(')
+
+
+def test_compact_master():
+    state = generate_state(agents=5, frameworks=2, tasks=50)
+    expected = copy.deepcopy(state)
+    master = mesos.Master(state, compact=True)
+
+    tasks = master.tasks('state=TASK_RUNNING')
+    assert [task.dict() for task in tasks] == \
+        [task for framework in expected['frameworks']
+         for task in framework['tasks']]
+
+    task = tasks[0]
+    assert isinstance(task._task, mesos.CompactTask)
+    assert task['resources'] == expected['frameworks'][0]['tasks'][0][
+        'resources']
+    assert task.user() == expected['frameworks'][0]['user']
+    assert task.slave()['hostname'].startswith('agent-')
+    assert 'labels' in task._task and 'missing' not in task._task
+
+    # Repeated strings are shared between records
+    assert tasks[0]['state'] is tasks[1]['state']
+
+    frameworks = master.frameworks()
+    assert [f.dict() for f in frameworks] == expected['frameworks']
+    assert frameworks[0].task_count() == len(
+        expected['frameworks'][0]['tasks'])
+
+
+def test_missing_slave_and_framework():
+    master = mesos.Master(generate_state(agents=1, frameworks=1, tasks=1))
+
+    with pytest.raises(DCOSException):
+        master.slave_by_id('missing')
+
+    with pytest.raises(DCOSException):
+        master.framework('missing')
+
+
+def test_get_state_cache():
+    with util.tempdir() as tmp_dir, StandInServer(_StateHandler) as server:
+        fresh = mesos.MasterClient(server.url, cache.FileCache(tmp_dir, 60))
+        stale = mesos.MasterClient(server.url, cache.FileCache(tmp_dir, 0))
+        assert fresh.get_state(mesos.TASK_SECTIONS)['slaves'] == \
+            STATE['slaves']
+        assert fresh.get_state(mesos.TASK_SECTIONS)['slaves'] == \
+            STATE['slaves']
+        assert server.requests == 1
+
+        # A different view of the state is cached separately
+        assert fresh.get_state() == STATE
+        assert server.requests == 2
+
+        # Stale entries are revalidated with their ETag
+        assert stale.get_state() == STATE
+        assert server.requests == 3
+
+
+class _OldStateHandler(_StateHandler):
+    """A master without the state-summary endpoint"""
+
+    def do_GET(self):
+        if self.path.startswith('/master/state-summary'):
+            self.send_json(404, {})
+        else:
+            _StateHandler.do_GET(self)
+
+
+def test_get_view():
+    with StandInServer(_StateHandler) as server:
+        client = mesos.MasterClient(server.url)
+        summary = client.get_view(mesos.SERVICES_SUMMARY_VIEW)
+        services = client.get_view(mesos.SERVICES_VIEW)
+
+    assert summary == SUMMARY
+    assert services == {'frameworks': STATE['frameworks']}
+
+    framework = mesos.Master(summary).frameworks()[0]
+    assert framework.task_count() == 1
+
+
+def test_framework_resources():
+    used = {'cpus': 1.0, 'mem': 32.0, 'disk': 0, 'ports': '[1-2]'}
+    offered = {'cpus': 0.5, 'mem': 96.0, 'disk': 10.0}
+
+    summary = mesos.Framework({'used_resources': used,
+                               'offered_resources': offered})
+    assert summary.resources() == {'cpus': 1.5, 'mem': 128.0, 'disk': 10.0}
+
+    record = mesos.Framework({'used_resources': used,
+                              'offered_resources': offered,
+                              'resources': {'cpus': 2.0}})
+    assert record.resources() == {'cpus': 2.0}
+
+
+def test_get_view_fallback():
+    with StandInServer(_OldStateHandler) as server:
+        client = mesos.MasterClient(server.url)
+        summary = client.get_view(mesos.SERVICES_SUMMARY_VIEW)
+
+    assert summary == {'frameworks': STATE['frameworks']}
+    assert mesos.Master(summary).frameworks()[0].task_count() == 1
+
+
+def test_generate_state():
+    state = generate_state(agents=10, frameworks=3, tasks=100, seed=7,
+                           completed_tasks=40, completed_frameworks=2)
+
+    assert state == generate_state(agents=10, frameworks=3, tasks=100,
+                                   seed=7, completed_tasks=40,
+                                   completed_frameworks=2)
+    assert len(state['completed_frameworks']) == 2
+
+    master = mesos.Master(state)
+    assert len(master.tasks()) == 100
+    assert len(master.tasks(completed=True)) == 40
+    assert all(task['state'] != 'TASK_RUNNING'
+               for task in master.tasks(completed=True))
+
+
+def test_stand_in_master():
+    state = generate_state(agents=5, frameworks=2, tasks=30,
+                           completed_tasks=10)
+    framework_id = state['frameworks'][0]['id']
+    running = len(state['frameworks'][0]['tasks'])
+
+    with MesosStandIn(state) as server:
+        client = mesos.MasterClient(server.url)
+        summary = client.get_view(mesos.SERVICES_SUMMARY_VIEW)
+        tasks = http.get(server.url + 'master/tasks',
+                         params={'limit': 5, 'order': 'asc'}).json()['tasks']
+
+        client.shutdown_framework(framework_id)
+        with pytest.raises(DCOSException):
+            client.shutdown_framework(framework_id)
+        master = mesos.Master(client.get_view(mesos.TASKS_VIEW))
+
+    assert mesos.Master(summary).framework(framework_id).task_count() == \
+        running
+    assert [task['id'] for task in tasks] == \
+        ['app-{0}.{0}'.format(i) for i in range(5)]
+    assert [f['id'] for f in master.frameworks(inactive=True)] == \
+        [state['frameworks'][0]['id']]
+    assert len(master.tasks()) == 30 - running
+
+
+def test_get_services_view():
+    state = generate_state(agents=5, frameworks=2, tasks=30,
+                           completed_frameworks=1)
+
+    with MesosStandIn(state) as server:
+        client = mesos.MasterClient(server.url)
+        services = client.get_view(mesos.SERVICES_VIEW)
+
+    # Served by master/frameworks rather than by state.json
+    assert services == {
+        'frameworks': state['frameworks'],
+        'completed_frameworks': state['completed_frameworks'],
+        'unregistered_frameworks': []}
+    assert server.requests == 1
+    assert len(mesos.Master(services).frameworks(inactive=True)) == 2
+
+
+def test_get_slaves():
+    state = generate_state(agents=5, frameworks=2, tasks=30)
+
+    with MesosStandIn(state) as server:
+        client = mesos.MasterClient(server.url)
+        slaves = client.get_slaves()
+
+    assert slaves == state['slaves']
+    assert server.requests == 1
+
+
+def test_shutdown_clears_state_cache():
+    state = generate_state(agents=5, frameworks=2, tasks=30)
+    framework_id = state['frameworks'][0]['id']
+
+    with util.tempdir() as tmp_dir, MesosStandIn(state) as server:
+        client = mesos.MasterClient(server.url, cache.FileCache(tmp_dir, 60))
+        before = client.get_view(mesos.SERVICES_SUMMARY_VIEW)
+        assert client.get_view(mesos.SERVICES_SUMMARY_VIEW) == before
+
+        client.shutdown_framework(framework_id)
+        after = client.get_view(mesos.SERVICES_SUMMARY_VIEW)
+
+    assert server.requests == 3
+    assert framework_id in \
+        [f['id'] for f in mesos.Master(before).frameworks()]
+    assert framework_id not in \
+        [f['id'] for f in mesos.Master(after).frameworks()]
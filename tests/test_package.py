@@ -1,5 +1,15 @@
 import collections
+import io
+import json
+import os
+import threading
+import time
+import zipfile
 
+import git
+from benchmarks.package_universe import (generate_index, write_registry,
+                                         zip_registry)
+from benchmarks.servers import StandInHandler, StandInServer
 from dcos import package
 
 import pytest
@@ -77,3 +87,256 @@ def test_option_merge(merge_data):
     assert merge_data.expected == package._merge_options(
         merge_data.first,
         merge_data.second)
+
+
+@pytest.mark.parametrize('query', [
+    '', 'kafka', 'KAF', 'dat', 'a', 'spark-1', 'the cache', '-', 'xyzzy'])
+def test_search_index(tmpdir, query):
+    base_path = str(tmpdir)
+    write_registry(base_path, generate_index(packages=300))
+    registry = package.Registry(package.FileSource('file://' + base_path),
+                                base_path)
+
+    scanned = registry.search(query)
+    registry.build_search_index()
+
+    assert registry.get_search_index() is not None
+    assert registry.search(query) == scanned
+
+
+def test_update_sources(tmpdir, monkeypatch):
+    sources = []
+    for name in ('a', 'b'):
+        base_path = str(tmpdir.join(name))
+        write_registry(base_path, generate_index(packages=10))
+        sources.append('file://' + base_path)
+    sources.append('file://' + str(tmpdir.join('missing')))
+    cache_dir = str(tmpdir.join('cache'))
+
+    running = []
+    concurrency = []
+    lock = threading.Lock()
+    copy_to_cache = package.FileSource.copy_to_cache
+
+    def slow_copy_to_cache(source, target_dir, *args):
+        with lock:
+            running.append(source)
+            concurrency.append(len(running))
+        time.sleep(0.1)
+        with lock:
+            running.remove(source)
+        copy_to_cache(source, target_dir)
+
+    monkeypatch.setattr(package.FileSource, 'copy_to_cache',
+                        slow_copy_to_cache)
+
+    config = {'package.sources': sources, 'package.cache': cache_dir}
+    with pytest.raises(package.DCOSException) as excinfo:
+        package.update_sources(config)
+
+    assert str(excinfo.value) == \
+        'Unable to fetch packages from [{}]'.format(sources[2])
+    assert max(concurrency) == 3
+    for url in sources[:2]:
+        source_dir = package.url_to_source(url).local_cache(config)
+        assert os.path.isfile(
+            os.path.join(source_dir, package.SEARCH_INDEX_NAME))
+
+
+class _ZipHandler(StandInHandler):
+
+    def do_GET(self):
+        etag = '"{}"'.format(self.server.version)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_data(304, b'')
+        else:
+            data = zip_registry(generate_index(
+                packages=10, seed=self.server.version))
+            if getattr(self.server, 'truncated', False):
+                data = data[:len(data) // 2]
+            self.send_data(200, data, {'ETag': etag},
+                           content_type='application/zip')
+
+
+def test_update_sources_revalidates(tmpdir):
+    cache_dir = str(tmpdir)
+    with StandInServer(_ZipHandler) as server:
+        server.server.version = 1
+        url = server.url + 'universe.zip'
+        config = {'package.sources': [url], 'package.cache': cache_dir}
+        source_dir = package.url_to_source(url).local_cache(config)
+        index_path = os.path.join(source_dir, 'repo', 'meta', 'index.json')
+        package.update_sources(config)
+        first = os.stat(index_path)
+        assert os.access(os.path.join(
+            source_dir, 'scripts', '0-validate-version.sh'), os.X_OK)
+
+        package.update_sources(config)
+        assert os.stat(index_path) == first
+
+        server.server.version = 2
+        package.update_sources(config)
+
+    with open(index_path) as index_file:
+        assert json.load(index_file) == generate_index(packages=10, seed=2)
+    assert server.requests == 3
+
+
+def test_http_source_reports_bad_zip(tmpdir):
+    with StandInServer(_ZipHandler) as server:
+        server.server.version = 1
+        server.server.truncated = True
+        source = package.HttpSource(server.url + 'universe.zip')
+        with pytest.raises(package.DCOSException) as excinfo:
+            source.copy_to_cache(str(tmpdir.join('registry')))
+
+    assert str(excinfo.value) == \
+        'Unable to fetch packages from [{}]: {}'.format(
+            source.url, 'File is not a zip file')
+
+
+def test_http_source_reports_unexpected_errors(tmpdir, monkeypatch):
+    def fail(packages_zip, target_dir):
+        raise AttributeError('boom')
+
+    monkeypatch.setattr(package, '_extract_registry', fail)
+    with StandInServer(_ZipHandler) as server:
+        server.server.version = 1
+        source = package.HttpSource(server.url + 'universe.zip')
+        with pytest.raises(package.DCOSException) as excinfo:
+            source.copy_to_cache(str(tmpdir.join('registry')))
+
+    assert str(excinfo.value) == \
+        'Unable to fetch packages from [{}]: {!r}'.format(
+            source.url, AttributeError('boom'))
+
+
+def _zip(names):
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w') as registry_zip:
+        for name in names:
+            registry_zip.writestr(name, '' if name.endswith('/') else name)
+    return zipfile.ZipFile(data)
+
+
+def test_extract_registry(tmpdir):
+    target_dir = str(tmpdir.join('registry'))
+    package._extract_registry(
+        _zip(['universe/', 'universe/repo/meta/index.json',
+              'universe/repo/packages/', 'universe/scripts/run.sh']),
+        target_dir)
+
+    with open(os.path.join(target_dir, 'repo', 'meta', 'index.json')) as fd:
+        assert fd.read() == 'universe/repo/meta/index.json'
+    assert os.path.isdir(os.path.join(target_dir, 'repo', 'packages'))
+    assert os.access(os.path.join(target_dir, 'scripts', 'run.sh'), os.X_OK)
+    assert not os.access(
+        os.path.join(target_dir, 'repo', 'meta', 'index.json'), os.X_OK)
+
+
+def test_extract_registry_ignores_top_level_files(tmpdir):
+    target_dir = str(tmpdir.join('registry'))
+    package._extract_registry(
+        _zip(['README.md', 'universe/repo/meta/index.json', 'LICENSE']),
+        target_dir)
+
+    assert os.listdir(target_dir) == ['repo']
+
+
+@pytest.mark.parametrize('names', [
+    ['a/repo/index.json', 'b/repo/index.json'],
+    ['universe/../../escape'],
+    ['README.md'],
+])
+def test_extract_registry_rejects(tmpdir, names):
+    with pytest.raises(package.DCOSException):
+        package._extract_registry(_zip(names), str(tmpdir.join('registry')))
+
+
+def _commit(repo, path, content):
+    with open(os.path.join(repo.working_tree_dir, path), 'w') as fd:
+        fd.write(content)
+    repo.index.add([path])
+    repo.index.commit(content, author=git.Actor('a', 'a@example.com'),
+                      committer=git.Actor('a', 'a@example.com'))
+
+
+def test_git_source_mirror(tmpdir):
+    upstream = git.Repo.init(str(tmpdir.join('upstream')))
+    upstream.git.checkout('-b', 'master')
+    _commit(upstream, 'index.json', 'first')
+
+    source = package.GitSource('file://' + upstream.working_tree_dir)
+    mirror_dir = str(tmpdir.join('mirror'))
+
+    source.copy_to_cache(str(tmpdir.join('one')), None, mirror_dir)
+    _commit(upstream, 'index.json', 'second')
+    source.copy_to_cache(str(tmpdir.join('two')), None, mirror_dir)
+
+    for target, content in (('one', 'first'), ('two', 'second')):
+        assert os.listdir(str(tmpdir.join(target))) == ['index.json']
+        assert tmpdir.join(target, 'index.json').read() == content
+
+    mirror = git.Repo(mirror_dir)
+    assert mirror.bare
+    assert mirror.git.rev_list('--count', 'refs/heads/master') == '1'
+
+    # A broken mirror is created again
+    tmpdir.join('mirror', 'HEAD').remove()
+    source.copy_to_cache(str(tmpdir.join('three')), None, mirror_dir)
+    assert tmpdir.join('three', 'index.json').read() == 'second'
+
+
+def test_git_source_mirror_kept_on_errors(tmpdir):
+    upstream = git.Repo.init(str(tmpdir.join('upstream')))
+    upstream.git.checkout('-b', 'master')
+    _commit(upstream, 'index.json', 'first')
+
+    mirror_dir = str(tmpdir.join('mirror'))
+    package.GitSource('file://' + upstream.working_tree_dir).copy_to_cache(
+        str(tmpdir.join('one')), None, mirror_dir)
+    head = git.Repo(mirror_dir).git.rev_parse('refs/heads/master')
+
+    # A failed fetch leaves the mirror as it was
+    missing = package.GitSource('file://' + str(tmpdir.join('missing')))
+    with pytest.raises(package.DCOSException) as excinfo:
+        missing.copy_to_cache(str(tmpdir.join('two')), None, mirror_dir)
+    assert 'Unable to fetch packages from [{}]: '.format(missing.url) in \
+        str(excinfo.value)
+    assert git.Repo(mirror_dir).git.rev_parse('refs/heads/master') == head
+
+    # So does a failed export
+    with pytest.raises(package.DCOSException):
+        package.GitSource('file://' + upstream.working_tree_dir) \
+            .copy_to_cache(str(tmpdir.join('one')), None, mirror_dir)
+    assert git.Repo(mirror_dir).git.rev_parse('refs/heads/master') == head
+
+
+def test_update_sources_duplicated_git_source(tmpdir, monkeypatch):
+    upstream = git.Repo.init(str(tmpdir.join('upstream')))
+    upstream.git.checkout('-b', 'master')
+    write_registry(upstream.working_tree_dir, generate_index(packages=10))
+    upstream.git.add('-A')
+    upstream.index.commit('registry', author=git.Actor('a', 'a@example.com'),
+                          committer=git.Actor('a', 'a@example.com'))
+
+    url = 'file://' + upstream.working_tree_dir
+    monkeypatch.setattr(package, 'url_to_source', package.GitSource)
+
+    fetches = []
+    fetch = package.GitSource._fetch
+
+    def counting_fetch(source, mirror_dir):
+        fetches.append(mirror_dir)
+        return fetch(source, mirror_dir)
+
+    monkeypatch.setattr(package.GitSource, '_fetch', counting_fetch)
+
+    config = {'package.sources': [url, url],
+              'package.cache': str(tmpdir.join('cache'))}
+    package.update_sources(config)
+
+    source_dir = package.GitSource(url).local_cache(config)
+    assert fetches == [source_dir + '.git']
+    assert os.path.isfile(os.path.join(source_dir, 'repo', 'meta',
+                                       'index.json'))
@@ -0,0 +1,23 @@
+from dcos import sse
+
+
+def test_iter_events():
+    chunks = [b': keep-alive\n\n',
+              b'event: deployment_success\r\n',
+              b'data: {"id": 1}\r',
+              b'\n\r\n',
+              b'id: 7\ndata: first\ndata:second\n\n',
+              b'data: incomplete']
+
+    assert list(sse.iter_events(chunks)) == [
+        sse.Event('deployment_success', '{"id": 1}', None),
+        sse.Event('message', 'first\nsecond', '7'),
+    ]
+
+
+def test_iter_events_is_incremental():
+    def chunks():
+        yield 'data: 1\n\n'
+        raise AssertionError('read past the event')
+
+    assert next(sse.iter_events(chunks())).data == '1'
@@ -1,3 +1,5 @@
+import collections
+
 from dcos import util
 from dcos.errors import DCOSException
 
@@ -28,3 +30,56 @@ def test_open_file():
             pass
     assert 'Error opening file [{}]: No such file or directory'.format(path) \
         in str(excinfo.value)
+
+
+def test_stream_table_is_lazy():
+    def objs():
+        yield 'a'
+        yield 'bbbbbb'
+        raise AssertionError('consumed past the sample')
+
+    fields = collections.OrderedDict([('name', lambda obj: obj),
+                                      ('size', len)])
+    lines = util.stream_table(fields, objs(), sample_size=1)
+
+    assert next(lines) == ' NAME  SIZE'
+    assert next(lines) == ' a     1'
+    assert next(lines) == ' bbbbbb  6'
+
+
+def test_stream_table_empty():
+    fields = collections.OrderedDict([('name', lambda obj: obj)])
+    assert list(util.stream_table(fields, [])) == []
+
+
+def test_stream_table_wider_rows_later():
+    fields = collections.OrderedDict([('id', lambda obj: obj[0]),
+                                      ('name', lambda obj: obj[1]),
+                                      ('state', lambda obj: obj[2])])
+    objs = [('1', 'web', 'R'),
+            ('2', 'a-much-longer-name', 'R'),
+            ('3333333', 'db', 'S'),
+            ('4', 'api', 'R')]
+
+    assert list(util.stream_table(fields, objs, sample_size=1)) == [
+        ' ID  NAME  STATE',
+        ' 1   web   R',
+        ' 2   a-much-longer-name  R',
+        ' 3333333  db  S',
+        ' 4   api   R',
+    ]
+
+
+def test_stream_table_realigns_after_overflow():
+    fields = collections.OrderedDict([('id', lambda obj: obj[0]),
+                                      ('name', lambda obj: obj[1]),
+                                      ('state', lambda obj: obj[2])])
+    objs = [('1', 'a-long-name', 'RUNNING'),
+            ('22222', 'db', 'STAGING')]
+
+    # The id runs into the name's padding, and the state stays in line
+    assert list(util.stream_table(fields, objs, sample_size=1)) == [
+        ' ID  NAME         STATE',
+        ' 1   a-long-name  RUNNING',
+        ' 22222  db        STAGING',
+    ]